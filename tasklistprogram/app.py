@@ -8,23 +8,33 @@ from datetime import datetime, date, timedelta
 
 from .core.dates import parse_due_flexible, parse_due_entry, fmt_due_for_store
 from .core.model import load_db, save_db, get_task, delete_task, stats_summary, normalize_settings, current_rev
-from .core import filters, scheduler
+from .core import filters, scheduler, search
+from .core.reminders import ReminderSchedule
+from .core.textindex import NgramIndex
+from .core.inbox import InboxWatcher, INBOX_POLL_SECONDS
 from .ui.dialogs import (
     EditDialog,
     StatsDialog,
     SettingsDialog,
     RemindersDialog,
     PasteImportDialog,
+    SearchDialog,
     HelpDialog,
     MantraDialog,
     JournalDialog,
+    ReminderToast,
 )
 from .core.io_import import import_from_string
 from .core.documents import (
+    DocumentIO,
+    document_backend,
+    set_document_backend,
+    export_documents,
+    export_task_document,
+    import_documents,
     sync_task_notes,
     move_task_document_if_needed,
     open_document,
-    append_journal_manual,
     ensure_journal_path,
     open_directory,
     get_mantras_file_path,
@@ -52,7 +62,7 @@ class TaskApp(ActionsMixin, tk.Tk):
         self.title("Tiny Tasklist")
         self.geometry("1120x660")
         self._set_app_icon()
-        self.db = load_db()
+        self.db = load_db(keep_base=True)
 
         # Theming: remember the native ttk theme + default bg so light mode can
         # restore them, then apply the saved theme at the end of __init__.
@@ -64,6 +74,27 @@ class TaskApp(ActionsMixin, tk.Tk):
         # Track last shown mantra to avoid consecutive duplicates
         self.last_shown_mantra = None
 
+        # Event-driven reminders: a heap of each task's next checkpoint, re-armed
+        # whenever the store revision changes and woken via a single after() timer.
+        self.reminder_schedule = ReminderSchedule()
+        self._reminder_after = None
+        self._reminders_rev = object()  # sentinel: never equal to a real rev
+
+        # Task-document and journal writes run on one background thread so a
+        # slow synced data dir never freezes the UI; failures are polled below.
+        set_document_backend(normalize_settings(self.db.get("settings", {}))["document_backend"])
+        self.doc_io = DocumentIO().start()
+        # Re-learn where documents are (one scandir pass) and file stray ones,
+        # e.g. tasks regrouped from the web app.
+        self.doc_io.reconcile(self.db["tasks"])
+
+        # As-you-type search: an n-gram index over titles/notes, re-synced only
+        # when the task data changed (see _sync_text_index), not per keystroke.
+        self.text_index = NgramIndex()
+        self._text_index_key = None
+        self._task_by_id = {}
+        self._status_counts = None
+
         # Keeps expanded/collapsed state by group name (harmless to keep)
         self.group_state = {}  # {group_name: True/False}
 
@@ -74,6 +105,9 @@ class TaskApp(ActionsMixin, tk.Tk):
         file_menu.add_command(label="Reminders…", command=self.open_reminders)
         file_menu.add_command(label="Import Tasks…", command=self.import_tasks)
         file_menu.add_command(label="Import (paste text)…", command=self.import_tasks_paste)
+        file_menu.add_command(label="Export Tasks…", command=self.export_tasks)
+        file_menu.add_command(label="Export Documents to Folder", command=self.export_documents_to_folder)
+        file_menu.add_command(label="Re-import Edited Documents", command=self.reimport_documents)
         file_menu.add_separator()
         file_menu.add_command(label="Open Repository Folder", command=self.open_repository_folder)
         menubar.add_cascade(label="File", menu=file_menu)
@@ -89,6 +123,8 @@ class TaskApp(ActionsMixin, tk.Tk):
         menubar.add_cascade(label="Journal", menu=journal_menu)
 
         view_menu = tk.Menu(menubar, tearoff=0)
+        view_menu.add_command(label="Search Everything…", command=self.open_search, accelerator="Ctrl+Shift+F")
+        view_menu.add_separator()
         view_menu.add_command(label="Toggle Dark Mode", command=self.toggle_theme)
         view_menu.add_separator()
         view_menu.add_command(label="Open Web App in Browser", command=self.open_web_app)
@@ -187,7 +223,7 @@ class TaskApp(ActionsMixin, tk.Tk):
             st["ui_category_scope"] = self.category_filter_var.get()
             st["ui_time_scope"] = self.time_filter_var.get()
             st["ui_time_custom_date"] = self.custom_time_date
-            save_db(self.db)
+            self.save_store()
             self._sync_custom_date_button()
             self.refresh()
 
@@ -210,7 +246,7 @@ class TaskApp(ActionsMixin, tk.Tk):
         def _apply_minprio(*_):
             s = self.db.setdefault("settings", {})
             s["min_priority_visible"] = self.minprio_ui.get()
-            save_db(self.db)
+            self.save_store()
             self.refresh()
         mincombo.bind("<<ComboboxSelected>>", _apply_minprio)
 
@@ -220,7 +256,7 @@ class TaskApp(ActionsMixin, tk.Tk):
         def _apply_group_view():
             s = self.db.setdefault("settings", {})
             s["ui_group_view"] = bool(self.group_view.get())
-            save_db(self.db)
+            self.save_store()
             self.refresh()
 
         ttk.Checkbutton(filt, text="Group view", variable=self.group_view, command=_apply_group_view) \
@@ -314,14 +350,33 @@ class TaskApp(ActionsMixin, tk.Tk):
         self.reset_repeating_tasks(catchup=True)
         self.schedule_midnight_reset()
         self.after(600, self._maybe_show_mantra_on_launch)
+        self.inbox = InboxWatcher()
+        self.after(1500, self._poll_inbox)
+        self.after(1000, self._poll_document_errors)
 
         # Keyboard shortcuts
         self.bind("<Delete>", lambda e: self.soft_delete())
         self.bind("<Control-Return>", lambda e: self.mark_done())
+        self.bind("<Control-Shift-F>", lambda e: self.open_search())
 
         # Pick up external edits (e.g. from the web app) when the window regains focus.
         self.bind("<FocusIn>", self._on_focus_in)
 
+    def save_store(self):
+        """Save ``self.db``. Whatever the web server wrote since we last read the
+        store (edits, its inbox imports) is merged in first instead of undone;
+        fields both sides changed keep our value, and the user is told."""
+        folded = save_db(self.db, rebase=True)
+        for t in folded["moved"]:
+            self.doc_io.sync_task(t, write_notes=False)  # added here meanwhile, moved to a new id
+        if folded["conflicts"]:
+            lines = [f"• {t.get('title') or t['id']}: {', '.join(fields)}" for t, fields in folded["conflicts"][:10]]
+            self.status_var.set(f"{len(folded['conflicts'])} task(s) were also changed in the web app")
+            messagebox.showwarning(
+                "Changed in two places",
+                "These tasks were changed in the web app while you edited them here.\n"
+                "Your changes were kept for:\n\n" + "\n".join(lines))
+
     def _on_focus_in(self, event=None):
         """Reload if the store changed externally since our last read (web edits)."""
         if event is not None and event.widget is not self:
@@ -329,10 +384,31 @@ class TaskApp(ActionsMixin, tk.Tk):
         try:
             rev = current_rev()
             if rev is not None and rev != self.db.get("_rev"):
-                self.db = load_db()
+                self.db = load_db(keep_base=True)
                 self.refresh()
+            self._reimport_documents()
         except Exception:
             pass
+    def _poll_inbox(self):
+        """Import lines dropped/appended into data/inbox/*.txt, then re-poll."""
+        try:
+            result = self.inbox.poll()
+            if result["added"]:
+                self.db = load_db(keep_base=True)
+                self.refresh()
+                self.status_var.set(f"Inbox: imported {result['added']} task(s)"
+                                    + (f", {result['failed']} invalid" if result["failed"] else ""))
+        except Exception:
+            logger.exception("inbox poll failed")
+        self.after(INBOX_POLL_SECONDS * 1000, self._poll_inbox)
+
+    def _poll_document_errors(self):
+        errors = self.doc_io.drain_errors()
+        if errors:
+            self.status_var.set(errors[-1])
+            messagebox.showwarning("Document write failed", "\n".join(errors[:5]))
+        self.after(1000, self._poll_document_errors)
+
     # ===== Repeat resets =====
     def schedule_midnight_reset(self):
         now = datetime.now()
@@ -341,12 +417,15 @@ class TaskApp(ActionsMixin, tk.Tk):
         self.after(delay_ms, lambda: self.reset_repeating_tasks(catchup=False))
 
     def reset_repeating_tasks(self, catchup: bool):
-        """Advance repeating tasks whose next occurrence is already due (midnight reset)."""
-        changed = scheduler.advance_repeating_tasks(
+        """Advance repeating tasks whose next occurrence is already due (midnight reset),
+        then compact stale reminder acknowledgements."""
+        result = scheduler.run_maintenance(
             self.db, today=date.today(), hazard_enabled=self._hazard_enabled()
         )
-        if changed:
-            save_db(self.db)
+        if result["bytes_reclaimed"]:
+            logger.debug("maintenance reclaimed %d bytes", result["bytes_reclaimed"])
+        if result["changed"]:
+            self.save_store()
             self.refresh()
 
         # schedule next midnight-run (unchanged semantics)
@@ -403,7 +482,7 @@ class TaskApp(ActionsMixin, tk.Tk):
                 t.pop("base_priority", None)
                 changed = True
         if changed:
-            save_db(self.db)
+            self.save_store()
             self.refresh()
         messagebox.showinfo("Hazard Escalation", "Hazard escalation has been reset for all tasks.")
 
@@ -491,7 +570,7 @@ class TaskApp(ActionsMixin, tk.Tk):
     def toggle_theme(self):
         new_mode = "light" if self._theme_mode == "dark" else "dark"
         self.db.setdefault("settings", {})["ui_theme"] = new_mode
-        save_db(self.db)
+        self.save_store()
         self._apply_theme(new_mode)
         self.refresh()
 
@@ -499,6 +578,8 @@ class TaskApp(ActionsMixin, tk.Tk):
         title = task.get("title", "")
         if self._hazard_enabled() and int(task.get("skip_count", 0)) >= 1:
             return f"⚠ {title}"
+        if task.get("possible_duplicate"):
+            return f"⧉ {title}"
         return title
 
     def _title_candidates(self):
@@ -519,6 +600,12 @@ class TaskApp(ActionsMixin, tk.Tk):
         iid = tree.identify_row(event.y)
         kind = self.list.identify_row_kind(iid)
 
+        if kind == "header" and iid != "g::_UNGROUPED_":
+            group = iid[len("g::"):]
+            menu = tk.Menu(self, tearoff=0)
+            menu.add_command(label=f"Rename Group “{group}”…", command=lambda: self.rename_group(group))
+            menu.tk_popup(event.x_root, event.y_root)
+            return
         if not iid or kind != "task":
             return  # only allow popup on real task rows
 
@@ -608,11 +695,16 @@ class TaskApp(ActionsMixin, tk.Tk):
         if not sels:
             return
         task = sels[0]
+        if document_backend() == "sqlite":
+            self._reimport_documents()  # take edits of an earlier export first
+            open_document(export_task_document(task))
+            return
+        self.doc_io.flush()  # queued writes for this file must land before we read it
         move_task_document_if_needed(task)
         # Read external changes before opening
         if read_task_notes_from_file(task):
             # Save DB only if external changes were detected and applied
-            save_db(self.db)
+            self.save_store()
         else:
             # No external changes, ensure file is synced with current notes
             # (save_db not needed here as sync_task_notes doesn't modify task)
@@ -653,9 +745,8 @@ class TaskApp(ActionsMixin, tk.Tk):
         }
         self.db["tasks"].append(t)
         self.db["next_id"] += 1
-        save_db(self.db)
-        sync_task_notes(t)
-        save_db(self.db)
+        self.doc_io.sync_task(t)  # sets doc_path now, writes the file off-thread
+        self.save_store()
         self.title_var.set("")
         self.due_var.set("")
         self.notes_txt.delete("1.0", "end")
@@ -682,9 +773,8 @@ class TaskApp(ActionsMixin, tk.Tk):
             "group": ""
         }
         self.db["tasks"].append(t); self.db["next_id"] += 1
-        save_db(self.db)
-        sync_task_notes(t)
-        save_db(self.db)
+        self.doc_io.sync_task(t)
+        self.save_store()
         self.title_var.set("")
         self.refresh(select_id=t["id"])
         return "break"
@@ -705,9 +795,9 @@ class TaskApp(ActionsMixin, tk.Tk):
             t["notes"] = data["notes"]
             t["group"] = data.get("group","").strip()
             t["updated_at"] = datetime.now().isoformat(timespec="seconds")
-            move_task_document_if_needed(t)
-            sync_task_notes(t)
-            save_db(self.db)
+            t.pop("possible_duplicate", None)  # reviewed: an edit clears the import flag
+            self.doc_io.sync_task(t)
+            self.save_store()
             self.refresh(select_id=t["id"])
         EditDialog(self, t, on_save)
 
@@ -758,7 +848,7 @@ class TaskApp(ActionsMixin, tk.Tk):
         st = self.db.setdefault("settings", {})
         st["ui_time_scope"] = "custom"
         st["ui_time_custom_date"] = self.custom_time_date
-        save_db(self.db)
+        self.save_store()
         self._sync_custom_date_button()
         self.refresh()
 
@@ -770,7 +860,7 @@ class TaskApp(ActionsMixin, tk.Tk):
         st = self.db.setdefault("settings", {})
         st["ui_category_scope"] = "active"
         st["ui_time_scope"] = "today"
-        save_db(self.db)
+        self.save_store()
         self._sync_custom_date_button()
         self.refresh()
 
@@ -786,11 +876,19 @@ class TaskApp(ActionsMixin, tk.Tk):
         query = self.search_var.get().strip()
         col, asc = self.sort_state
 
-        tasks = [
-            t for t in self.db["tasks"]
-            if self.passes_filter(t, category_scope, time_scope) and filters.search_match(t, query)
-        ]
-        tasks.sort(key=lambda x: filters.sort_key_for(x, col), reverse=not asc)
+        pool = self.db["tasks"]
+        if query:
+            self._sync_text_index()
+            pool = [self._task_by_id[i] for i in self.text_index.search(query)]
+        tasks = [t for t in pool if self.passes_filter(t, category_scope, time_scope)]
+        fuzzy = False
+        if query and not tasks:
+            # Nothing contains the text: show near matches (typos), best first.
+            ranked = (self._task_by_id[i] for i, _ in self.text_index.fuzzy(query))
+            tasks = [t for t in ranked if self.passes_filter(t, category_scope, time_scope)]
+            fuzzy = bool(tasks)
+        else:
+            tasks.sort(key=lambda x: filters.sort_key_for(x, col), reverse=not asc)
         for t in tasks:
             t["_display_title"] = self._display_title(t)
 
@@ -819,8 +917,10 @@ class TaskApp(ActionsMixin, tk.Tk):
                     self.list.tree.see(iid)
                     break
         self._apply_sort_indicators(category_scope)
-        self._update_status(len(tasks))
+        self._update_status(len(tasks), fuzzy=fuzzy)
         self._update_action_buttons()
+        if self.db.get("_rev") != self._reminders_rev:
+            self._arm_reminders()
 
     def _apply_sort_indicators(self, scope: str):
         """Show ▲/▼ on the active sort column header so the current sort is visible."""
@@ -830,19 +930,36 @@ class TaskApp(ActionsMixin, tk.Tk):
             base = "DELETED" if (c == "due" and scope == "deleted") else self.list.HEADERS[c]
             self.list.tree.heading(c, text=base + (arrow if c == col else ""))
 
-    def _update_status(self, shown: int):
+    def _data_key(self):
+        """Changes whenever the task data may have: a save bumps ``_rev``; a
+        reload or a list rebuild replaces the objects."""
+        return (id(self.db), id(self.db["tasks"]), len(self.db["tasks"]), self.db.get("_rev"))
+
+    def _sync_text_index(self):
+        key = self._data_key()
+        if key != self._text_index_key:
+            self.text_index.sync(self.db["tasks"])
+            self._task_by_id = {t["id"]: t for t in self.db["tasks"]}
+            self._text_index_key = key
+
+    def _update_status(self, shown: int, fuzzy: bool = False):
         if not hasattr(self, "status_var"):
             return
         today = date.today()
-        open_count = sum(
-            1 for t in self.db["tasks"]
-            if not t.get("completed_at") and not t.get("is_deleted") and not t.get("is_suspended")
-        )
-        done_today = sum(
-            1 for t in self.db["tasks"]
-            if str(t.get("completed_at", ""))[:10] == today.isoformat()
-        )
-        self.status_var.set(f"Showing {shown}   ·   Open {open_count}   ·   Done today {done_today}")
+        key = (self._data_key(), today)
+        if not self._status_counts or self._status_counts[0] != key:
+            open_count = sum(
+                1 for t in self.db["tasks"]
+                if not t.get("completed_at") and not t.get("is_deleted") and not t.get("is_suspended")
+            )
+            done_today = sum(
+                1 for t in self.db["tasks"]
+                if str(t.get("completed_at", ""))[:10] == today.isoformat()
+            )
+            self._status_counts = (key, open_count, done_today)
+        _, open_count, done_today = self._status_counts
+        shown_text = f"No exact matches · {shown} similar" if fuzzy else f"Showing {shown}"
+        self.status_var.set(f"{shown_text}   ·   Open {open_count}   ·   Done today {done_today}")
 
     # ===== Stats / Settings / Reminders =====
     def open_help(self, initial_tab: str = "tutorial"):
@@ -881,23 +998,105 @@ class TaskApp(ActionsMixin, tk.Tk):
         if settings.get("last_mantra_date") == today_key:
             return
         settings["last_mantra_date"] = today_key
-        save_db(self.db)
+        self.save_store()
         self.open_mantras()
 
     def open_journal(self):
         def _add_entry(text: str):
-            append_journal_manual(text)
+            self.doc_io.append_journal_manual(text)
 
         def _open_file():
+            self.doc_io.flush()
             path = ensure_journal_path()
             open_document(path)
 
         JournalDialog(self, on_add_entry=_add_entry, on_open_file=_open_file)
 
+    def open_search(self):
+        def _search(query):
+            self.doc_io.flush()  # index what was just written, too
+            try:
+                return search.search(query, limit=50, highlight=("«", "»"))
+            except Exception as e:
+                logger.exception("search failed")
+                self.status_var.set(f"Search failed: {e}")
+                return []
+
+        def _open(hit):
+            if hit["kind"] == "task":
+                self._reveal_task(hit["ref"])
+            elif hit["kind"] == "journal":
+                self.doc_io.flush()
+                open_document(ensure_journal_path(date.fromisoformat(hit["ref"])))
+            elif hit["path"]:
+                self.doc_io.flush()
+                open_document(Path(hit["path"]))
+            elif get_task(self.db, hit["ref"]):
+                self._reimport_documents()
+                open_document(export_task_document(get_task(self.db, hit["ref"])))
+
+        SearchDialog(self, on_search=_search, on_open=_open)
+
+    def _reveal_task(self, tid: int):
+        """Select a task in the list, widening the filters if it's hidden."""
+        t = get_task(self.db, tid)
+        if not t:
+            return
+        if not self.passes_filter(t, self.category_filter_var.get(), self.time_filter_var.get()):
+            category = ("suspended" if t.get("is_suspended") else
+                        "done" if t.get("completed_at") else "all")
+            self.category_filter_var.set(category)
+            self.time_filter_var.set("any")
+        self.search_var.set("")
+        self.refresh(select_id=tid)
+
     def open_today_journal(self):
+        self.doc_io.flush()
         path = ensure_journal_path()
         open_document(path)
     
+    # ===== Document backend =====
+    def _apply_document_backend(self, name: str) -> None:
+        """Switch backends, carrying the documents across (see core.documents)."""
+        if name == document_backend():
+            return
+        self.doc_io.flush()
+        if name == "sqlite":
+            set_document_backend("sqlite")
+            changed = import_documents(self.db["tasks"], scan=True)
+            if changed:
+                self.save_store()
+        else:
+            self._reimport_documents()
+            export_documents(self.db["tasks"])
+            set_document_backend(name)
+            self.doc_io.reconcile(self.db["tasks"])
+        self.refresh()
+
+    def _reimport_documents(self) -> None:
+        """SQLite backend: pull in edits made to exported document files."""
+        if document_backend() != "sqlite":
+            return
+        if import_documents(self.db["tasks"]):
+            self.save_store()
+            self.refresh()
+
+    def reimport_documents(self):
+        if document_backend() != "sqlite":
+            messagebox.showinfo("Documents", "Documents are stored as files; there is nothing to re-import.")
+            return
+        self._reimport_documents()
+        self.status_var.set("Re-imported edited documents")
+
+    def export_documents_to_folder(self):
+        if document_backend() != "sqlite":
+            messagebox.showinfo("Documents", "Documents are already stored as files in the data folder.")
+            return
+        self._reimport_documents()
+        stats = export_documents(self.db["tasks"])
+        self.status_var.set(f"Exported {stats['tasks']} task document(s) and {stats['journals']} journal(s)"
+                            + (f"; kept {stats['kept']} edited file(s)" if stats["kept"] else ""))
+
     def open_repository_folder(self):
         """Open the data directory in the system file explorer."""
         open_directory(DATA_DIR)
@@ -908,12 +1107,15 @@ class TaskApp(ActionsMixin, tk.Tk):
         open_document(path)
 
     def import_tasks_paste(self):
-        def _do(text):
-            added, failed, details = import_from_string(text, self.db, return_details=True)
-            if added:
-                save_db(self.db)
+        def _do(text, duplicates):
+            dupes = []
+            added, failed, details = import_from_string(
+                text, self.db, return_details=True, duplicates=duplicates,
+                on_duplicate=lambda line_no, tid: dupes.append(line_no))
+            if added or (dupes and duplicates == "merge"):
+                self.save_store()
                 self.refresh()
-            return added, failed, details
+            return added, failed, details, len(dupes)
 
         PasteImportDialog(self, on_import_text=_do)
 
@@ -922,35 +1124,61 @@ class TaskApp(ActionsMixin, tk.Tk):
         StatsDialog(self, summary)
 
     def import_tasks(self):
-        from .core.io_import import import_from_txt
+        from .core.io_import import import_file_stream
         path = filedialog.askopenfilename(title="Import tasks",
                                           filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
         if not path: return
         try:
-            added, failed, details = import_from_txt(path, self.db, return_details=True)
+            # Streamed straight into the store in batches (constant memory, the
+            # existing tasks are not rewritten); then pick the new rows up.
+            def _progress(added, failed, lines_read):
+                self.status_var.set(f"Importing… {added} added, {failed} skipped ({lines_read} lines)")
+                self.update_idletasks()
+            # Lines matching an existing task (title/group/due/repeat) are skipped.
+            dupes = []
+            added, failed, details = import_file_stream(
+                path, on_progress=_progress, duplicates="skip", on_duplicate=lambda line_no, tid: dupes.append(line_no))
             if added:
-                save_db(self.db)
-                self.refresh()
+                self.db = load_db(keep_base=True)
+            self.refresh()
+            dup_note = f" Skipped {len(dupes)} duplicate(s)." if dupes else ""
             if failed:
                 detail_preview = "\n".join(f"- {d}" for d in details[:8])
                 extra = "" if len(details) <= 8 else f"\n...and {len(details)-8} more."
                 messagebox.showwarning(
                     "Import",
-                    f"Imported {added} task(s). Skipped {failed} line(s).\n\nReasons:\n{detail_preview}{extra}"
+                    f"Imported {added} task(s). Skipped {failed} line(s).{dup_note}\n\nReasons:\n{detail_preview}{extra}"
                 )
                 logger.debug("import skipped lines: %s", details)
             else:
-                messagebox.showinfo("Import", f"Imported {added} task(s).")
+                messagebox.showinfo("Import", f"Imported {added} task(s).{dup_note}")
         except Exception as e:
             messagebox.showerror("Import failed", str(e))
 
+    def export_tasks(self):
+        from .core.io_export import export_to_file
+        path = filedialog.asksaveasfilename(
+            title="Export tasks", defaultextension=".txt",
+            initialfile=f"tasks-{date.today().isoformat()}.txt",
+            filetypes=[("Import format (re-importable)", "*.txt"), ("JSON Lines", "*.jsonl"),
+                       ("CSV", "*.csv")])
+        if not path: return
+        fmt = {".jsonl": "jsonl", ".csv": "csv"}.get(Path(path).suffix.lower(), "pipe")
+        try:
+            # Streams from the store, so unsaved in-memory state isn't involved.
+            count = export_to_file(path, fmt)
+            messagebox.showinfo("Export", f"Exported {count} task(s) to {Path(path).name}.")
+        except Exception as e:
+            messagebox.showerror("Export failed", str(e))
+
     def open_settings(self):
         def on_save(s):
             merged = normalize_settings(self.db.get("settings", {}))
             reset_requested = bool(s.pop("reset_hazard_escalation", False))
             merged.update(s)
             self.db["settings"] = merged
-            save_db(self.db)
+            self.save_store()
+            self._apply_document_backend(merged["document_backend"])
             if reset_requested:
                 self.reset_hazard_escalation()
         SettingsDialog(self, self.db.get("settings", None), on_save)
@@ -969,10 +1197,41 @@ class TaskApp(ActionsMixin, tk.Tk):
                     acks = set(task.get("acknowledged_checkpoints", []))
                     acks.add(key)
                     task["acknowledged_checkpoints"] = sorted(acks)
-            save_db(self.db)
+            self.save_store()
 
         RemindersDialog(self, pending, on_ack)
 
+    # ===== Reminder dispatch =====
+    def _arm_reminders(self):
+        """Rebuild the checkpoint heap from self.db and sleep until the earliest one."""
+        self._reminders_rev = self.db.get("_rev")
+        self.reminder_schedule.rebuild(self.db)
+        self._schedule_reminder_wakeup()
+
+    def _schedule_reminder_wakeup(self):
+        if self._reminder_after is not None:
+            self.after_cancel(self._reminder_after)
+            self._reminder_after = None
+        nxt = self.reminder_schedule.next_instant()
+        if nxt is None:
+            return
+        delay_ms = int((nxt - datetime.now()).total_seconds() * 1000)
+        # Tk timers overflow past ~24 days; re-arming from the heap later is free.
+        delay_ms = min(max(0, delay_ms), 6 * 3600 * 1000)
+        self._reminder_after = self.after(delay_ms, self._on_reminder_timer)
+
+    def _on_reminder_timer(self):
+        self._reminder_after = None
+        nxt = self.reminder_schedule.next_instant()
+        if nxt is not None and nxt <= datetime.now():
+            events = self.reminder_schedule.pop_due()
+            for ev in events:
+                logger.debug("reminder fired: %s", ev)
+                ReminderToast(self, ev, on_open=self.open_reminders)
+            if events:
+                self.refresh()  # surface the ⏰ chip
+        self._schedule_reminder_wakeup()
+
     def _reminder_chip(self, t) -> str:
         from .core.reminders import reminder_chip
         return reminder_chip(t, self.db.get("settings", {}))
@@ -980,6 +1239,7 @@ class TaskApp(ActionsMixin, tk.Tk):
 def main():
     app = TaskApp()
     app.mainloop()
+    app.doc_io.close()  # flush queued document/journal writes before exiting
 
 if __name__ == "__main__":
     main()
@@ -5,8 +5,7 @@ from tkinter import ttk, messagebox, simpledialog
 from datetime import date, datetime, timedelta
 
 from .dates import parse_due_entry, fmt_due_for_store, parse_stored_due, add_months_dateonly, next_due
-from .model import save_db
-from .documents import append_journal_task
+from .documents import deferred, rename_group
 from ..ui.controls import AutoCompleteEntry
 
 logger = logging.getLogger(__name__)
@@ -16,6 +15,7 @@ class ActionsMixin:
         sel_ids = [t["id"] for t in self.selected_tasks()]
         logger.debug("mark_done selected ids: %s", sel_ids)
 
+        completed_titles = []
         for t in self.selected_tasks():
             before_due = t.get("due", "")
             rep = (t.get("repeat") or "none").lower()
@@ -29,7 +29,7 @@ class ActionsMixin:
                 t["priority"] = t.get("base_priority", t.get("priority", "M"))
                 t.pop("base_priority", None)
 
-            append_journal_task(t.get("title", ""))
+            completed_titles.append(t.get("title", ""))
 
             if rep != "none":
                 cur = t.get("due", "")
@@ -53,7 +53,9 @@ class ActionsMixin:
                 t["id"], rep, before_due, after_due, t.get("completed_at"),
             )
 
-        save_db(self.db)
+        with deferred():  # SQLite documents: the journal lines commit with the save
+            self.doc_io.append_journal_tasks(completed_titles)  # one queued append for the selection
+            self.save_store()
         self.refresh()
 
     def soft_delete(self):
@@ -63,7 +65,7 @@ class ActionsMixin:
         for t in self.selected_tasks():
             t["is_deleted"] = True
             t["deleted_at"] = ts
-        save_db(self.db)
+        self.save_store()
         self.refresh()
 
     def restore(self):
@@ -72,7 +74,7 @@ class ActionsMixin:
         for t in self.selected_tasks():
             t["is_deleted"] = False
             t.pop("deleted_at", None)
-        save_db(self.db)
+        self.save_store()
         self.refresh()
 
     def suspend_tasks(self):
@@ -82,7 +84,7 @@ class ActionsMixin:
                 t["is_suspended"] = True
                 changed = True
         if changed:
-            save_db(self.db)
+            self.save_store()
             self.refresh()
 
     def unsuspend_tasks(self):
@@ -92,7 +94,7 @@ class ActionsMixin:
                 t["is_suspended"] = False
                 changed = True
         if changed:
-            save_db(self.db)
+            self.save_store()
             self.refresh()
 
     def hard_delete(self):
@@ -105,7 +107,7 @@ class ActionsMixin:
         logger.debug("HARD delete ids: %s", ids)
         # remove from DB
         self.db["tasks"] = [t for t in self.db["tasks"] if t["id"] not in ids]
-        save_db(self.db)
+        self.save_store()
         self.refresh()
 
     # ===== Bulk helpers =====
@@ -117,7 +119,7 @@ class ActionsMixin:
                 t["repeat"] = "daily"
             changed = True
         if changed:
-            save_db(self.db)
+            self.save_store()
             self.refresh()
 
     def set_repeat_bulk(self, rep: str):
@@ -132,7 +134,23 @@ class ActionsMixin:
             t["repeat"] = target_rep
             changed = True
         if changed:
-            save_db(self.db)
+            self.save_store()
+            self.refresh()
+
+    def _move_documents(self, tasks):
+        # Group folders are part of the document path: one bulk job, which turns
+        # a whole group moving into a single folder rename.
+        self.doc_io.move_tasks(tasks)
+
+    def rename_group(self, old_group: str):
+        new_group = simpledialog.askstring("Rename Group", f"New name for “{old_group}”:",
+                                           initialvalue=old_group, parent=self)
+        if new_group is None or not new_group.strip():
+            return
+        changed = rename_group(self.db["tasks"], old_group, new_group)
+        if changed:
+            self._move_documents(changed)
+            self.save_store()
             self.refresh()
 
     def set_group_bulk(self, clear: bool = False):
@@ -143,7 +161,8 @@ class ActionsMixin:
                     t["group"] = ""
                     changed = True
             if changed:
-                save_db(self.db)
+                self._move_documents(self.selected_tasks())
+                self.save_store()
                 self.refresh()
             return
 
@@ -180,7 +199,8 @@ class ActionsMixin:
                     t["group"] = g
                     changed = True
             if changed:
-                save_db(self.db)
+                self._move_documents(self.selected_tasks())
+                self.save_store()
                 self.refresh()
             win.destroy()
 
@@ -218,7 +238,7 @@ class ActionsMixin:
             t["due"] = val
             changed = True
         if changed:
-            save_db(self.db)
+            self.save_store()
             self.refresh()
 
     # ===== Bump =====
@@ -230,7 +250,7 @@ class ActionsMixin:
             else:
                 t["due"] = (dt + timedelta(days=n)).strftime("%Y-%m-%d %H:%M")
             t["bumped_count"] = t.get("bumped_count", 0) + 1
-        save_db(self.db)
+        self.save_store()
         self.refresh()
 
     def bump_weeks(self, n: int):
@@ -247,5 +267,5 @@ class ActionsMixin:
                 # keep simple 30-day month bump for time-of-day tasks
                 t["due"] = (dt + timedelta(days=30)).strftime("%Y-%m-%d %H:%M")
             t["bumped_count"] = t.get("bumped_count", 0) + 1
-        save_db(self.db)
+        self.save_store()
         self.refresh()
@@ -56,17 +56,32 @@ MONTH_MAP = {
     "dec": 12, "december": 12,
 }
 
+# Patterns are compiled once; the parser tokenizes the input a single time and
+# dispatches on the first token instead of trying every format in turn.
+_TIME_COLON_RE = re.compile(r'^(\d{1,2}):(\d{2})$')
+_TIME_DIGITS_RE = re.compile(r'^(\d{3,4})$')
+_ISO_DATE_RE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})$')
+_ISO_TIME_RE = re.compile(r'^(\d{2}):?(\d{2})$')        # after YYYY-MM-DD: minutes required
+_MMDD_RE = re.compile(r'^(\d{1,2})/(\d{1,2})$')
+_MMDD_TIME_RE = re.compile(r'^(\d{2})(?::?(\d{2}))?$')  # after MM/DD: minutes optional
+_DAY_NUM_RE = re.compile(r'^\d{1,2}$')
+_YEAR_RE = re.compile(r'^\d{4}$')
+_REL_TOKEN_RE = re.compile(r'^([+-])(\d+)([dhmw])$')
+
+_REL_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+
 def _end_of_day(dt: datetime) -> datetime:
     return dt.replace(hour=23, minute=59, second=0, microsecond=0)
 
 def _parse_time_token(tail: str):
     """Parse 'HH:MM' or 'HHMM' -> (hh, mm), else None. Returns None on out-of-range."""
-    m = re.match(r'^(\d{1,2}):(\d{2})$', tail) or re.match(r'^(\d{3,4})$', tail)
-    if not m:
-        return None
-    if ":" in tail:
+    m = _TIME_COLON_RE.match(tail)
+    if m:
         hh, mm = int(m.group(1)), int(m.group(2))
     else:
+        m = _TIME_DIGITS_RE.match(tail)
+        if not m:
+            return None
         raw = m.group(1)
         if len(raw) == 3:
             raw = "0" + raw
@@ -95,148 +110,144 @@ def _combine_with_tail(target_date: date, tail_tokens):
         return base.replace(hour=hm[0], minute=hm[1])
     return None
 
-def _has_time_tokens(tokens):
-    for tok in tokens:
-        m = re.match(r'^[+-](\d+)([hm])$', tok.lower())
-        if m:
-            return True
-    for tok in tokens:
-        if tok.lower() in ('+0m', '+0h'):
-            return True
-    return False
-
-def parse_due_flexible(s: Optional[str]):
-    """Parse flexible due strings.
-       Returns:
-         - None for empty
-         - datetime for precise
-         - ('dateonly', datetime) for date-only precision
-
-    Accepts:
-      - 'YYYY-MM-DD' [ 'HHMM' | 'HH:MM' | 'midnight' ]
-      - 'MM/DD' [ 'HHMM' | 'HH:MM' | 'midnight' ]
-      - 'midnight'  (today 23:59)
-      - relative tokens: '+2d +5h -3h +1w' (optional 'midnight' to force 23:59)
-    """
-    if not s or not s.strip():
+def _with_time(d: datetime, hh: int, mm: int):
+    """``d`` at hh:mm, or None for an out-of-range time (e.g. '2599')."""
+    if hh > 23 or mm > 59:
         return None
-    s = s.strip()
+    return d.replace(hour=hh, minute=mm)
 
-    # Plain 'midnight' -> today 23:59
-    if s.lower() == "midnight":
-        now = datetime.now()
-        return now.replace(hour=23, minute=59, second=0, microsecond=0)
+# ----- first-token handlers: (tokens, lowered tokens, now) -> parsed | None -----
 
-    # Plain dayparts -> today at a sensible time
-    if s.lower() in DAYPART_MAP:
-        now = datetime.now()
-        hh, mm = DAYPART_MAP[s.lower()]
-        return now.replace(hour=hh, minute=mm, second=0, microsecond=0)
+def _parse_relday(tokens, lowered, now):
+    # 'today' / 'tomorrow' / 'yesterday' with optional time/daypart
+    target_date = now.date() + timedelta(days=RELDAY_MAP[lowered[0]])
+    return _combine_with_tail(target_date, tokens[1:])
 
-    tokens = s.split()
+def _parse_weekday(tokens, lowered, now):
+    # weekday names with optional time or daypart (today counts as the next one)
+    today = now.date()
+    days_ahead = (WEEKDAY_MAP[lowered[0]] - today.weekday()) % 7
+    return _combine_with_tail(today + timedelta(days=days_ahead), tokens[1:])
 
-    # Relative day words ('today', 'tomorrow', 'yesterday') with optional time/daypart
-    if tokens and tokens[0].lower() in RELDAY_MAP:
-        target_date = date.today() + timedelta(days=RELDAY_MAP[tokens[0].lower()])
-        res = _combine_with_tail(target_date, tokens[1:])
-        if res is not None:
-            return res
-
-    # Weekday names with optional time or daypart
-    if tokens:
-        day_key = tokens[0].lower()
-        if day_key in WEEKDAY_MAP:
-            today = date.today()
-            target = WEEKDAY_MAP[day_key]
-            days_ahead = (target - today.weekday()) % 7
-            target_date = today + timedelta(days=days_ahead)
-            res = _combine_with_tail(target_date, tokens[1:])
-            if res is not None:
-                return res
-
-    # Month-name dates ('Sept 29', 'September 29 2026', 'sep 29 14:00')
-    if len(tokens) >= 2:
-        month_key = re.sub(r'\.$', '', tokens[0].lower())
-        if month_key in MONTH_MAP and re.match(r'^\d{1,2}$', tokens[1]):
-            mon, day = MONTH_MAP[month_key], int(tokens[1])
-            rest = tokens[2:]
-            year = datetime.now().year
-            if rest and re.match(r'^\d{4}$', rest[0]):
-                year = int(rest[0])
-                rest = rest[1:]
-            try:
-                target_date = date(year, mon, day)
-            except ValueError:
-                return None
-            res = _combine_with_tail(target_date, rest)
-            if res is not None:
-                return res
-
-    # Absolute YYYY-MM-DD with optional time or 'midnight'
-    m = re.match(r'^(\d{4}-\d{2}-\d{2})(?:\s+(\d{2})(?::?(\d{2}))|\s+midnight)?$', s, re.IGNORECASE)
-    if m:
-        d = datetime.strptime(m.group(1), "%Y-%m-%d")
-        if m.group(2):
-            hh = int(m.group(2)); mm = int(m.group(3) or 0)
-            return d.replace(hour=hh, minute=mm)
-        if s.lower().endswith("midnight"):
-            return d.replace(hour=23, minute=59)
-        return ('dateonly', d)
+def _parse_month_name(tokens, lowered, now):
+    # 'Sept 29', 'September 29 2026', 'sep 29 14:00'
+    if len(tokens) < 2 or not _DAY_NUM_RE.match(tokens[1]):
+        return None
+    mon, day = MONTH_MAP[lowered[0].rstrip(".")], int(tokens[1])
+    rest = tokens[2:]
+    year = now.year
+    if rest and _YEAR_RE.match(rest[0]):
+        year = int(rest[0])
+        rest = rest[1:]
+    try:
+        target_date = date(year, mon, day)
+    except ValueError:
+        return None
+    return _combine_with_tail(target_date, rest)
 
-    # Absolute MM/DD with optional time or 'midnight'
-    m2 = re.match(r'^(\d{1,2})/(\d{1,2})(?:\s+(\d{2})(?::?(\d{2}))?|\s+midnight)?$', s, re.IGNORECASE)
-    if m2:
-        y = datetime.now().year
-        mon, day = int(m2.group(1)), int(m2.group(2))
+def _parse_numeric_date(tokens, lowered, now):
+    # 'YYYY-MM-DD' [HHMM|HH:MM|midnight]  or  'MM/DD' [HH|HHMM|HH:MM|midnight]
+    if len(tokens) > 2:
+        return None
+    tail = lowered[1] if len(tokens) == 2 else ""
+    m = _ISO_DATE_RE.match(tokens[0])
+    if m:
+        try:
+            d = datetime(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+        except ValueError:
+            return None
+        time_re = _ISO_TIME_RE
+    else:
+        m = _MMDD_RE.match(tokens[0])
+        if not m:
+            return None
         try:
-            d = datetime(year=y, month=mon, day=day)
+            d = datetime(year=now.year, month=int(m.group(1)), day=int(m.group(2)))
         except ValueError:
             return None
-        if m2.group(3):
-            hh = int(m2.group(3)); mm = int(m2.group(4) or 0)
-            return d.replace(hour=hh, minute=mm)
-        if s.lower().endswith("midnight"):
-            return d.replace(hour=23, minute=59)
+        time_re = _MMDD_TIME_RE
+    if not tail:
         return ('dateonly', d)
-
-    # Relative tokens with optional 'midnight'
-    tokens = s.split()
-    midnight_flag = any(tok.lower() == 'midnight' for tok in tokens)
-    tokens = [t for t in tokens if t.lower() != 'midnight']
-
-    ok = True
-    for tok in tokens:
-        if re.match(r'^[+-]\d+[dhmw]$', tok.lower()) or tok.lower() in ('+0m', '+0h'):
-            continue
-        ok = False; break
-    if not ok or not tokens:
+    if tail == "midnight":
+        return d.replace(hour=23, minute=59)
+    t = time_re.match(tail)
+    if not t:
         return None
+    return _with_time(d, int(t.group(1)), int(t.group(2) or 0))
 
-    now = datetime.now()
+def _parse_relative(tokens, lowered, now):
+    # '+2d +5h -3h +1w' with optional 'midnight' (forces 23:59 when no h/m token)
+    midnight_flag = "midnight" in lowered
+    rel = [tl for tl in lowered if tl != "midnight"]
+    if not rel:
+        return None
     total = timedelta()
-    for tok in tokens:
-        tl = tok.lower()
-        if tl in ('+0m', '+0h'):
-            continue
-        m = re.match(r'^([+-])(\d+)([dhmw])$', tl)
-        sign = 1 if m.group(1) == '+' else -1
-        amt = int(m.group(2)) * sign
+    has_time = False
+    for tl in rel:
+        m = _REL_TOKEN_RE.match(tl)
+        if not m:
+            return None
+        amt = int(m.group(2)) * (1 if m.group(1) == '+' else -1)
         unit = m.group(3)
-        if unit == 'm': total += timedelta(minutes=amt)
-        elif unit == 'h': total += timedelta(hours=amt)
-        elif unit == 'd': total += timedelta(days=amt)
-        elif unit == 'w': total += timedelta(weeks=amt)
-
+        total += timedelta(**{_REL_UNITS[unit]: amt})
+        has_time = has_time or unit in "hm"
     result_dt = now + total
-    if _has_time_tokens(tokens):
+    if has_time:
         return result_dt
-    else:
-        if midnight_flag:
-            return result_dt.replace(hour=23, minute=59, second=0, microsecond=0)
-        d = result_dt.replace(hour=0, minute=0, second=0, microsecond=0)
-        return ('dateonly', d)
+    if midnight_flag:
+        return _end_of_day(result_dt)
+    return ('dateonly', result_dt.replace(hour=0, minute=0, second=0, microsecond=0))
+
+_FIRST_TOKEN_DISPATCH = {"midnight": _parse_relative}
+_FIRST_TOKEN_DISPATCH.update({k: _parse_relday for k in RELDAY_MAP})
+_FIRST_TOKEN_DISPATCH.update({k: _parse_weekday for k in WEEKDAY_MAP})
+_FIRST_TOKEN_DISPATCH.update({k: _parse_month_name for k in MONTH_MAP})
+_FIRST_TOKEN_DISPATCH.update({k + ".": _parse_month_name for k in MONTH_MAP})
+
+def parse_due_flexible(s: Optional[str], now: Optional[datetime] = None):
+    """Parse flexible due strings.
+       Returns:
+         - None for empty
+         - datetime for precise
+         - ('dateonly', datetime) for date-only precision
 
-def parse_due_entry(s: Optional[str]):
+    Accepts:
+      - 'YYYY-MM-DD' [ 'HHMM' | 'HH:MM' | 'midnight' ]
+      - 'MM/DD' [ 'HHMM' | 'HH:MM' | 'midnight' ]
+      - 'midnight'  (today 23:59)
+      - relative tokens: '+2d +5h -3h +1w' (optional 'midnight' to force 23:59)
+
+    ``now`` pins the reference time (defaults to the current time).
+    """
+    if not s:
+        return None
+    tokens = s.split()
+    if not tokens:
+        return None
+    now = now or datetime.now()
+    lowered = [t.lower() for t in tokens]
+    first = lowered[0]
+
+    if len(tokens) == 1:
+        # Plain 'midnight' -> today 23:59; plain dayparts -> today at a sensible time
+        if first == "midnight":
+            return _end_of_day(now)
+        if first in DAYPART_MAP:
+            hh, mm = DAYPART_MAP[first]
+            return now.replace(hour=hh, minute=mm, second=0, microsecond=0)
+
+    handler = _FIRST_TOKEN_DISPATCH.get(first)
+    if handler is None:
+        c = first[0]
+        if c.isdigit():
+            handler = _parse_numeric_date
+        elif c in "+-":
+            handler = _parse_relative
+        else:
+            return None
+    return handler(tokens, lowered, now)
+
+def parse_due_entry(s: Optional[str], now: Optional[datetime] = None):
     """Canonical parser for user-typed due values.
 
     Accepts a bare time ('HH:MM' or 'HHMM' -> today at that time) in addition to
@@ -245,15 +256,17 @@ def parse_due_entry(s: Optional[str]):
 
     Returns None, a datetime, or a ('dateonly', datetime) tuple.
     """
-    if not s or not s.strip():
+    if not s:
         return None
     ts = s.strip()
-    if re.match(r'^(\d{1,2}):(\d{2})$', ts) or re.match(r'^(\d{3,4})$', ts):
+    if not ts:
+        return None
+    if _TIME_COLON_RE.match(ts) or _TIME_DIGITS_RE.match(ts):
         hm = _parse_time_token(ts)
         if hm is None:
             return None
-        return datetime.now().replace(hour=hm[0], minute=hm[1], second=0, microsecond=0)
-    return parse_due_flexible(ts)
+        return (now or datetime.now()).replace(hour=hm[0], minute=hm[1], second=0, microsecond=0)
+    return parse_due_flexible(ts, now=now)
 
 def fmt_due_for_store(parsed):
     if parsed is None:
@@ -1,4 +1,12 @@
+import atexit
+import hashlib
+import logging
 import os
+import itertools
+import threading
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime, date
 import re
@@ -6,6 +14,10 @@ import random
 import subprocess
 import sys
 
+from . import model
+
+logger = logging.getLogger(__name__)
+
 ROOT_DIR = Path(__file__).resolve().parent.parent
 # Honor the same data-dir override as core.model (see TINYTASKLIST_DATA_DIR).
 _ENV_DATA_DIR = os.environ.get("TINYTASKLIST_DATA_DIR")
@@ -16,6 +28,82 @@ JOURNALS_DIR = DATA_DIR / "journals"
 TASK_DIVIDER = "\n--- Displayed notes ↑ | Private notes ↓ ---\n"
 JOURNAL_DIVIDER = "\n---\n"
 
+# Called with the Path of every task document / journal this module writes or
+# moves (e.g. the search index marks it for re-indexing). Hooks must be cheap:
+# they run on the writing thread, often the DocumentIO worker.
+DOCUMENT_WRITE_HOOKS: list = []
+
+def _notify_written(path: Path) -> None:
+    for hook in list(DOCUMENT_WRITE_HOOKS):
+        try:
+            hook(path)
+        except Exception:
+            logger.exception("document write hook failed")
+
+class FileCache:
+    """LRU cache of small text files keyed by path, validated by (mtime_ns, size).
+
+    A hit costs one ``stat`` and no read. ``parsed(path, name, fn)`` also
+    memoizes ``fn(text)`` per file version (the mantra list, split sections), so
+    repeated lookups skip parsing too. Our own writes go through ``put()`` so
+    the next read is a hit. Thread-safe (the document worker writes too).
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()  # path -> [stamp, text, {name: parsed}]
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _entry(self, path: Path):
+        path = Path(path)
+        st = path.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(path)
+                self.stats["hits"] += 1
+                return entry
+            self.stats["misses"] += 1
+        entry = [stamp, path.read_text(encoding="utf-8"), {}]
+        self._store(path, entry)
+        return entry
+
+    def _store(self, path: Path, entry: list) -> None:
+        with self._lock:
+            self._entries[path] = entry
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def read_text(self, path: Path) -> str:
+        return self._entry(path)[1]
+
+    def parsed(self, path: Path, name: str, fn):
+        """``fn(text)`` for the current version of ``path``, computed once."""
+        entry = self._entry(path)
+        forms = entry[2]
+        if name not in forms:
+            forms[name] = fn(entry[1])
+        return forms[name]
+
+    def put(self, path: Path, text: str) -> None:
+        """Record content we just wrote, so reading it back is a hit."""
+        path = Path(path)
+        st = path.stat()
+        self._store(path, [(st.st_mtime_ns, st.st_size), text, {}])
+
+    def invalidate(self, path: Path | None = None) -> None:
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(Path(path), None)
+
+FILE_CACHE = FileCache()
+
+@lru_cache(maxsize=4096)
 def _safe_name(value: str, fallback: str) -> str:
     cleaned = re.sub(r'[<>:"/\\|?*\n\r\t]+', "_", value or "").strip()
     cleaned = re.sub(r"\s+", " ", cleaned)
@@ -36,30 +124,287 @@ def _split_sections(content: str, divider: str) -> tuple[str, str]:
 def _write_sections(path: Path, top: str, bottom: str, divider: str) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     body = f"{top.strip()}{divider}{bottom.strip()}\n"
-    path.write_text(body, encoding="utf-8")
+    path.write_text(body, encoding="utf-8", newline="\n")  # LF on every OS: the journal index matches bytes
+    FILE_CACHE.put(path, body)
+    _notify_written(path)
+
+def _cached_sections(path: Path, divider: str) -> tuple[str, str]:
+    return FILE_CACHE.parsed(path, f"sections{divider}", lambda text: _split_sections(text, divider))
+
+# ===== Document backends =====
+# "files" (default): each task document and journal is a Markdown file under
+# task_documents/ and journals/, written in place.
+# "sqlite": the same content lives in tasks.db — a task's private notes in
+# ``doc_task_notes`` (its displayed notes are the task's own ``notes``), each
+# day's journal sections in ``doc_journals``. Files exist only when exported
+# for editing (``export_documents``); ``import_documents`` brings edits back,
+# reading only files whose stamp moved and keeping only content whose hash did.
+DOCUMENT_BACKENDS = ("files", "sqlite")
+_backend = "files"
+
+def document_backend() -> str:
+    return _backend
+
+def set_document_backend(name: str) -> None:
+    """Switch where task documents and journals are kept (see DOCUMENT_BACKENDS).
+
+    Only the module state changes: move existing content across with
+    ``import_documents(tasks, scan=True)`` (files → sqlite) or
+    ``export_documents(tasks)`` (sqlite → files).
+    """
+    global _backend
+    if name not in DOCUMENT_BACKENDS:
+        raise ValueError(f"Unknown document backend: {name!r}")
+    _backend = name
+
+def _sqlite_backend() -> bool:
+    return _backend == "sqlite"
+
+_staging = threading.local()
+
+@contextmanager
+def deferred():
+    """Hold this thread's SQLite-backend document writes for the task save.
+
+    Inside the block, writes are staged instead of committed; the next
+    ``model.save_db`` applies them in its own transaction (``model.SAVE_HOOKS``),
+    so e.g. a completion and its journal line commit together or not at all.
+    Anything still staged when the block ends commits on its own. Nested
+    blocks join the outer one; with the files backend this does nothing.
+    """
+    if getattr(_staging, "ops", None) is not None:
+        yield
+        return
+    _staging.ops = []
+    try:
+        yield
+    finally:
+        ops, _staging.ops = _staging.ops, None
+        if ops:
+            with model.store_connection() as conn, conn:
+                for op in ops:
+                    op(conn)
+
+def _apply_staged(conn) -> None:
+    ops = getattr(_staging, "ops", None)
+    while ops:
+        ops.pop(0)(conn)
+
+model.SAVE_HOOKS.append(_apply_staged)
+
+def _db_write(op) -> None:
+    """Run ``op(conn)`` now in its own transaction, or stage it (see ``deferred``)."""
+    ops = getattr(_staging, "ops", None)
+    if ops is not None:
+        ops.append(op)
+        return
+    with model.store_connection() as conn, conn:
+        op(conn)
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _render_sections(top: str, bottom: str, divider: str) -> str:
+    return f"{top.strip()}{divider}{bottom.strip()}\n"
+
+def _sql_private_notes(conn, tid) -> str:
+    row = conn.execute("SELECT private FROM doc_task_notes WHERE id=?", (tid,)).fetchone()
+    return row[0] if row else ""
+
+def _sql_journal(conn, day: date) -> tuple[str, str]:
+    row = conn.execute("SELECT top, bottom FROM doc_journals WHERE day=?", (day.isoformat(),)).fetchone()
+    return (row[0], row[1]) if row else ("", "")
+
+def _sql_append_manual(day: date, line: str) -> None:
+    def op(conn):
+        conn.execute("INSERT INTO doc_journals(day) VALUES(?) ON CONFLICT(day) DO NOTHING", (day.isoformat(),))
+        conn.execute("UPDATE doc_journals SET top = CASE WHEN top = '' THEN ?1 ELSE top || char(10) || ?1 END,"
+                     " version = version + 1 WHERE day = ?2", (line, day.isoformat()))
+    _db_write(op)
+
+def _sql_append_completions(day: date, lines: list) -> None:
+    # Same layout as the file journal: the header leads the completions block.
+    def op(conn):
+        conn.execute("INSERT INTO doc_journals(day) VALUES(?) ON CONFLICT(day) DO NOTHING", (day.isoformat(),))
+        conn.execute(
+            "UPDATE doc_journals SET bottom = CASE"
+            " WHEN bottom = '' THEN ?1 || char(10) || ?2"
+            " WHEN substr(bottom, 1, length(?1)) = ?1 THEN bottom || char(10) || ?2"
+            " ELSE ?1 || char(10) || bottom || char(10) || ?2 END,"
+            " version = version + 1 WHERE day = ?3",
+            (JOURNAL_TASKS_HEADER, "\n".join(lines), day.isoformat()))
+    _db_write(op)
+
+def _export_file(path: Path, text: str, old_stamp) -> tuple | None:
+    """Write ``text`` to ``path`` unless the copy there was edited since it was
+    last exported/imported (``import_documents`` must take it first). Returns
+    the new ``(hash, stamp)``, or None when the file was left alone."""
+    try:
+        st = path.stat()
+    except OSError:
+        st = None
+    if st is not None and old_stamp is not None and _file_stamp(st) != old_stamp:
+        return None
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8", newline="\n")
+    FILE_CACHE.put(path, text)
+    return _content_hash(text.encode("utf-8")), _file_stamp(path.stat())
+
+def _file_stamp(st: os.stat_result) -> str:
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+def _export_task(conn, task: dict, private: str, old_stamp) -> bool:
+    path = task_doc_path(task)
+    done = _export_file(path, _render_sections(task.get("notes") or "", private, TASK_DIVIDER), old_stamp)
+    if done is None:
+        return False
+    conn.execute("INSERT INTO doc_task_notes(id, export_path, export_hash, export_stamp) VALUES(?, ?, ?, ?)"
+                 " ON CONFLICT(id) DO UPDATE SET export_path=excluded.export_path,"
+                 " export_hash=excluded.export_hash, export_stamp=excluded.export_stamp",
+                 (task["id"], str(path), *done))
+    return True
+
+def export_documents(tasks=(), days=None) -> dict:
+    """Write SQLite-held documents out in the folder layout for editing.
+
+    Exports the documents of ``tasks`` that have notes or private notes, and the
+    journals for ``days`` (None: every stored day). A file edited since its last
+    export is not overwritten — run ``import_documents`` first. Each written
+    file's hash and (mtime_ns, size) stamp are recorded for the re-import.
+    Returns ``{"tasks", "journals", "kept"}`` (kept = edited files left alone).
+    """
+    stats = {"tasks": 0, "journals": 0, "kept": 0}
+    with model.store_connection() as conn, conn:
+        rows = {tid: (private, stamp) for tid, private, stamp in
+                conn.execute("SELECT id, private, export_stamp FROM doc_task_notes")}
+        for t in tasks:
+            private, old_stamp = rows.get(t["id"], ("", None))
+            if private or (t.get("notes") or "").strip():
+                stats["tasks" if _export_task(conn, t, private, old_stamp) else "kept"] += 1
+        sql = "SELECT day, top, bottom, export_stamp FROM doc_journals"
+        wanted = None if days is None else [d.isoformat() for d in days]
+        for day, top, bottom, old_stamp in conn.execute(sql).fetchall():
+            if wanted is not None and day not in wanted:
+                continue
+            done = _export_file(_journal_path(date.fromisoformat(day)),
+                                _render_sections(top, bottom, JOURNAL_DIVIDER), old_stamp)
+            if done is None:
+                stats["kept"] += 1
+                continue
+            conn.execute("UPDATE doc_journals SET export_hash=?, export_stamp=? WHERE day=?", (*done, day))
+            stats["journals"] += 1
+    return stats
+
+def _scan_document_files() -> dict:
+    """``{path: ("task", id) | ("journal", iso day)}`` for every file in the folder layout."""
+    found = {}
+    for group_name in _dir_names(TASKS_DIR):
+        for name in _dir_names(TASKS_DIR / group_name):
+            m = _DOC_ID_RE.search(name)
+            if m:
+                found[TASKS_DIR / group_name / name] = ("task", int(m.group(1)))
+    for year in _dir_names(JOURNALS_DIR):
+        for month in _dir_names(JOURNALS_DIR / year):
+            for name in _dir_names(JOURNALS_DIR / year / month):
+                if _JOURNAL_NAME_RE.match(name):
+                    found[JOURNALS_DIR / year / month / name] = ("journal", name[:-3])
+    return found
+
+_JOURNAL_NAME_RE = re.compile(r"^\d{4}-\d{2}-\d{2}\.md$")
+
+def import_documents(tasks=(), scan: bool = False) -> list:
+    """Bring edits of exported documents back into the SQLite backend.
+
+    Checks the files recorded by ``export_documents`` (and, with ``scan``, every
+    document in the folder layout — used when switching from the files backend).
+    A file is read only if its (mtime_ns, size) stamp moved since export, and
+    its content replaces the stored one only if the hash differs, so touching a
+    file or saving it unchanged costs nothing. Returns the ``tasks`` whose
+    displayed notes changed; the caller saves them.
+    """
+    by_id = {t["id"]: t for t in tasks}
+    changed = []
+    with model.store_connection() as conn, conn:
+        candidates = {}  # path -> (kind, key, export_hash, export_stamp)
+        for tid, path, h, stamp in conn.execute(
+                "SELECT id, export_path, export_hash, export_stamp FROM doc_task_notes"
+                " WHERE export_path IS NOT NULL"):
+            candidates[Path(path)] = ("task", tid, h, stamp)
+        for day, h, stamp in conn.execute(
+                "SELECT day, export_hash, export_stamp FROM doc_journals WHERE export_stamp IS NOT NULL"):
+            candidates[_journal_path(date.fromisoformat(day))] = ("journal", day, h, stamp)
+        if scan:
+            for path, (kind, key) in _scan_document_files().items():
+                candidates.setdefault(path, (kind, key, None, None))
+        for path, (kind, key, old_hash, old_stamp) in candidates.items():
+            try:
+                stamp = _file_stamp(path.stat())
+            except OSError:
+                continue
+            if stamp == old_stamp:
+                continue
+            data = path.read_bytes()
+            digest = _content_hash(data)
+            text = data.decode("utf-8", errors="replace")
+            if kind == "task":
+                top, private = _split_sections(text, TASK_DIVIDER)
+                if digest != old_hash:
+                    conn.execute(
+                        "INSERT INTO doc_task_notes(id, private, version) VALUES(?, ?, 1)"
+                        " ON CONFLICT(id) DO UPDATE SET private=excluded.private, version=version + 1"
+                        " WHERE private != excluded.private", (key, private))
+                    t = by_id.get(key)
+                    if t is not None and top and top != (t.get("notes") or "").strip():
+                        t["notes"] = top
+                        changed.append(t)
+                conn.execute("UPDATE doc_task_notes SET export_path=?, export_hash=?, export_stamp=? WHERE id=?",
+                             (str(path), digest, stamp, key))
+            else:
+                top, bottom = _split_sections(text, JOURNAL_DIVIDER)
+                conn.execute("INSERT INTO doc_journals(day) VALUES(?) ON CONFLICT(day) DO NOTHING", (key,))
+                if digest != old_hash:
+                    conn.execute("UPDATE doc_journals SET top=?, bottom=?, version=version + 1"
+                                 " WHERE day=? AND (top != ? OR bottom != ?)", (top, bottom, key, top, bottom))
+                conn.execute("UPDATE doc_journals SET export_hash=?, export_stamp=? WHERE day=?",
+                             (digest, stamp, key))
+    return changed
+
+def export_task_document(task: dict) -> Path:
+    """Export one task's SQLite-held document (even if empty) and return the
+    file to open; an edited copy already there is kept as is."""
+    with model.store_connection() as conn, conn:
+        row = conn.execute("SELECT private, export_stamp FROM doc_task_notes WHERE id=?", (task["id"],)).fetchone()
+        _export_task(conn, task, *(row or ("", None)))
+    return task_doc_path(task)
 
 def sync_task_notes(task: dict) -> Path:
-    """Write task notes to the document file, preserving the bottom section."""
+    """Write task notes to the document file, preserving the bottom section.
+    (SQLite backend: the notes are already stored with the task; only the
+    document's path is recorded.)"""
     path = task_doc_path(task)
-    existing = ""
+    if _sqlite_backend():
+        task["doc_path"] = str(path)
+        return path
+    bottom = ""
     if path.exists():
-        existing = path.read_text(encoding="utf-8")
-    _, bottom = _split_sections(existing, TASK_DIVIDER)
+        _, bottom = _cached_sections(path, TASK_DIVIDER)
     top = task.get("notes", "").strip()
     _write_sections(path, top, bottom, TASK_DIVIDER)
     task["doc_path"] = str(path)
+    DOC_PATHS.update({task["id"]: path})
     return path
 
 def read_task_notes_from_file(task: dict) -> bool:
     """Read display notes from the document file and update the task.
     Returns True if notes were updated, False otherwise."""
+    if _sqlite_backend():
+        return False  # edits come back through import_documents
     path = task_doc_path(task)
     if not path.exists():
         return False
-    
-    existing = path.read_text(encoding="utf-8")
-    top, bottom = _split_sections(existing, TASK_DIVIDER)
-    
+
+    top, bottom = _cached_sections(path, TASK_DIVIDER)
+
     # Only update if the file has content and differs from current notes
     if top.strip():
         current_notes = task.get("notes", "").strip()
@@ -68,15 +413,218 @@ def read_task_notes_from_file(task: dict) -> bool:
             return True
     return False
 
+_DOC_ID_RE = re.compile(r"-(\d+)\.md$")
+
+class DocPathMap:
+    """Where each task's document currently is: task id -> Path.
+
+    Persisted in the store's ``doc_paths`` table (paths relative to TASKS_DIR)
+    and cached in memory, instead of a ``doc_path`` string in every task blob.
+    ``update()`` writes only entries that changed. Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._paths = None
+        self._source = None
+
+    def _loaded(self) -> dict:
+        source = (model.DB_FILE, TASKS_DIR)  # a relocated data dir (tests) reloads
+        if self._paths is None or self._source != source:
+            with model.store_connection() as conn:
+                rows = model.load_doc_paths(conn)
+            self._paths = {tid: TASKS_DIR / rel for tid, rel in rows.items()}
+            self._source = source
+        return self._paths
+
+    def get(self, tid) -> Path | None:
+        with self._lock:
+            return self._loaded().get(tid)
+
+    def update(self, changes: dict) -> int:
+        """Record ``{id: Path or None}``; returns how many entries changed."""
+        with self._lock:
+            paths = self._loaded()
+            diff = {tid: (Path(p) if p else None) for tid, p in changes.items()}
+            diff = {tid: p for tid, p in diff.items() if paths.get(tid) != p}
+            if not diff:
+                return 0
+            with model.store_connection() as conn:
+                model.save_doc_paths({tid: self._relative(p) for tid, p in diff.items()}, conn)
+            for tid, p in diff.items():
+                if p is None:
+                    paths.pop(tid, None)
+                else:
+                    paths[tid] = p
+            return len(diff)
+
+    def reset(self, paths: dict) -> int:
+        """Make the map exactly ``paths`` (entries not in it are removed)."""
+        with self._lock:
+            stale = set(self._loaded()) - set(paths)
+        return self.update({**dict.fromkeys(stale), **paths})
+
+    @staticmethod
+    def _relative(path: Path | None) -> str | None:
+        if path is None:
+            return None
+        try:
+            return path.relative_to(TASKS_DIR).as_posix()
+        except ValueError:
+            return str(path)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._paths = None
+
+DOC_PATHS = DocPathMap()
+
+def current_doc_path(task: dict) -> Path | None:
+    """Where the task's document is now (may differ from ``task_doc_path`` until
+    it is moved). An in-memory ``doc_path`` set this session wins over the map."""
+    if task.get("doc_path"):
+        return Path(task["doc_path"])
+    return DOC_PATHS.get(task.get("id"))
+
 def move_task_document_if_needed(task: dict) -> Path:
     desired = task_doc_path(task)
-    current = Path(task.get("doc_path")) if task.get("doc_path") else None
-    if current and current.exists() and current != desired:
+    if _sqlite_backend():
+        task["doc_path"] = str(desired)
+        return desired
+    current = current_doc_path(task)
+    if current and current != desired and current.exists():
         desired.parent.mkdir(parents=True, exist_ok=True)
         current.replace(desired)
+        FILE_CACHE.invalidate(current)
+        FILE_CACHE.invalidate(desired)
+        _notify_written(current)
+        _notify_written(desired)
     task["doc_path"] = str(desired)
+    if desired.exists():
+        DOC_PATHS.update({task["id"]: desired})
     return desired
 
+def _dir_names(directory: Path) -> set:
+    try:
+        with os.scandir(directory) as it:
+            return {e.name for e in it}
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
+
+def plan_moves(tasks) -> list:
+    """``[(id, from, to)]`` for tasks whose document is not where their current
+    group/title puts it; each task's in-memory ``doc_path`` is set to the target."""
+    moves = []
+    for t in tasks:
+        current = current_doc_path(t)
+        if current is None:
+            continue
+        desired = task_doc_path(t)
+        t["doc_path"] = str(desired)
+        if current != desired:
+            moves.append((t["id"], current, desired))
+    return moves
+
+def move_documents(moves) -> dict:
+    """Apply ``[(id, from, to)]`` document moves in bulk.
+
+    Moves are bucketed by (source dir, target dir). If the target directory does
+    not exist yet and everything in the source directory is moving there under
+    the same names — a whole group being renamed — the directory itself is
+    renamed: one syscall, not one per file. Otherwise files move one by one,
+    with each directory listed once (``os.scandir``) so missing sources and
+    already-moved targets are skipped without a stat each. DOC_PATHS is updated
+    in one write. Returns ``{"dirs", "files", "skipped"}``.
+    """
+    stats = {"dirs": 0, "files": 0, "skipped": 0}
+    buckets = defaultdict(list)
+    for tid, src, dst in moves:
+        src, dst = Path(src), Path(dst)
+        if src != dst:
+            buckets[(src.parent, dst.parent)].append((tid, src, dst))
+    located = {}
+    for (src_dir, dst_dir), items in buckets.items():
+        present = _dir_names(src_dir)
+        moving = {src.name for _, src, _ in items}
+        if (present and src_dir != dst_dir and present <= moving and not dst_dir.exists()
+                and all(src.name == dst.name for _, src, dst in items)):
+            dst_dir.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(src_dir, dst_dir)
+            stats["dirs"] += 1
+            FILE_CACHE.invalidate()
+            for tid, src, dst in items:
+                located[tid] = dst
+                _notify_written(src)
+                _notify_written(dst)
+            continue
+        existing = _dir_names(dst_dir)
+        for tid, src, dst in items:
+            if dst.name in existing:
+                located[tid] = dst  # moved already (or by hand); leave the source alone
+                stats["skipped"] += 1
+            elif src.name not in present:
+                stats["skipped"] += 1
+            else:
+                dst_dir.mkdir(parents=True, exist_ok=True)
+                src.replace(dst)
+                FILE_CACHE.invalidate(src)
+                FILE_CACHE.invalidate(dst)
+                _notify_written(src)
+                _notify_written(dst)
+                located[tid] = dst
+                stats["files"] += 1
+    if located:
+        DOC_PATHS.update(located)
+    return stats
+
+def rename_group(tasks, old_group: str, new_group: str) -> list:
+    """Move every task in ``old_group`` into ``new_group`` and return them.
+
+    Only the task dicts change here (the caller saves); pass the result to
+    ``move_documents(plan_moves(...))`` or ``DocumentIO.move_tasks`` to move the
+    documents, which renames the group folder in one step when it can.
+    """
+    old_group, new_group = (old_group or "").strip(), (new_group or "").strip()
+    if old_group == new_group:
+        return []
+    changed = [t for t in tasks if (t.get("group") or "").strip() == old_group]
+    for t in changed:
+        t["group"] = new_group
+    return changed
+
+def reconcile_documents(tasks, move: bool = True) -> dict:
+    """Rebuild DOC_PATHS from what is on disk and put stray documents in place.
+
+    One ``os.scandir`` pass over ``task_documents/<group>/`` finds each
+    ``*-<id>.md``; files already at their task's path are only recorded, the
+    rest are moved (when ``move``) in bulk via ``move_documents``. Returns
+    ``{"found", "misplaced", "moved"}``. Nothing to do with the SQLite backend.
+    """
+    found = {}
+    if _sqlite_backend():
+        return {"found": 0, "misplaced": 0, "moved": 0}
+    for group_name in _dir_names(TASKS_DIR):
+        group_dir = TASKS_DIR / group_name
+        for name in _dir_names(group_dir):
+            m = _DOC_ID_RE.search(name)
+            if m:
+                found[int(m.group(1))] = group_dir / name
+    by_id = {t["id"]: t for t in tasks}
+    moves = []
+    for tid, path in found.items():
+        t = by_id.get(tid)
+        if t is None:
+            continue
+        desired = task_doc_path(t)
+        t["doc_path"] = str(desired)
+        if path != desired:
+            moves.append((tid, path, desired))
+    DOC_PATHS.reset(found)
+    stats = {"found": len(found), "misplaced": len(moves), "moved": 0}
+    if move and moves:
+        stats["moved"] = len(moves) - move_documents(moves)["skipped"]
+    return stats
+
 def open_document(path: Path) -> None:
     if sys.platform.startswith("win"):
         os.startfile(path)  # type: ignore[attr-defined]
@@ -109,37 +657,297 @@ def _ensure_journal(entry_date: date) -> Path:
 
 def ensure_journal_path(entry_date: date | None = None) -> Path:
     entry_date = entry_date or date.today()
+    if _sqlite_backend():
+        with model.store_connection() as conn, conn:
+            conn.execute("INSERT INTO doc_journals(day) VALUES(?) ON CONFLICT(day) DO NOTHING",
+                         (entry_date.isoformat(),))
+        export_documents(days=[entry_date])
+        return _journal_path(entry_date)
     return _ensure_journal(entry_date)
 
+JOURNAL_TASKS_HEADER = "## Completed Tasks"
+
+# Per-journal byte offsets so entries don't re-read/re-split the whole file:
+# path -> {"stamp": (mtime_ns, size), "divider": offset of JOURNAL_DIVIDER or -1,
+#          "top_end": end of the manual section's text, "has_header": bool,
+#          "bottom_empty": bool, "nl": file ends with a newline,
+#          "eol": the file's line ending ("\r\n" if saved so by a Windows editor)}.
+# An entry is trusted only while the file's (mtime_ns, size) still match, so
+# edits made in an editor are picked up by one rescan. Read and updated only
+# under _JOURNAL_LOCK, together with the append that trusts the entry: appends
+# run on the DocumentIO worker, or inline on any thread that calls them directly
+# (an unstarted DocumentIO's flush(), scripts, tests).
+_JOURNAL_INDEX: dict = {}
+_JOURNAL_LOCK = threading.RLock()
+_DIVIDER_BYTES = JOURNAL_DIVIDER.encode("utf-8")
+_CRLF_DIVIDER_BYTES = JOURNAL_DIVIDER.replace("\n", "\r\n").encode("utf-8")
+
+def _stamp(path: Path) -> tuple:
+    st = path.stat()
+    return (st.st_mtime_ns, st.st_size)
+
+def _journal_index(path: Path) -> dict:
+    stamp = _stamp(path)
+    idx = _JOURNAL_INDEX.get(path)
+    if idx and idx["stamp"] == stamp:
+        return idx
+    data = path.read_bytes()
+    divider, eol = _DIVIDER_BYTES, "\n"
+    div = data.find(divider)
+    if div < 0 and _CRLF_DIVIDER_BYTES in data:
+        divider, eol = _CRLF_DIVIDER_BYTES, "\r\n"
+        div = data.find(divider)
+    bottom = data[div + len(divider):].strip() if div >= 0 else b""
+    idx = {
+        "stamp": stamp,
+        "divider": div,
+        "top_end": len(data[:div].rstrip()) if div >= 0 else len(data.rstrip()),
+        "has_header": bottom.startswith(JOURNAL_TASKS_HEADER.encode("utf-8")),
+        "bottom_empty": not bottom,
+        "nl": data.endswith(b"\n"),
+        "eol": eol,
+    }
+    _JOURNAL_INDEX[path] = idx
+    return idx
+
 def append_journal_manual(entry: str, entry_time: datetime | None = None) -> Path:
+    """Add a timestamped line to the manual (top) section.
+
+    Only the bytes from the end of the manual text onward are rewritten (the
+    divider and the completions below it), never the whole day's file.
+    """
     entry_time = entry_time or datetime.now()
-    path = _ensure_journal(entry_time.date())
-    content = path.read_text(encoding="utf-8")
-    top, bottom = _split_sections(content, JOURNAL_DIVIDER)
-    timestamp = entry_time.strftime("%H:%M")
     entry_text = entry.strip()
-    if entry_text:
-        line = f"- {timestamp} {entry_text}"
-        top = f"{top}\n{line}".strip()
-    _write_sections(path, top, bottom, JOURNAL_DIVIDER)
-    return path
+    if _sqlite_backend():
+        if entry_text:
+            _sql_append_manual(entry_time.date(), f"- {entry_time.strftime('%H:%M')} {entry_text}")
+        return _journal_path(entry_time.date())
+    path = _ensure_journal(entry_time.date())
+    if not entry_text:
+        return path
+    line = f"- {entry_time.strftime('%H:%M')} {entry_text}"
+    with _JOURNAL_LOCK:
+        idx = _journal_index(path)
+        if idx["divider"] < 0:
+            # No divider (hand-edited file): fall back to a normalizing rewrite.
+            top, bottom = _split_sections(path.read_text(encoding="utf-8"), JOURNAL_DIVIDER)
+            _write_sections(path, f"{top}\n{line}".strip(), bottom, JOURNAL_DIVIDER)
+            return path
+        top_end = idx["top_end"]
+        added = (f"{idx['eol']}{line}" if top_end else line).encode("utf-8")
+        with path.open("r+b") as f:
+            f.seek(idx["divider"])
+            rest = f.read()
+            f.seek(top_end)
+            f.write(added + rest)
+            f.truncate()
+        idx["top_end"] = top_end + len(added)
+        idx["divider"] = idx["top_end"]
+        idx["stamp"] = _stamp(path)
+        _notify_written(path)
+        return path
 
-def append_journal_task(title: str, entry_time: datetime | None = None) -> Path:
+def append_journal_tasks(titles: list, entry_time: datetime | None = None) -> Path:
+    """Log several completions with one append to the end of the day's journal.
+
+    The completions block is the file's tail, so this is a plain append (O(1)
+    in the journal's size); the header is written with the first completion.
+    """
     entry_time = entry_time or datetime.now()
-    path = _ensure_journal(entry_time.date())
-    content = path.read_text(encoding="utf-8")
-    top, bottom = _split_sections(content, JOURNAL_DIVIDER)
-    timestamp = entry_time.strftime("%H:%M")
-    safe_title = title.strip() or "Task completed"
-    header = "## Completed Tasks"
-    line = f"- {timestamp} Completed: {safe_title}"
-    if not bottom:
-        bottom = header
-    elif not bottom.lstrip().startswith(header):
-        bottom = f"{header}\n{bottom}".strip()
-    bottom = f"{bottom}\n{line}".strip()
-    _write_sections(path, top, bottom, JOURNAL_DIVIDER)
-    return path
+    return _append_completions(entry_time.date(), [(entry_time, t) for t in titles])
+
+def _append_completions(day: date, entries: list) -> Path:
+    """Append ``[(entry_time, title)]`` to ``day``'s completions block in one write."""
+    lines = [f"- {when.strftime('%H:%M')} Completed: {(t or '').strip() or 'Task completed'}"
+             for when, t in entries]
+    if _sqlite_backend():
+        if lines:
+            _sql_append_completions(day, lines)
+        return _journal_path(day)
+    path = _ensure_journal(day)
+    if not lines:
+        return path
+    with _JOURNAL_LOCK:
+        idx = _journal_index(path)
+        if idx["divider"] < 0 or not (idx["has_header"] or idx["bottom_empty"]):
+            # Hand-edited layout (no divider, or other text first under it): rewrite
+            # once so the header leads the block, as before.
+            top, bottom = _split_sections(path.read_text(encoding="utf-8"), JOURNAL_DIVIDER)
+            if not bottom.startswith(JOURNAL_TASKS_HEADER):
+                bottom = f"{JOURNAL_TASKS_HEADER}\n{bottom}".strip()
+            _write_sections(path, top, "\n".join([bottom] + lines), JOURNAL_DIVIDER)
+            _JOURNAL_INDEX.pop(path, None)
+            return path
+        eol = idx["eol"]
+        chunk = "" if idx["nl"] else eol
+        if not idx["has_header"]:
+            chunk += JOURNAL_TASKS_HEADER + eol
+        chunk += eol.join(lines) + eol
+        with path.open("ab") as f:
+            f.write(chunk.encode("utf-8"))
+        idx.update(has_header=True, bottom_empty=False, nl=True, stamp=_stamp(path))
+        _notify_written(path)
+        return path
+
+def append_journal_task(title: str, entry_time: datetime | None = None) -> Path:
+    return append_journal_tasks([title], entry_time)
+
+class DocumentIO:
+    """One background thread that performs task-document and journal writes.
+
+    UI code enqueues and returns immediately, so a slow (e.g. network-synced)
+    data dir never blocks the Tk thread. Jobs are keyed by the file they touch
+    and coalesced while queued: repeated syncs of one task collapse into a
+    single move + write of its latest state, and journal entries for one day
+    become one append. Keys run in first-enqueued order, and each key's work
+    happens in the order it was requested. Failures are logged and kept in
+    ``errors`` for the UI to ``drain_errors()``; ``flush()`` waits for the
+    queue (call it before opening a file it may be writing) and ``close()``
+    flushes and stops the worker. With the SQLite backend jobs run inline: they
+    are small row writes, and inside ``deferred()`` they join the task save.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending: OrderedDict = OrderedDict()
+        self._busy = False
+        self._closed = False
+        self._thread = None
+        self.errors: deque = deque(maxlen=50)
+        self._seq = itertools.count()  # bulk moves never coalesce: each keeps its place
+        self.stats = {"enqueued": 0, "coalesced": 0, "written": 0, "failed": 0}
+
+    def start(self) -> "DocumentIO":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="document-io", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        return self
+
+    # -- enqueue (caller thread) --
+    def sync_task(self, task: dict, write_notes: bool = True) -> None:
+        """Move the task's document to its current group/title path and, if
+        ``write_notes``, write its notes there. ``task["doc_path"]`` is updated
+        now; the file work happens on the worker."""
+        snapshot = {k: task.get(k) for k in ("id", "title", "group", "notes")}
+        old = current_doc_path(task)
+        task["doc_path"] = str(task_doc_path(task))
+        self._submit(("task", task.get("id")),
+                     {"from": old, "task": snapshot, "write_notes": write_notes}, self._merge_task)
+
+    def move_tasks(self, tasks) -> None:
+        """Move the documents of ``tasks`` to their current group/title paths as
+        one bulk job (``move_documents``: a whole group becomes a folder rename)."""
+        moves = plan_moves(tasks)
+        if moves:
+            self._submit(("moves", next(self._seq)), {"moves": moves}, None)
+
+    def reconcile(self, tasks) -> None:
+        """Queue ``reconcile_documents`` for a snapshot of ``tasks``."""
+        snapshot = [{k: t.get(k) for k in ("id", "title", "group")} for t in tasks]
+        self._submit(("reconcile", None), {"tasks": snapshot}, lambda old, new: new)
+
+    def append_journal_tasks(self, titles: list, entry_time: datetime | None = None) -> None:
+        entry_time = entry_time or datetime.now()
+        if titles:
+            self._submit(("journal", entry_time.date()),
+                         {"tasks": [(entry_time, t) for t in titles], "manual": []}, self._merge_journal)
+
+    def append_journal_manual(self, entry: str, entry_time: datetime | None = None) -> None:
+        entry_time = entry_time or datetime.now()
+        self._submit(("journal", entry_time.date()),
+                     {"tasks": [], "manual": [(entry_time, entry)]}, self._merge_journal)
+
+    @staticmethod
+    def _merge_task(old: dict, new: dict) -> dict:
+        # Keep where the file was before any queued move; write the latest state.
+        return {"from": old["from"], "task": new["task"],
+                "write_notes": old["write_notes"] or new["write_notes"]}
+
+    @staticmethod
+    def _merge_journal(old: dict, new: dict) -> dict:
+        return {"tasks": old["tasks"] + new["tasks"], "manual": old["manual"] + new["manual"]}
+
+    def _submit(self, key, job: dict, merge) -> None:
+        if _sqlite_backend():
+            self._execute(key, job)  # a row write, not file I/O: no need to queue
+            return
+        with self._cond:
+            if self._closed:
+                self._execute(key, job)  # after close(): write synchronously
+                return
+            self.stats["enqueued"] += 1
+            if key in self._pending:
+                self._pending[key] = merge(self._pending[key], job)
+                self.stats["coalesced"] += 1
+            else:
+                self._pending[key] = job
+            self._cond.notify_all()
+
+    # -- worker --
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                key, job = self._pending.popitem(last=False)
+                self._busy = True
+            try:
+                self._execute(key, job)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _execute(self, key, job: dict) -> None:
+        kind, ident = key
+        try:
+            if kind == "task":
+                task = dict(job["task"], doc_path=job["from"])
+                move_task_document_if_needed(task)
+                if job["write_notes"]:
+                    sync_task_notes(task)
+            elif kind == "moves":
+                move_documents(job["moves"])
+            elif kind == "reconcile":
+                reconcile_documents(job["tasks"])
+            else:
+                for when, text in job["manual"]:
+                    append_journal_manual(text, when)
+                _append_completions(ident, job["tasks"])
+            self.stats["written"] += 1
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.exception("document write failed: %s", key)
+            what = {"task": f"task #{ident} document", "journal": f"journal {ident}"}.get(kind, "task documents")
+            self.errors.append(f"Could not write {what}: {e}")
+
+    # -- control --
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until everything queued so far is written. False on timeout."""
+        with self._cond:
+            if self._thread is None:
+                pending, self._pending = self._pending, OrderedDict()
+                for key, job in pending.items():
+                    self._execute(key, job)
+                return True
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self, timeout: float | None = 10) -> None:
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def drain_errors(self) -> list:
+        out = []
+        while self.errors:
+            out.append(self.errors.popleft())
+        return out
 
 def get_mantras_file_path() -> Path:
     """Get the path to the mantras file, creating it if it doesn't exist."""
@@ -166,9 +974,10 @@ Progress over perfection.
 
 def load_mantras_from_file() -> list[str]:
     """Load mantras from the mantras.md file.
-    Returns a list of non-empty, non-comment lines."""
-    path = get_mantras_file_path()
-    content = path.read_text(encoding="utf-8")
+    Returns a list of non-empty, non-comment lines (cached until the file changes)."""
+    return list(FILE_CACHE.parsed(get_mantras_file_path(), "mantras", _parse_mantras))
+
+def _parse_mantras(content: str) -> list[str]:
     mantras = []
     in_html_comment = False
     
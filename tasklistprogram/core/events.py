@@ -0,0 +1,131 @@
+# events.py
+"""In-process publish/subscribe for live updates (the web server's SSE stream).
+
+``EventHub.publish(kind, data)`` numbers each event and fans it out to every
+subscriber's queue; a subscriber's stream thread blocks in ``next()`` until
+something arrives or a heartbeat is due. Memory stays bounded:
+
+* each subscriber queues at most ``queue_max`` events. A client that falls
+  further behind (a stalled tab, a slow phone) has its backlog dropped and gets
+  one ``resync`` event instead — it reloads via ``/api/tasks?since=`` — so a
+  slow reader never holds an unbounded backlog;
+* the last ``history`` events are kept so a reconnecting client can resume
+  from ``Last-Event-ID``; one that is further behind than that also gets
+  ``resync``.
+
+Event kinds used by the web server: ``tasks`` (``{"rev"}``: the store changed),
+``reminder`` (a fired checkpoint), ``rollover`` (the scheduler advanced tasks)
+and ``resync``.
+"""
+import json
+import threading
+from collections import deque
+
+EVENT_HISTORY = 256      # recent events kept for Last-Event-ID resume
+EVENT_QUEUE_MAX = 64     # per-subscriber backlog before it is told to resync
+MAX_SUBSCRIBERS = 32
+
+
+class Subscription:
+    def __init__(self):
+        self.queue: deque = deque()
+        self.overflowed = False   # backlog dropped (or resume impossible): send resync next
+
+
+class EventHub:
+    def __init__(self, history: int = EVENT_HISTORY, queue_max: int = EVENT_QUEUE_MAX,
+                 max_subscribers: int = MAX_SUBSCRIBERS):
+        self.queue_max = queue_max
+        self.max_subscribers = max_subscribers
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._history: deque = deque(maxlen=history)   # (id, kind, data)
+        self._subs: set = set()
+        self._last_rev = None
+        self._closed = False
+        self.stats = {"published": 0, "overflows": 0, "resumed": 0}
+
+    def __len__(self) -> int:
+        return len(self._subs)
+
+    def publish(self, kind: str, data: dict) -> int:
+        """Send an event to every subscriber; returns its id."""
+        with self._cond:
+            self._seq += 1
+            ev = (self._seq, kind, data)
+            self._history.append(ev)
+            for sub in self._subs:
+                if sub.overflowed:
+                    continue  # already owes a resync; queuing more is pointless
+                if len(sub.queue) >= self.queue_max:
+                    sub.queue.clear()
+                    sub.overflowed = True
+                    self.stats["overflows"] += 1
+                else:
+                    sub.queue.append(ev)
+            self.stats["published"] += 1
+            self._cond.notify_all()
+            return self._seq
+
+    def publish_rev(self, rev: int) -> bool:
+        """Publish ``tasks {"rev"}`` unless this rev was the last one announced
+        (a write seen both by its writer and by the store watcher goes out once)."""
+        with self._cond:
+            if rev == self._last_rev:
+                return False
+            self._last_rev = rev
+            self.publish("tasks", {"rev": rev})
+            return True
+
+    def subscribe(self, last_id: int | None = None) -> Subscription | None:
+        """A new subscription, or None when MAX_SUBSCRIBERS are connected.
+
+        With ``last_id`` (the client's Last-Event-ID), events after it that are
+        still in the history are queued first; if some have already been
+        forgotten the subscription starts with a resync.
+        """
+        with self._cond:
+            if self._closed or len(self._subs) >= self.max_subscribers:
+                return None
+            sub = Subscription()
+            if last_id is not None and last_id < self._seq:
+                oldest = self._history[0][0] if self._history else self._seq + 1
+                if last_id + 1 >= oldest:
+                    sub.queue.extend(ev for ev in self._history if ev[0] > last_id)
+                    self.stats["resumed"] += 1
+                else:
+                    sub.overflowed = True
+            self._subs.add(sub)
+            return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._cond:
+            self._subs.discard(sub)
+
+    def next(self, sub: Subscription, timeout: float) -> list | None:
+        """Events for ``sub`` as ``[(id, kind, data)]``: waits up to ``timeout``
+        and returns ``[]`` if nothing came (time for a heartbeat), or None once
+        the hub is closed."""
+        with self._cond:
+            self._cond.wait_for(lambda: sub.queue or sub.overflowed or self._closed, timeout)
+            if self._closed:
+                return None
+            if sub.overflowed:
+                sub.overflowed = False
+                sub.queue.clear()
+                return [(self._seq, "resync", {})]
+            events = list(sub.queue)
+            sub.queue.clear()
+            return events
+
+    def close(self) -> None:
+        """End every stream (server shutdown)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+def format_event(ev: tuple) -> str:
+    """One event in text/event-stream framing."""
+    event_id, kind, data = ev
+    return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data)}\n\n"
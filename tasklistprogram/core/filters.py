@@ -3,6 +3,8 @@
 These functions have no Tkinter dependency so they can be unit-tested headlessly.
 `app.py` wires them to the UI state (current scopes, search box, sort column).
 """
+from bisect import bisect_left
+from collections import Counter
 from datetime import datetime, date, timedelta
 from typing import Optional
 
@@ -11,6 +13,8 @@ from .constants import PRIORITY_ORDER, priority_rank
 
 CATEGORY_SCOPES = ["active", "repeating", "overdue", "done", "deleted", "suspended", "all"]
 TIME_SCOPES = ["any", "today", "week", "month", "custom"]
+SORT_COLUMNS = ["agenda", "due", "prio", "rep", "title", "notes", "times", "id", "completed"]
+_PARSE = object()  # passes_time_filter: parse the task's due itself
 
 
 def priority_visible(task: dict, settings: dict) -> bool:
@@ -50,13 +54,18 @@ def passes_time_filter(
     time_scope: str,
     custom_date: Optional[date] = None,
     now: Optional[datetime] = None,
+    due=_PARSE,
 ) -> bool:
+    """``due`` may pass the task's already-parsed due (None for none)."""
     # Archived/status views are category-first and ignore time slicing.
     if category_scope in ("deleted", "suspended", "done"):
         return True
 
     now = now or datetime.now()
-    d = parse_stored_due(task.get("due", "")) if task.get("due") else None
+    if due is _PARSE:
+        d = parse_stored_due(task.get("due", "")) if task.get("due") else None
+    else:
+        d = due
 
     if time_scope == "any":
         return True
@@ -112,4 +121,85 @@ def sort_key_for(task: dict, col: str):
         return task.get("notes", "").lower()
     if col == "times":
         return task.get("times_completed", 0)
+    if col == "agenda":  # the web list order: by due (undated last), then most important first
+        return (sort_key_for(task, "due"), -priority_rank(task.get("priority", "M")))
+    if col == "completed":
+        return task.get("completed_at") or ""
     return 0
+
+
+class ScopeIndex:
+    """One store snapshot's tasks bucketed by status, for repeated queries.
+
+    Built once per snapshot (the web server keeps one per rev): each task's due
+    is parsed once, category scopes are a bucket lookup instead of a scan, and
+    ``counts()`` — every scope's size, for a sidebar — costs one bisect for
+    the time-dependent ``overdue`` and nothing else.
+    """
+
+    def __init__(self, tasks):
+        self.buckets = {"active": [], "repeating": [], "done": [], "deleted": [], "suspended": []}
+        self._due = {}
+        for t in tasks:
+            if t.get("is_deleted"):
+                self.buckets["deleted"].append(t)
+            elif t.get("is_suspended"):
+                self.buckets["suspended"].append(t)
+            elif t.get("completed_at"):
+                self.buckets["done"].append(t)
+            else:
+                self.buckets["active"].append(t)
+                if (t.get("repeat") or "").lower() not in ("", "none"):
+                    self.buckets["repeating"].append(t)
+            self._due[t["id"]] = parse_stored_due(t["due"]) if t.get("due") else None
+        active = self.buckets["active"]
+        self._active_dues = sorted(d for d in (self._due[t["id"]] for t in active) if d)
+        self.groups = Counter(t.get("group") or "" for t in active)
+
+    def due_of(self, task: dict):
+        return self._due.get(task["id"])
+
+    def scope(self, category_scope: str, now: Optional[datetime] = None) -> list:
+        """The tasks ``passes_category_filter`` would keep, in store order."""
+        if category_scope == "overdue":
+            now = now or datetime.now()
+            return [t for t in self.buckets["active"] if (d := self._due[t["id"]]) and d < now]
+        return self.buckets.get(category_scope, self.buckets["active"])
+
+    def counts(self, now: Optional[datetime] = None) -> dict:
+        """``{scope: number of tasks}`` for every CATEGORY_SCOPE."""
+        out = {k: len(v) for k, v in self.buckets.items()}
+        out["overdue"] = bisect_left(self._active_dues, now or datetime.now())
+        out["all"] = out["active"]
+        return out
+
+    def select(self, category_scope="active", time_scope="any", min_priority=None, group=None,
+               ids=None, custom_date=None, now=None) -> list:
+        """Tasks passing the category, time and priority filters (as
+        ``passes_filter``, but ``min_priority`` is explicit: None shows all),
+        in ``group`` (``""`` = ungrouped) and among ``ids`` when given."""
+        now = now or datetime.now()
+        min_rank = priority_rank(min_priority) if min_priority else None
+        out = []
+        for t in self.scope(category_scope, now):
+            if ids is not None and t["id"] not in ids:
+                continue
+            if group is not None and (t.get("group") or "") != group:
+                continue
+            if min_rank is not None and priority_rank(t.get("priority", "M")) < min_rank:
+                continue
+            if passes_time_filter(t, category_scope, time_scope, custom_date, now, due=self._due[t["id"]]):
+                out.append(t)
+        return out
+
+    def sort(self, tasks: list, col: str, reverse: bool = False) -> list:
+        """``tasks`` sorted by ``sort_key_for(col)``, using the parsed dues."""
+        if col in ("due", "agenda"):
+            far = datetime.max
+            if col == "due":
+                key = lambda t: self._due.get(t["id"]) or far
+            else:
+                key = lambda t: (self._due.get(t["id"]) or far, -priority_rank(t.get("priority", "M")))
+        else:
+            key = lambda t: sort_key_for(t, col)
+        return sorted(tasks, key=key, reverse=reverse)
@@ -0,0 +1,203 @@
+# inbox.py
+"""Watched inbox folder: continuous, incremental import of dropped/appended lines.
+
+Any ``*.txt`` file in ``data/inbox/`` is read in the ``io_import`` pipe format.
+For each file the watcher remembers the byte offset it has consumed plus the
+inode, mtime and a fingerprint of the last bytes consumed, so a poll only stats
+the files and reads bytes appended since last time; a replaced, truncated or
+rewritten-in-place file starts over from 0.
+Only complete (newline-terminated) lines are taken, except that a file left
+unchanged for INBOX_SETTLE_SECONDS also yields its unterminated last line.
+
+One process owns the inbox at a time: the first watcher to poll takes an
+exclusive lock on ``data/inbox/.inbox.lock`` and keeps it until ``close()`` (or
+exit), so the desktop and the web server never import the same lines twice or
+race on the state file; the other's watcher retries each poll and takes over
+when the owner goes away.
+
+Offsets live in ``data/inbox/.inbox_state.json``. Lines go through
+``io_import.import_stream`` (batched commits, duplicate skipping), so a crash
+between committing and saving the offset only re-reads lines that are then
+skipped as duplicates.
+"""
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+from . import model
+from .io_import import import_stream, IMPORT_BATCH_SIZE
+
+if sys.platform.startswith("win"):
+    import msvcrt
+else:
+    import fcntl
+
+logger = logging.getLogger(__name__)
+
+INBOX_DIRNAME = "inbox"
+STATE_FILENAME = ".inbox_state.json"
+LOCK_FILENAME = ".inbox.lock"
+INBOX_POLL_SECONDS = 5        # how often the desktop/web server poll
+INBOX_SETTLE_SECONDS = 2.0    # a quiet file's unterminated last line counts as complete
+_SIG_BYTES = 64               # bytes before the offset re-checked to detect rewrites
+
+
+def inbox_dir() -> Path:
+    return model.DATA_DIR / INBOX_DIRNAME
+
+
+def _try_lock(f) -> bool:
+    """Non-blocking exclusive lock on open file ``f``; released when it closes."""
+    try:
+        if sys.platform.startswith("win"):
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+class _Tail:
+    """Iterate the complete lines after ``start``, tracking where reading stopped."""
+
+    def __init__(self, f, start: int, take_partial: bool):
+        self._f = f
+        self.pos = start
+        self._take_partial = take_partial
+
+    def __iter__(self):
+        self._f.seek(self.pos)
+        for raw in self._f:
+            if not raw.endswith(b"\n") and not self._take_partial:
+                break  # still being written; pick it up next poll
+            if self.pos == 0 and raw.startswith(b"\xef\xbb\xbf"):
+                raw = raw[3:]
+                self.pos += 3
+            self.pos += len(raw)
+            yield raw.decode("utf-8", errors="replace")
+
+
+class InboxWatcher:
+    """Polls the inbox folder; call ``poll()`` from any timer or thread."""
+
+    def __init__(self, directory=None, batch_size: int = IMPORT_BATCH_SIZE, lock=None,
+                 duplicates: str = "skip", clock=time.time):
+        self._dir = Path(directory) if directory else None
+        self.batch_size = batch_size
+        self.lock = lock
+        self.duplicates = duplicates
+        self._clock = clock
+        self._lock_file = None
+
+    @property
+    def directory(self) -> Path:
+        # Resolved lazily so a relocated data dir (tests, env var) is honoured.
+        return self._dir or inbox_dir()
+
+    @property
+    def owns_inbox(self) -> bool:
+        return self._lock_file is not None
+
+    def _claim(self) -> bool:
+        if self._lock_file is None:
+            f = open(self.directory / LOCK_FILENAME, "a+b")
+            if not _try_lock(f):
+                f.close()
+                return False
+            self._lock_file = f
+        return True
+
+    def close(self) -> None:
+        """Give up the inbox (another process's watcher takes it on its next poll)."""
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _state_path(self) -> Path:
+        return self.directory / STATE_FILENAME
+
+    def _load_state(self) -> dict:
+        try:
+            with self._state_path().open("r", encoding="utf-8") as f:
+                state = json.load(f)
+            return state if isinstance(state, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state: dict) -> None:
+        path = self._state_path()
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def poll(self) -> dict:
+        """Import whatever was appended since the last poll.
+
+        Returns ``{"added", "failed", "duplicates", "files"}`` (files = how many
+        were read). With nothing new this is one directory scan plus one
+        ``stat`` per file and reads no file contents. While another process
+        owns the inbox this does nothing.
+        """
+        result = {"added": 0, "failed": 0, "duplicates": 0, "files": 0}
+        directory = self.directory
+        try:
+            entries = [e for e in os.scandir(directory)
+                       if e.name.endswith(".txt") and not e.name.startswith(".") and e.is_file()]
+        except FileNotFoundError:
+            directory.mkdir(parents=True, exist_ok=True)  # create it so users can find it
+            return result
+        if not self._claim():
+            return result
+
+        state = self._load_state()
+        new_state = {}
+        dirty = set(state) - {e.name for e in entries}  # forget removed files
+        now = self._clock()
+        for entry in entries:
+            st = os.stat(entry.path)  # DirEntry.stat() has no inode on Windows
+            prev = state.get(entry.name)
+            offset = 0
+            if prev and prev.get("inode") == st.st_ino and st.st_size >= prev.get("offset", 0):
+                offset = prev["offset"]
+                if (st.st_size == offset and prev.get("mtime_ns") == st.st_mtime_ns
+                        and not prev.get("partial")):
+                    new_state[entry.name] = prev
+                    continue
+            settled = now - st.st_mtime >= INBOX_SETTLE_SECONDS
+            rec = self._read_file(entry.path, offset, (prev or {}).get("sig"), settled, result)
+            rec.update(inode=st.st_ino, mtime_ns=st.st_mtime_ns)
+            new_state[entry.name] = rec
+            dirty.add(entry.name)
+        if dirty:
+            self._save_state(new_state)
+        return result
+
+    @staticmethod
+    def _signature(f, offset: int) -> str:
+        f.seek(max(0, offset - _SIG_BYTES))
+        return f.read(min(offset, _SIG_BYTES)).hex()
+
+    def _read_file(self, path: str, offset: int, sig, settled: bool, result: dict) -> dict:
+        name = os.path.basename(path)
+        dupes = []
+        with open(path, "rb") as f:
+            if offset and self._signature(f, offset) != sig:
+                offset = 0  # the bytes we consumed changed: rewritten, not appended to
+            tail = _Tail(f, offset, take_partial=settled)
+            added, failed, details = import_stream(
+                tail, batch_size=self.batch_size, lock=self.lock, duplicates=self.duplicates,
+                on_duplicate=lambda line_no, tid: dupes.append(line_no))
+            size = os.fstat(f.fileno()).st_size
+            sig = self._signature(f, tail.pos)
+        for d in details:
+            logger.warning("inbox %s (from byte %d): %s", name, offset, d)
+        result["added"] += added
+        result["failed"] += failed
+        result["duplicates"] += len(dupes)
+        result["files"] += 1
+        # "partial": an unterminated tail is waiting; re-check it once it settles.
+        return {"offset": tail.pos, "sig": sig, "partial": tail.pos < size}
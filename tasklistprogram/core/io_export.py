@@ -0,0 +1,132 @@
+# io_export.py
+"""Streaming task export: pipe format (re-importable), JSON Lines and CSV.
+
+Every exporter is a generator of text lines fed from ``model.iter_tasks``, so
+exporting never loads the whole store; callers write or send each line as it
+comes. Optional filters reuse the predicates in ``core.filters``.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Optional
+
+from . import model
+from .constants import normalize_priority
+from .filters import passes_category_filter, passes_time_filter, priority_visible, search_match
+
+FORMATS = ("pipe", "jsonl", "csv")
+CONTENT_TYPES = {
+    "pipe": "text/plain; charset=utf-8",
+    "jsonl": "application/x-ndjson; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+}
+FILE_SUFFIXES = {"pipe": ".txt", "jsonl": ".jsonl", "csv": ".csv"}
+CSV_COLUMNS = [
+    "id", "title", "priority", "due", "repeat", "group", "notes",
+    "created_at", "completed_at", "times_completed", "is_suspended", "is_deleted",
+]
+
+
+def _pipe_value(v) -> str:
+    # "|" is the field delimiter and a newline ends the task; neither can be escaped.
+    return str(v or "").replace("|", "/").replace("\r", " ").replace("\n", " ").strip()
+
+
+def task_to_pipe(t: dict) -> str:
+    """One task as an ``io_import`` line; importing it back yields the same fields.
+
+    Ultra (U) is automatic escalation, so the task's base priority is exported
+    instead; defaults (prio M, repeat none) are left out as the import guide asks.
+    """
+    title = _pipe_value(t.get("title"))
+    if ":" in title or title.startswith(("#", "-")):
+        title = f"title: {title}"
+    parts = [title]
+    if t.get("due"):
+        parts.append(f"due: {_pipe_value(t['due'])}")
+    prio = normalize_priority(t.get("priority"))
+    if prio == "U":
+        prio = normalize_priority(t.get("base_priority") or "H")
+        if prio == "U":
+            prio = "H"
+    if prio != "M":
+        parts.append(f"prio: {'Misc' if prio == 'X' else prio}")
+    rep = (t.get("repeat") or "none").lower()
+    if rep != "none":
+        parts.append(f"repeat: {_pipe_value(rep)}")
+    if t.get("group"):
+        parts.append(f"group: {_pipe_value(t['group'])}")
+    if t.get("notes"):
+        parts.append(f"notes: {_pipe_value(t['notes'])}")
+    return " | ".join(parts)
+
+
+def select_tasks(
+    tasks,
+    category: Optional[str] = None,
+    time_scope: Optional[str] = None,
+    query: str = "",
+    min_priority: Optional[str] = None,
+    custom_date: Optional[date] = None,
+    now: Optional[datetime] = None,
+):
+    """Lazily filter ``tasks``; every criterion left as None/"" is not applied."""
+    now = now or datetime.now()
+    prio_settings = {"min_priority_visible": min_priority} if min_priority else None
+    for t in tasks:
+        if category and not passes_category_filter(t, category):
+            continue
+        if time_scope and not passes_time_filter(t, category or "all", time_scope, custom_date, now):
+            continue
+        if prio_settings and not priority_visible(t, prio_settings):
+            continue
+        if query and not search_match(t, query):
+            continue
+        yield t
+
+
+def export_lines(tasks, fmt: str = "pipe"):
+    """Yield one newline-terminated string per task in ``fmt`` (see FORMATS).
+
+    CSV starts with a header row.
+    """
+    if fmt == "pipe":
+        for t in tasks:
+            yield task_to_pipe(t) + "\n"
+    elif fmt == "jsonl":
+        for t in tasks:
+            yield json.dumps(model.persistable_task(t), ensure_ascii=False) + "\n"
+    elif fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        for row in _csv_rows(tasks):
+            writer.writerow(row)
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    else:
+        raise ValueError(f"unknown export format {fmt!r}; use one of {', '.join(FORMATS)}")
+
+
+def _csv_rows(tasks):
+    yield CSV_COLUMNS
+    for t in tasks:
+        yield [t.get(c, "") for c in CSV_COLUMNS]
+
+
+def iter_export(fmt: str = "pipe", **filters):
+    """Stream the store in ``fmt``, filtered by ``select_tasks`` keyword arguments."""
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format {fmt!r}; use one of {', '.join(FORMATS)}")
+    return export_lines(select_tasks(model.iter_tasks(), **filters), fmt)
+
+
+def export_to_file(path, fmt: str = "pipe", **filters) -> int:
+    """Write an export to ``path``; returns the number of tasks written."""
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for line in iter_export(fmt, **filters):
+            f.write(line)
+            count += 1
+    return count - 1 if fmt == "csv" else count
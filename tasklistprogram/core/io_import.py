@@ -1,131 +1,372 @@
 # io_import.py
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 from datetime import datetime
+from itertools import islice
+
+from . import model
 from .dates import parse_due_entry, fmt_due_for_store
 
 VALID_REPEATS = {"none", "daily", "weekdays", "weekly", "bi-weekly", "monthly"}
 VALID_PRIOS = {"H", "M", "L", "D", "X", "MISC", "Misc", "misc"}
 
+IMPORT_BATCH_SIZE = 1000   # rows per transaction for streaming imports
+MAX_ERROR_DETAILS = 100    # streaming imports keep only the first N messages
+PARSE_CHUNK_SIZE = 2000    # lines per work unit when parsing with a process pool
+PARALLEL_MIN_BYTES = 4_000_000  # below this, pool start-up costs more than it saves
+
+# What to do with a line whose content hash (model.content_hash) matches a live
+# task: add it anyway, skip it, merge its notes/priority into the existing task,
+# or add it marked "possible_duplicate". The default keeps the historical
+# import-everything behaviour; the import dialogs and the inbox ask for "skip".
+DUPLICATE_MODES = ("allow", "skip", "merge", "flag")
+DEFAULT_DUPLICATE_MODE = "allow"
+
+
+def _parse_line(idx: int, raw: str, now: datetime):
+    """Validate one import line.
+
+    Returns None for blank/comment lines, else ``(task, error)`` with exactly one
+    of them set. ``task`` is a complete task dict minus its ``id`` (ids are
+    allocated by whoever stores it).
+    """
+    line = raw.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("- "):
+        line = line[2:].strip()
+
+    parts = [p.strip() for p in line.split("|")]
+
+    title = ""
+    due_s = ""
+    prio = "M"
+    rep = "none"
+    notes = ""
+    group = ""
+
+    for p in parts:
+        if ":" in p:
+            k, v = p.split(":", 1)
+            k = k.strip().lower()
+            v = v.strip()
+            if k in ("due", "d"):
+                due_s = v
+            elif k in ("prio", "priority", "p"):
+                prio = v.upper()
+            elif k in ("repeat", "r"):
+                rep = v.lower()
+            elif k in ("notes", "n"):
+                notes = v
+            elif k in ("group", "g"):
+                group = v
+            elif k in ("title", "t"):
+                title = v
+        else:
+            if not title and p:
+                title = p
+
+    if not title:
+        return None, f"Line {idx}: missing title."
+
+    # parse due (supports HH:MM / HHMM shortcuts via the shared entry parser)
+    parsed = parse_due_entry(due_s, now=now) if due_s else None
+    if due_s and parsed is None:
+        return None, (
+            f"Line {idx}: invalid due '{due_s}'. Use YYYY-MM-DD, MM/DD, HH:MM, HHMM, weekday words, or relative tokens like +2d +3h."
+        )
+
+    # normalize priority & repeat
+    if prio == "D":
+        rep = "daily"
+    if prio not in VALID_PRIOS:
+        prio = "X" if prio.upper() == "MISC" else "M"
+    prio = ("X" if prio.upper() == "MISC" else prio.upper())
+
+    if rep.startswith("custom:"):
+        raw_repeat = rep.split(":", 1)[1].strip()
+        if raw_repeat.isdigit() and int(raw_repeat) > 0:
+            rep = f"custom:{int(raw_repeat)}"
+        else:
+            return None, f"Line {idx}: custom repeat must be a positive day count, e.g. custom:6."
+    elif rep not in VALID_REPEATS:
+        return None, (
+            f"Line {idx}: invalid repeat '{rep}'. Use none/daily/weekdays/weekly/bi-weekly/monthly/custom:<days>."
+        )
+
+    return {
+        "title": title,
+        "notes": notes,
+        "priority": prio,
+        "due": fmt_due_for_store(parsed) if due_s else "",
+        "repeat": rep,
+        "created_at": now.isoformat(timespec="seconds"),
+        "completed_at": "",
+        "times_completed": 0,
+        "history": [],
+        "is_deleted": False,
+        "is_suspended": False,
+        "skip_count": 0,
+        "group": group.strip(),
+    }, None
+
+
+def _parse_chunk(start: int, lines: list, now: datetime) -> list:
+    # Process-pool work unit; must stay module-level so it pickles.
+    return [_parse_line(idx, raw, now) for idx, raw in enumerate(lines, start=start)]
+
+
+def _iter_parsed(lines, now: datetime, workers=1, chunk_size: int = PARSE_CHUNK_SIZE):
+    """Yield ``(line_number, _parse_line result)`` for every line, in input order.
+
+    ``workers`` > 1 (or None for one per CPU) parses ``chunk_size``-line chunks
+    in a ``ProcessPoolExecutor``. At most two chunks per worker are in flight,
+    so a lazy input is still read incrementally, and results are yielded
+    strictly in order, so callers see exactly what the serial path produces.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for idx, raw in enumerate(lines, start=1):
+            yield idx, _parse_line(idx, raw, now)
+        return
+
+    it = iter(lines)
+    pending = deque()
+    start = 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            while len(pending) < workers * 2:
+                chunk = list(islice(it, chunk_size))
+                if not chunk:
+                    break
+                pending.append((start, pool.submit(_parse_chunk, start, chunk, now)))
+                start += len(chunk)
+            if not pending:
+                break
+            first, future = pending.popleft()
+            for idx, res in enumerate(future.result(), start=first):
+                yield idx, res
+
+
+def _with_id(tid: int, fields: dict) -> dict:
+    # Keep "id" as the first key, like every other task constructor.
+    t = {"id": tid}
+    t.update(fields)
+    return t
+
+
+def _merge_fields(fields: dict) -> dict:
+    # What "merge" copies onto the existing task: only what the line actually set,
+    # and never a content_hash field (those already match).
+    out = {}
+    if fields["notes"]:
+        out["notes"] = fields["notes"]
+    if fields["priority"] != "M":
+        out["priority"] = fields["priority"]
+    return out
 
-def _parse_lines(lines, db, return_details: bool = False):
+
+def _check_duplicates(duplicates: str) -> None:
+    if duplicates not in DUPLICATE_MODES:
+        raise ValueError(f"duplicates must be one of {', '.join(DUPLICATE_MODES)}")
+
+
+def _parse_lines(lines, db, return_details: bool = False, workers=1, now=None,
+                 duplicates: str = DEFAULT_DUPLICATE_MODE, on_duplicate=None):
     """
     Parse iterable of lines and mutate db in-place.
+    ``workers`` > 1 (None = one per CPU) parses in a process pool; ids are still
+    assigned here, in line order, so the result is identical.
+    ``duplicates`` (see DUPLICATE_MODES) decides what happens to a line matching
+    a live task (or an earlier line) by content hash; ``on_duplicate(line_no,
+    existing_id)`` is called for each one. A db at the store's current rev is
+    checked against the store's hash index; any other db is hashed once here.
     Returns:
       - (added_count, failed_count)
       - OR (added_count, failed_count, error_details) when return_details=True
     """
+    _check_duplicates(duplicates)
     added = 0
     failed = 0
     error_details = []
+    # One reference instant for the whole import, so 'today'/'+2d'/weekdays all
+    # resolve against the same moment no matter how long the file is.
+    now = now or datetime.now()
+    index = None  # content hash -> task, for this import's lines (and unstored dbs)
+    conn = None
+    by_id = None
+    stack = ExitStack()
+    if duplicates != "allow":
+        index = {}
+        if db.get("_rev") is not None and db["_rev"] == model.current_rev():
+            # db is the store's current state: its task_hashes table already
+            # answers each line in O(1), without rehashing every task here.
+            conn = stack.enter_context(model.store_connection())
+        else:
+            for t in db["tasks"]:
+                if not t.get("is_deleted"):
+                    index.setdefault(model.content_hash(t), t)
 
-    for idx, raw in enumerate(lines, start=1):
-        line = raw.strip()
-        if not line or line.startswith("#"):
-            continue
-        if line.startswith("- "):
-            line = line[2:].strip()
-
-        parts = [p.strip() for p in line.split("|")]
-
-        title = ""
-        due_s = ""
-        prio = "M"
-        rep = "none"
-        notes = ""
-        group = ""
-
-        for p in parts:
-            if ":" in p:
-                k, v = p.split(":", 1)
-                k = k.strip().lower()
-                v = v.strip()
-                if k in ("due", "d"):
-                    due_s = v
-                elif k in ("prio", "priority", "p"):
-                    prio = v.upper()
-                elif k in ("repeat", "r"):
-                    rep = v.lower()
-                elif k in ("notes", "n"):
-                    notes = v
-                elif k in ("group", "g"):
-                    group = v
-                elif k in ("title", "t"):
-                    title = v
-            else:
-                if not title and p:
-                    title = p
-
-        if not title:
-            failed += 1
-            error_details.append(f"Line {idx}: missing title.")
-            continue
-
-        # parse due (supports HH:MM / HHMM shortcuts via the shared entry parser)
-        parsed = parse_due_entry(due_s) if due_s else None
-        if due_s and parsed is None:
-            failed += 1
-            error_details.append(
-                f"Line {idx}: invalid due '{due_s}'. Use YYYY-MM-DD, MM/DD, HH:MM, HHMM, weekday words, or relative tokens like +2d +3h."
-            )
-            continue
-
-        # normalize priority & repeat
-        if prio == "D":
-            rep = "daily"
-        if prio not in VALID_PRIOS:
-            prio = "X" if prio.upper() == "MISC" else "M"
-        prio = ("X" if prio.upper() == "MISC" else prio.upper())
-
-        if rep.startswith("custom:"):
-            raw_repeat = rep.split(":", 1)[1].strip()
-            if raw_repeat.isdigit() and int(raw_repeat) > 0:
-                rep = f"custom:{int(raw_repeat)}"
-            else:
+    try:
+        for idx, res in _iter_parsed(lines, now, workers):
+            if res is None:
+                continue
+            fields, error = res
+            if error:
                 failed += 1
-                error_details.append(f"Line {idx}: custom repeat must be a positive day count, e.g. custom:6.")
+                error_details.append(error)
                 continue
-        elif rep not in VALID_REPEATS:
-            failed += 1
-            error_details.append(
-                f"Line {idx}: invalid repeat '{rep}'. Use none/daily/weekdays/weekly/bi-weekly/monthly/custom:<days>."
-            )
-            continue
-
-        t = {
-            "id": db["next_id"],
-            "title": title,
-            "notes": notes,
-            "priority": prio,
-            "due": fmt_due_for_store(parsed) if due_s else "",
-            "repeat": rep,
-            "created_at": datetime.now().isoformat(timespec="seconds"),
-            "completed_at": "",
-            "times_completed": 0,
-            "history": [],
-            "is_deleted": False,
-            "is_suspended": False,
-            "skip_count": 0,
-            "group": group.strip(),
-        }
-        db["tasks"].append(t)
-        db["next_id"] += 1
-        added += 1
+            if index is not None:
+                h = model.content_hash(fields)
+                existing = index.get(h)
+                if existing is None and conn is not None:
+                    tid = model.find_duplicate(conn, h)
+                    if tid is not None:
+                        if by_id is None:
+                            by_id = {t["id"]: t for t in db["tasks"]}
+                        existing = by_id.get(tid)
+                if existing is not None:
+                    if on_duplicate:
+                        on_duplicate(idx, existing["id"])
+                    if duplicates == "skip":
+                        continue
+                    if duplicates == "merge":
+                        existing.update(_merge_fields(fields))
+                        continue
+                    fields["possible_duplicate"] = True
+            t = _with_id(db["next_id"], fields)
+            db["tasks"].append(t)
+            db["next_id"] += 1
+            added += 1
+            if index is not None:
+                index.setdefault(h, t)
+    finally:
+        stack.close()
 
     if return_details:
         return added, failed, error_details
     return added, failed
 
 
-def import_from_txt(path: str, db: dict, return_details: bool = False):
+def import_from_txt(path: str, db: dict, return_details: bool = False, workers=1, **dup_kwargs):
     """
     Returns (added_count, failed_count) or (added_count, failed_count, error_details).
     Side effect: appends to db["tasks"] and increments db["next_id"].
     """
     with open(path, "r", encoding="utf-8") as f:
-        return _parse_lines(f, db, return_details=return_details)
+        return _parse_lines(f, db, return_details=return_details, workers=workers, **dup_kwargs)
 
 
-def import_from_string(text: str, db: dict, return_details: bool = False):
+def import_from_string(text: str, db: dict, return_details: bool = False, workers=1, **dup_kwargs):
     """
     Same as file import, but takes raw text (multi-line).
     """
-    return _parse_lines(text.splitlines(), db, return_details=return_details)
+    return _parse_lines(text.splitlines(), db, return_details=return_details, workers=workers, **dup_kwargs)
+
+
+def import_stream(lines, batch_size: int = IMPORT_BATCH_SIZE, on_progress=None, on_error=None, lock=None,
+                  workers=1, duplicates: str = DEFAULT_DUPLICATE_MODE, on_duplicate=None):
+    """Stream lines straight into the SQLite store in fixed-size batches.
+
+    ``lines`` is any lazy iterable (an open file, a socket reader, a generator);
+    each line is validated with the same rules as ``_parse_lines`` and every
+    ``batch_size`` valid tasks are committed with ``model.append_tasks`` in
+    their own transaction. Existing tasks are never rewritten and memory stays
+    bounded by the batch size, whatever the input length.
+
+    ``on_error(detail)`` is called for every rejected line and
+    ``on_progress(added, failed, lines_read)`` after each committed batch.
+    ``lock``, if given, is held around each batch commit so the import
+    interleaves safely with read-modify-write savers. ``workers`` > 1 (None =
+    one per CPU) parses in a process pool while the batches are stored here.
+    ``duplicates``/``on_duplicate`` work as in ``_parse_lines``, looked up in
+    the store's hash index (``model.find_duplicate``); ``existing_id`` is None
+    when the match is an earlier line of this import not yet committed.
+
+    Returns (added_count, failed_count, error_details); details are capped at
+    MAX_ERROR_DETAILS (use ``on_error`` to see them all).
+    """
+    added = 0
+    failed = 0
+    error_details = []
+    lines_read = 0
+    _check_duplicates(duplicates)
+    now = datetime.now()
+    batch = []
+    pending = {}  # content hash -> fields, for this batch's not-yet-stored tasks
+    merges = []   # (existing id, fields) for "merge" against stored tasks
+
+    with model.store_connection() as conn:
+        def commit():
+            if batch:
+                model.append_tasks(batch, conn)
+            if merges:
+                model.merge_task_fields(merges, conn)
+
+        def flush():
+            nonlocal added
+            if batch or merges:
+                if lock is not None:
+                    with lock:
+                        commit()
+                else:
+                    commit()
+                added += len(batch)
+                batch.clear()
+                merges.clear()
+                pending.clear()
+            if on_progress:
+                on_progress(added, failed, lines_read)
+
+        for lines_read, res in _iter_parsed(lines, now, workers):
+            if res is None:
+                continue
+            fields, error = res
+            if error:
+                failed += 1
+                if len(error_details) < MAX_ERROR_DETAILS:
+                    error_details.append(error)
+                if on_error:
+                    on_error(error)
+                continue
+            if duplicates != "allow":
+                h = model.content_hash(fields)
+                prior = pending.get(h)
+                existing_id = None if prior is not None else model.find_duplicate(conn, h)
+                if prior is None and existing_id is None:
+                    pending[h] = fields
+                else:
+                    if on_duplicate:
+                        on_duplicate(lines_read, existing_id)
+                    if duplicates == "skip":
+                        continue
+                    if duplicates == "merge":
+                        if prior is not None:
+                            prior.update(_merge_fields(fields))
+                        elif _merge_fields(fields):
+                            merges.append((existing_id, _merge_fields(fields)))
+                        if len(merges) >= batch_size:
+                            flush()
+                        continue
+                    fields["possible_duplicate"] = True
+            batch.append(fields)
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+
+    return added, failed, error_details
+
+
+def import_file_stream(path: str, **kwargs):
+    """``import_stream`` over a file, reading it lazily line by line.
+
+    Files of PARALLEL_MIN_BYTES or more are parsed on every CPU unless
+    ``workers`` is passed explicitly.
+    """
+    if "workers" not in kwargs and os.path.getsize(path) >= PARALLEL_MIN_BYTES:
+        kwargs["workers"] = None
+    with open(path, "r", encoding="utf-8") as f:
+        return import_stream(f, **kwargs)
@@ -1,6 +1,9 @@
+import hashlib
 import json
 import os
 import sqlite3
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, date, timedelta
 from typing import Optional, Dict, Any, List
@@ -16,6 +19,7 @@ DATA_FILE = DATA_DIR / "tasks_gui.json"    # legacy JSON (migrated from, then ke
 BACKUP_FILE = DATA_DIR / "tasks_gui.json.bak"
 BACKUP_DIR = DATA_DIR / "backups"
 DAILY_BACKUPS_KEEP = 14  # ~2 weeks of point-in-time recovery; cheap (one write/day)
+BACKUP_INTERVAL_SECONDS = 300  # .bak is refreshed at most this often (a full JSON dump + fsync)
 LEGACY_DATA_FILE = ROOT_DIR / "tasks_gui.json"
 LEGACY_BACKUP_FILE = ROOT_DIR / "tasks_gui.json.bak"
 
@@ -46,6 +50,7 @@ def default_settings():
         "ui_time_scope": "today",
         "ui_time_custom_date": "",
         "ui_theme": "light",
+        "document_backend": "files",   # or "sqlite": see documents.set_document_backend
     }
 
 def normalize_settings(settings: dict) -> dict:
@@ -85,45 +90,292 @@ def _connect() -> sqlite3.Connection:
 def _init_schema(conn: sqlite3.Connection) -> None:
     conn.execute("CREATE TABLE IF NOT EXISTS tasks (id INTEGER PRIMARY KEY, data TEXT NOT NULL)")
     conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    # Duplicate-detection index: one row per task, hash NULL for deleted tasks.
+    conn.execute("CREATE TABLE IF NOT EXISTS task_hashes (id INTEGER PRIMARY KEY, hash TEXT)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_task_hashes_hash ON task_hashes(hash)")
+    # Where each task's document lives, relative to task_documents/ (see
+    # documents.DOC_PATHS). Not part of the task blob, so snapshots leave it alone.
+    conn.execute("CREATE TABLE IF NOT EXISTS doc_paths (id INTEGER PRIMARY KEY, path TEXT NOT NULL)")
+    # Change feed: the rev at which each task id was last written or removed
+    # (deleted=1 is a tombstone), for "what changed since rev N" (changes_since).
+    conn.execute("CREATE TABLE IF NOT EXISTS task_changes (id INTEGER PRIMARY KEY, "
+                 "rev INTEGER NOT NULL, deleted INTEGER NOT NULL DEFAULT 0)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_task_changes_rev ON task_changes(rev)")
+    # SQLite document backend (documents.set_document_backend("sqlite")): a task's
+    # private notes and each day's journal sections, plus the hash/stamp of the
+    # copy last exported to (or imported from) the folder layout.
+    conn.execute("CREATE TABLE IF NOT EXISTS doc_task_notes (id INTEGER PRIMARY KEY, "
+                 "private TEXT NOT NULL DEFAULT '', version INTEGER NOT NULL DEFAULT 0, "
+                 "export_path TEXT, export_hash TEXT, export_stamp TEXT)")
+    conn.execute("CREATE TABLE IF NOT EXISTS doc_journals (day TEXT PRIMARY KEY, "
+                 "top TEXT NOT NULL DEFAULT '', bottom TEXT NOT NULL DEFAULT '', "
+                 "version INTEGER NOT NULL DEFAULT 0, export_hash TEXT, export_stamp TEXT)")
     conn.commit()
 
-def _read_all(conn: sqlite3.Connection) -> dict:
-    tasks = [json.loads(r[0]) for r in conn.execute("SELECT data FROM tasks ORDER BY id")]
+def _norm_text(v) -> str:
+    return " ".join(str(v or "").split()).casefold()
+
+def content_hash(t: dict) -> str:
+    """Normalized identity of a task for duplicate detection.
+
+    Covers title, group, due and repeat; case and runs of whitespace don't count,
+    and an empty repeat is the same as "none".
+    """
+    key = "\x1f".join((
+        _norm_text(t.get("title")),
+        _norm_text(t.get("group")),
+        str(t.get("due") or "").strip(),
+        (t.get("repeat") or "none").strip().lower(),
+    ))
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()
+
+def _hash_row(t: dict) -> tuple:
+    return (t["id"], None if t.get("is_deleted") else content_hash(t))
+
+def _rebuild_hash_index(conn: sqlite3.Connection) -> None:
+    with conn:
+        conn.execute("DELETE FROM task_hashes")
+        conn.executemany("INSERT INTO task_hashes(id, hash) VALUES(?, ?)",
+                         (_hash_row(json.loads(d)) for (d,) in conn.execute("SELECT data FROM tasks")))
+
+def _ensure_hash_index(conn: sqlite3.Connection) -> None:
+    # Stores written before the index existed (or by an older build) re-derive it.
+    n_tasks, n_hashes = conn.execute(
+        "SELECT (SELECT COUNT(*) FROM tasks), (SELECT COUNT(*) FROM task_hashes)").fetchone()
+    if n_tasks != n_hashes:
+        _rebuild_hash_index(conn)
+
+def find_duplicate(conn: sqlite3.Connection, h: str) -> Optional[int]:
+    """Id of a live (not deleted) task with content hash ``h``, or None."""
+    row = conn.execute("SELECT id FROM task_hashes WHERE hash=? ORDER BY id LIMIT 1", (h,)).fetchone()
+    return row[0] if row else None
+
+def _read_all(conn: sqlite3.Connection, keep_base: bool = False) -> dict:
+    rows = conn.execute("SELECT id, data FROM tasks ORDER BY id").fetchall()
+    tasks = [json.loads(data) for _, data in rows]
     meta = {k: json.loads(v) for k, v in conn.execute("SELECT key, value FROM meta")}
     next_id = meta.get("next_id")
     if not isinstance(next_id, int) or next_id < 1:
         next_id = (max((t.get("id", 0) for t in tasks), default=0) + 1)
-    return {
+    db = {
         "version": meta.get("version", 1),
         "next_id": next_id,
         "settings": meta.get("settings", {}),
         "tasks": tasks,
         "_rev": meta.get("rev", 0),
+        "_loaded_next_id": next_id,  # ids from here on were allocated by this copy (see save_db)
     }
+    if keep_base:
+        db["_base"] = dict(rows)  # the rows as read, for save_db(rebase=True)
+    return db
+
+# Runtime-derived keys that older builds stored in every blob; dropped on save.
+# Document locations live in the doc_paths table now.
+DERIVED_TASK_KEYS = frozenset({"doc_path"})
+
+def persistable_task(t: dict) -> dict:
+    """The task as it should be persisted: transient (underscore) and derived keys removed."""
+    if not any(k.startswith("_") or k in DERIVED_TASK_KEYS for k in t):
+        return t
+    return {k: v for k, v in t.items() if not k.startswith("_") and k not in DERIVED_TASK_KEYS}
+
+# Tombstones of removed tasks are kept for this many revs; a client further
+# behind than that (meta "changes_floor") gets a full snapshot instead.
+CHANGE_TOMBSTONE_REVS = 1000
 
-def _write_all(conn: sqlite3.Connection, db: dict) -> int:
-    rev = 0
-    row = conn.execute("SELECT value FROM meta WHERE key='rev'").fetchone()
-    if row:
+def _record_changes(conn: sqlite3.Connection, old_rev: int, new_rev: int, upserted, deleted=()) -> None:
+    """Log task ids written/removed at ``new_rev`` (inside the caller's transaction)."""
+    if _meta_get(conn, "changes_floor") is None:
+        _meta_set(conn, "changes_floor", old_rev)  # no history before the feed existed
+    conn.executemany("INSERT OR REPLACE INTO task_changes(id, rev, deleted) VALUES(?, ?, 0)",
+                     [(tid, new_rev) for tid in upserted])
+    conn.executemany("INSERT OR REPLACE INTO task_changes(id, rev, deleted) VALUES(?, ?, 1)",
+                     [(tid, new_rev) for tid in deleted])
+    cutoff = new_rev - CHANGE_TOMBSTONE_REVS
+    if cutoff > 0 and conn.execute("DELETE FROM task_changes WHERE deleted=1 AND rev <= ?", (cutoff,)).rowcount:
+        _meta_set(conn, "changes_floor", max(cutoff, _meta_get(conn, "changes_floor", 0)))
+
+def changes_since(since: int, conn: Optional[sqlite3.Connection] = None) -> Optional[dict]:
+    """What changed after rev ``since``: ``{"rev", "upserted": [task], "deleted": [id]}``,
+    read in one snapshot. None when the feed can't answer (``since`` predates its
+    history or is ahead of the store) and the caller needs a full load."""
+    own = conn is None
+    if own:
+        conn = _open_store()
+    try:
+        conn.execute("BEGIN")  # rev and rows from the same snapshot
         try:
-            rev = int(json.loads(row[0]))
-        except Exception:
-            rev = 0
-    new_rev = rev + 1
+            rev = int(_meta_get(conn, "rev", 0) or 0)
+            if since == rev:
+                return {"rev": rev, "upserted": [], "deleted": []}
+            floor = _meta_get(conn, "changes_floor")
+            if floor is None or since < floor or since > rev:
+                return None
+            upserted, deleted = [], []
+            for tid, gone, data in conn.execute(
+                    "SELECT c.id, c.deleted, t.data FROM task_changes c LEFT JOIN tasks t ON t.id = c.id"
+                    " WHERE c.rev > ? ORDER BY c.id", (since,)):
+                if gone or data is None:
+                    deleted.append(tid)
+                else:
+                    upserted.append(json.loads(data))
+            return {"rev": rev, "upserted": upserted, "deleted": deleted}
+        finally:
+            conn.rollback()
+    finally:
+        if own:
+            conn.close()
+
+def _merge_task(base: dict, ours: dict, theirs: dict) -> list:
+    """Three-way merge of one task into ``ours`` (in place): fields only the other
+    writer changed are taken from ``theirs``. Returns the fields both changed
+    differently; those keep this copy's value."""
+    clashes = []
+    for k in sorted(set(base) | set(ours) | set(theirs), key=str):
+        b, o, t = base.get(k, _MISSING), ours.get(k, _MISSING), theirs.get(k, _MISSING)
+        if t == b or o == t:
+            continue
+        if o == b:
+            if t is _MISSING:
+                del ours[k]
+            else:
+                ours[k] = t
+        else:
+            clashes.append(k)
+    return clashes
+
+_MISSING = object()
+
+def _fold_in_external(conn: sqlite3.Connection, db: dict) -> tuple[list, list]:
+    """Bring ``db`` up to date with what other processes wrote after it was read
+    (``db["_rev"]``), in place and inside the caller's write transaction.
+
+    Tasks only they touched are taken as stored; tasks only this copy touched
+    keep its edits. A task both changed is merged field by field against the
+    version this copy read (``db["_base"]``, kept by ``load_db(keep_base=True)``);
+    fields both changed keep this copy's value and are reported, as is a task
+    one side removed while the other edited it (the edit is kept). Without a
+    base the stored version wins. Tasks this copy added meanwhile (ids from
+    ``_loaded_next_id`` on) move past the ids the other writer handed out.
+    Returns ``(moved tasks, [(task, [clashing fields])])``.
+    """
+    since = db["_rev"]
+    base_next = db.get("_loaded_next_id", db.get("next_id", 1))
+    base = db.get("_base")
+    floor = _meta_get(conn, "changes_floor")
+    if floor is not None and floor <= since:
+        theirs = dict(conn.execute(
+            "SELECT c.id, t.data FROM task_changes c LEFT JOIN tasks t ON t.id = c.id WHERE c.rev > ?",
+            (since,)))  # data None: removed
+    else:  # the feed doesn't reach back that far: every stored row counts as theirs
+        theirs = dict(conn.execute("SELECT id, data FROM tasks"))
+        theirs.update((t["id"], None) for t in db["tasks"] if t["id"] < base_next and t["id"] not in theirs)
+    if base is not None:  # rows they rewrote unchanged (e.g. the full-snapshot fallback) aren't news
+        theirs = {tid: data for tid, data in theirs.items() if base.get(tid) != data}
+    stored_next = _meta_get(conn, "next_id", base_next)
+    moved = []
+    if isinstance(stored_next, int) and stored_next > base_next:
+        shift = stored_next - base_next
+        moved = [t for t in db["tasks"] if t["id"] >= base_next]
+        for t in moved:
+            t["id"] += shift
+        db["next_id"] = db.get("next_id", base_next) + shift
+    tasks, conflicts = [], []
+    for t in db["tasks"]:
+        tid = t["id"]
+        if tid not in theirs:
+            tasks.append(t)
+            continue
+        data = theirs.pop(tid)
+        before = base.get(tid) if base is not None else None
+        mine_changed = before is not None and json.dumps(persistable_task(t)) != before
+        if not mine_changed:
+            if data is not None:
+                tasks.append(json.loads(data))
+        elif data is None:
+            tasks.append(t)  # removed there, edited here: keep the edit
+            conflicts.append((t, ["deleted elsewhere"]))
+        else:
+            clashes = _merge_task(json.loads(before), t, json.loads(data))
+            tasks.append(t)
+            if clashes:
+                conflicts.append((t, clashes))
+    for tid, data in theirs.items():
+        if data is None:
+            continue
+        t = json.loads(data)
+        tasks.append(t)  # new there, or edited there after this copy removed it
+        if base is not None and tid in base:
+            conflicts.append((t, ["deleted here"]))
+    tasks.sort(key=lambda t: t["id"])
+    db["tasks"] = tasks
+    return moved, conflicts
+
+# Called as hook(conn) inside save_db's transaction, after the tasks are written,
+# so related rows (e.g. SQLite-backed journal entries) commit atomically with them.
+SAVE_HOOKS: list = []
+
+def _write_all(conn: sqlite3.Connection, db: dict, rebase: bool = False,
+               touched=None) -> tuple[int, dict]:
+    folded = {"moved": [], "conflicts": []}
+    base = db.get("_base")
     with conn:  # single atomic transaction
-        conn.execute("DELETE FROM tasks")
-        conn.executemany(
-            "INSERT INTO tasks(id, data) VALUES(?, ?)",
-            [(t["id"], json.dumps(t)) for t in db.get("tasks", [])],
-        )
-        conn.execute("DELETE FROM meta")
-        conn.executemany("INSERT INTO meta(key, value) VALUES(?, ?)", [
+        # Take the write lock before reading rev and the stored rows, so a
+        # concurrent writer (the other front-end) can't compute the same rev.
+        conn.execute("BEGIN IMMEDIATE")
+        rev = 0
+        row = conn.execute("SELECT value FROM meta WHERE key='rev'").fetchone()
+        if row:
+            try:
+                rev = int(json.loads(row[0]))
+            except Exception:
+                rev = 0
+        if rebase and db.get("_rev") is not None and db["_rev"] != rev:
+            folded["moved"], folded["conflicts"] = _fold_in_external(conn, db)
+            touched = None  # the fold may have replaced any row
+        tasks = db.get("tasks", [])
+        new_rev = rev + 1
+        # Diff against the stored rows: only changed/new tasks are written and
+        # only removed ones deleted, and exactly those go into the change feed.
+        # With ``touched`` only those ids are compared (the rest are taken as
+        # unchanged), so a one-task edit doesn't serialize every task.
+        if touched is None:
+            stored = dict(conn.execute("SELECT id, data FROM tasks"))
+        else:
+            touched = set(touched)
+            stored = dict(conn.execute("SELECT id, data FROM tasks WHERE id IN (SELECT value FROM json_each(?))",
+                                       (json.dumps(sorted(touched)),)))
+            tasks = [t for t in tasks if t["id"] in touched]
+        changed, written = [], {}
+        for t in tasks:
+            data = json.dumps(persistable_task(t))
+            written[t["id"]] = data
+            if stored.pop(t["id"], None) != data:
+                changed.append((t, data))
+        removed = list(stored)
+        conn.executemany("DELETE FROM tasks WHERE id=?", [(tid,) for tid in removed])
+        conn.executemany("DELETE FROM task_hashes WHERE id=?", [(tid,) for tid in removed])
+        conn.executemany("INSERT OR REPLACE INTO tasks(id, data) VALUES(?, ?)",
+                         [(t["id"], data) for t, data in changed])
+        conn.executemany("INSERT OR REPLACE INTO task_hashes(id, hash) VALUES(?, ?)",
+                         [_hash_row(t) for t, _ in changed])
+        _record_changes(conn, rev, new_rev, [t["id"] for t, _ in changed], removed)
+        conn.executemany("INSERT OR REPLACE INTO meta(key, value) VALUES(?, ?)", [
             ("version", json.dumps(db.get("version", 1))),
             ("next_id", json.dumps(db.get("next_id", 1))),
             ("settings", json.dumps(db.get("settings", {}))),
             ("rev", json.dumps(new_rev)),
         ])
-    return new_rev
+        for hook in list(SAVE_HOOKS):
+            hook(conn)
+    if base is not None:  # committed: the base is now what the store holds
+        if touched is None:
+            db["_base"] = written
+        else:
+            base.update(written)
+            for tid in removed:
+                base.pop(tid, None)
+    return new_rev, folded
 
 def _migrate_from_json_if_needed(conn: sqlite3.Connection) -> None:
     """One-time import of the legacy JSON into SQLite, preserving the original file."""
@@ -158,7 +410,8 @@ def current_rev():
     except Exception:
         return None
 
-def load_db():
+def _open_store() -> sqlite3.Connection:
+    """Connect with the schema in place and any legacy JSON migrated."""
     # Legacy: a JSON file left at the repo root migrates into the data dir first.
     if not DB_FILE.exists() and not DATA_FILE.exists() and LEGACY_DATA_FILE.exists():
         DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -168,7 +421,139 @@ def load_db():
     conn = _connect()
     _init_schema(conn)
     _migrate_from_json_if_needed(conn)
-    db = _read_all(conn)
+    _ensure_hash_index(conn)
+    return conn
+
+@contextmanager
+def store_connection():
+    """A ready-to-use store connection for incremental (non-snapshot) writers."""
+    conn = _open_store()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+def _meta_get(conn: sqlite3.Connection, key: str, default=None):
+    row = conn.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+    if not row:
+        return default
+    try:
+        return json.loads(row[0])
+    except Exception:
+        return default
+
+def _meta_set(conn: sqlite3.Connection, key: str, value) -> None:
+    conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES(?, ?)", (key, json.dumps(value)))
+
+def append_tasks(tasks: list, conn: Optional[sqlite3.Connection] = None) -> int:
+    """Insert new tasks in one bounded transaction, leaving existing rows untouched.
+
+    Ids are allocated from ``next_id`` inside the transaction (each task dict gets
+    its ``id`` set); ``next_id`` and ``rev`` are bumped once. Unlike ``save_db``
+    this never rewrites the rest of the store or takes a ``.bak`` snapshot, so
+    its cost depends only on the batch size. Returns the new rev.
+    """
+    own = conn is None
+    if own:
+        conn = _open_store()
+    try:
+        conn.execute("BEGIN IMMEDIATE")  # take the write lock before reading next_id
+        try:
+            next_id = _meta_get(conn, "next_id")
+            max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM tasks").fetchone()[0]
+            if not isinstance(next_id, int) or next_id <= max_id:
+                next_id = max_id + 1
+            rows = []
+            for t in tasks:
+                t["id"] = next_id
+                next_id += 1
+                rows.append((t["id"], json.dumps(persistable_task(t))))
+            conn.executemany("INSERT INTO tasks(id, data) VALUES(?, ?)", rows)
+            conn.executemany("INSERT INTO task_hashes(id, hash) VALUES(?, ?)",
+                             [_hash_row(t) for t in tasks])
+            old_rev = int(_meta_get(conn, "rev", 0) or 0)
+            new_rev = old_rev + 1
+            _record_changes(conn, old_rev, new_rev, [t["id"] for t in tasks])
+            _meta_set(conn, "next_id", next_id)
+            _meta_set(conn, "rev", new_rev)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return new_rev
+    finally:
+        if own:
+            conn.close()
+
+def merge_task_fields(updates: list, conn: Optional[sqlite3.Connection] = None) -> int:
+    """Apply ``[(id, {field: value})]`` to stored tasks in one transaction.
+
+    Only for fields outside ``content_hash`` (notes, priority...), so the
+    duplicate index stays valid. Missing ids are ignored. Returns the new rev.
+    """
+    own = conn is None
+    if own:
+        conn = _open_store()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            touched = []
+            for tid, fields in updates:
+                row = conn.execute("SELECT data FROM tasks WHERE id=?", (tid,)).fetchone()
+                if not row:
+                    continue
+                t = json.loads(row[0])
+                t.update(fields)
+                conn.execute("UPDATE tasks SET data=? WHERE id=?", (json.dumps(persistable_task(t)), tid))
+                touched.append(tid)
+            old_rev = int(_meta_get(conn, "rev", 0) or 0)
+            new_rev = old_rev + 1
+            _record_changes(conn, old_rev, new_rev, touched)
+            _meta_set(conn, "rev", new_rev)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return new_rev
+    finally:
+        if own:
+            conn.close()
+
+def load_doc_paths(conn: sqlite3.Connection) -> Dict[int, str]:
+    """``{task id: document path relative to task_documents/}``."""
+    return dict(conn.execute("SELECT id, path FROM doc_paths"))
+
+def save_doc_paths(changes: Dict[int, Optional[str]], conn: sqlite3.Connection) -> None:
+    """Upsert ``{id: relative path}`` in one transaction; None removes the entry."""
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO doc_paths(id, path) VALUES(?, ?)",
+                         [(tid, p) for tid, p in changes.items() if p is not None])
+        conn.executemany("DELETE FROM doc_paths WHERE id=?",
+                         [(tid,) for tid, p in changes.items() if p is None])
+
+def iter_tasks(conn: Optional[sqlite3.Connection] = None):
+    """Yield stored tasks one at a time, in id order, straight off a cursor.
+
+    Nothing is materialized beyond the current row, so memory stays flat however
+    large the store is (exports, scans). Opens and closes its own connection
+    unless one is passed in.
+    """
+    own = conn is None
+    if own:
+        conn = _open_store()
+    try:
+        for (data,) in conn.execute("SELECT data FROM tasks ORDER BY id"):
+            yield json.loads(data)
+    finally:
+        if own:
+            conn.close()
+
+def load_db(keep_base: bool = False):
+    """The whole store as a dict. ``keep_base`` also keeps the rows as read
+    (``db["_base"]``), so a later ``save_db(db, rebase=True)`` can tell this
+    copy's edits from another writer's and merge them per field."""
+    conn = _open_store()
+    db = _read_all(conn, keep_base)
     conn.close()
     if "version" not in db:
         db["version"] = 1
@@ -185,7 +570,7 @@ def _rotate_daily_backup(payload: dict):
         daily = BACKUP_DIR / f"tasks_gui_{date.today().isoformat()}.json"
         if daily.exists():
             return
-        _atomic_write_json(daily, payload)
+        _atomic_write_json(daily, {k: v for k, v in payload.items() if k != "_base"})
         snaps = sorted(BACKUP_DIR.glob("tasks_gui_*.json"))
         for old in snaps[:-DAILY_BACKUPS_KEEP]:
             try:
@@ -195,20 +580,40 @@ def _rotate_daily_backup(payload: dict):
     except Exception:
         pass
 
-def save_db(db):
+def _backup_due() -> bool:
+    try:
+        return time.time() - BACKUP_FILE.stat().st_mtime >= BACKUP_INTERVAL_SECONDS
+    except OSError:
+        return True
+
+def save_db(db, rebase: bool = False, touched=None) -> dict:
+    """Write ``db`` as the new state of the store and stamp its ``_rev``.
+
+    A plain save overwrites whatever other processes wrote since ``db`` was
+    read. With ``rebase`` their writes are folded in first (see
+    ``_fold_in_external``), atomically with the save. Returns ``{"moved":
+    [tasks that had to take new ids (their document paths change with the
+    id)], "conflicts": [(task, [fields both sides changed])]}``.
+    ``touched``: the ids of every task the caller added, changed or removed;
+    only those are compared with the store. Settings are always written.
+    """
     conn = _connect()
     _init_schema(conn)
-    # .bak = the previous good state as readable JSON, for quick manual recovery.
-    try:
-        prev = _read_all(conn)
-        if prev["tasks"] or prev["settings"]:
-            _atomic_write_json(BACKUP_FILE, prev)
-    except Exception:
-        pass
-    new_rev = _write_all(conn, db)
+    # .bak = an earlier good state as readable JSON, for quick manual recovery;
+    # refreshed at most every BACKUP_INTERVAL_SECONDS, not on every save.
+    if _backup_due():
+        try:
+            prev = _read_all(conn)
+            if prev["tasks"] or prev["settings"]:
+                _atomic_write_json(BACKUP_FILE, prev)
+        except Exception:
+            pass
+    new_rev, folded = _write_all(conn, db, rebase, touched)
     conn.close()
     db["_rev"] = new_rev  # keep the caller's dict in sync so it knows its own write
+    db["_loaded_next_id"] = db.get("next_id", 1)
     _rotate_daily_backup(db)
+    return folded
 
 def get_task(db, tid: int):
     for t in db["tasks"]:
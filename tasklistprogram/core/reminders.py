@@ -1,8 +1,14 @@
 # reminders.py
+import heapq
+import threading
 from datetime import datetime, timedelta
+from typing import Callable, Optional
+
 from .dates import parse_stored_due
 from .constants import priority_rank
 
+DEFAULT_REMINDER_SETTINGS = {"reminders_enabled": True, "reminder_count": 4, "reminder_min_priority": "M"}
+
 def _checkpoints_between(start: datetime, end: datetime, count: int) -> list[datetime]:
     ONE_DAY = timedelta(days=1)
     checkpoints = []
@@ -20,80 +26,262 @@ def _checkpoints_between(start: datetime, end: datetime, count: int) -> list[dat
             checkpoints.append((start + timedelta(seconds=step.total_seconds()*i)).replace(second=0, microsecond=0))
     return checkpoints
 
-def pending_reminders(db: dict, now: datetime | None = None) -> list[dict]:
-    """Build rows for the RemindersDialog."""
+def _due_checkpoints(t: dict, s: dict, now: datetime) -> list[datetime]:
+    # The checkpoints of the task's current due (none once it has passed),
+    # counted from its creation but never more than a year back.
+    d = parse_stored_due(t.get("due", "")) if t.get("due") else None
+    if not d or d <= now:
+        return []
+    try:
+        c_at = datetime.fromisoformat(t.get("created_at", ""))
+    except Exception:
+        c_at = now
+    start = max(c_at, now.replace(year=now.year-1))
+    count = max(1, int(s.get("reminder_count", 4)))
+    return _checkpoints_between(start, d, count)
+
+
+def task_checkpoints(t: dict, settings: dict | None = None, now: datetime | None = None) -> list[datetime]:
+    """All checkpoints for *t* under *settings*, or [] if it can't remind at all."""
     now = now or datetime.now()
-    s = db.get("settings", {"reminders_enabled": True, "reminder_count": 4, "reminder_min_priority": "M"})
+    s = settings or DEFAULT_REMINDER_SETTINGS
     if not s.get("reminders_enabled", True):
         return []
+    if t.get("is_deleted") or t.get("completed_at") or t.get("is_suspended"):
+        return []
+    if priority_rank(t.get("priority", "M")) < priority_rank(s.get("reminder_min_priority", "M")):
+        return []
+    return _due_checkpoints(t, s, now)
+
+
+def pending_checkpoint(t: dict, settings: dict | None = None, now: datetime | None = None) -> Optional[str]:
+    """Key of the latest unacknowledged checkpoint at or before *now*, or None."""
+    now = now or datetime.now()
+    seen = set(t.get("acknowledged_checkpoints", []))
+    current = None
+    for cp in task_checkpoints(t, settings, now):
+        if cp > now:
+            break
+        key = cp.isoformat(timespec="minutes")
+        if key not in seen:
+            current = key
+    return current
 
-    count = max(1, int(s.get("reminder_count", 4)))
-    min_rank = priority_rank(s.get("reminder_min_priority", "M"))
-    rows = []
 
+def pending_reminders(db: dict, now: datetime | None = None) -> list[dict]:
+    """Build rows for the RemindersDialog."""
+    now = now or datetime.now()
+    s = db.get("settings")
+    rows = []
     for t in db["tasks"]:
-        if t.get("is_deleted") or t.get("completed_at"):
-            continue
-        p = (t.get("priority","M") or "M").upper()
-        if priority_rank(p) < min_rank:
-            continue
-
-        d = parse_stored_due(t.get("due",""))
-        if not d or d <= now:
-            continue
-
-        try:
-            c_at = datetime.fromisoformat(t.get("created_at",""))
-        except Exception:
-            c_at = now
-
-        start = max(c_at, now.replace(year=now.year-1))
-        cps = _checkpoints_between(start, d, count)
-        if not cps:
-            continue
-
-        seen = set(t.get("acknowledged_checkpoints", []))
-        current_cp = None
-        for cp in cps:
-            key = cp.isoformat(timespec="minutes")
-            if cp <= now and key not in seen:
-                current_cp = key
-        if current_cp:
+        key = pending_checkpoint(t, s, now)
+        if key:
+            d = parse_stored_due(t["due"])
             rows.append({
                 "id": t["id"],
                 "title": t.get("title",""),
-                "priority": p,
-                "_due_str": (d.strftime("%Y-%m-%d %H:%M") if len((t.get("due") or ""))>10 else d.strftime("%Y-%m-%d")),
-                "_cp_key": current_cp
+                "priority": (t.get("priority","M") or "M").upper(),
+                "_due_str": (d.strftime("%Y-%m-%d %H:%M") if len(t["due"])>10 else d.strftime("%Y-%m-%d")),
+                "_cp_key": key
             })
-
     return rows
 
 def reminder_chip(t: dict, settings: dict | None = None, now: datetime | None = None) -> str:
     """Return '⏰' if a checkpoint is pending for this task, else ''."""
-    now = now or datetime.now()
-    s = settings or {"reminders_enabled": True, "reminder_count": 4, "reminder_min_priority": "M"}
-    if not s.get("reminders_enabled", True):
-        return ""
+    return "⏰" if pending_checkpoint(t, settings, now) else ""
 
-    if priority_rank(t.get("priority", "M")) < priority_rank(s.get("reminder_min_priority", "M")):
-        return ""
 
-    d = parse_stored_due(t.get("due","")) if t.get("due") else None
-    if not d or d <= now:
-        return ""
+# ===== Next-fire scheduling =====
+# Instead of re-scanning every task on a timer, keep a min-heap of each task's next
+# unacknowledged checkpoint and sleep until the earliest one. A task only costs
+# work when it is (re)armed after an edit or when its own checkpoint fires.
 
-    try:
-        c_at = datetime.fromisoformat(t.get("created_at",""))
-    except Exception:
-        c_at = now
+def reachable_checkpoint_keys(t: dict, settings: dict | None = None, now: datetime | None = None) -> set[str]:
+    """Keys of every checkpoint the task's *current* due can still produce.
 
-    start = max(c_at, now.replace(year=now.year-1))
-    count = max(1, int(s.get("reminder_count", 4)))
-    cps = _checkpoints_between(start, d, count)
+    Deliberately ignores priority and the on/off switch (those can change back
+    without moving the due), so only acknowledgements orphaned by a due change,
+    a recurrence rollover or a different ``reminder_count`` fall outside it.
+    """
+    now = now or datetime.now()
+    s = settings or DEFAULT_REMINDER_SETTINGS
+    return {cp.isoformat(timespec="minutes") for cp in _due_checkpoints(t, s, now)}
+
+
+def next_checkpoint(t: dict, settings: dict | None = None, now: datetime | None = None):
+    """Earliest unacknowledged checkpoint strictly after *now*: (instant, key) or None."""
+    now = now or datetime.now()
     seen = set(t.get("acknowledged_checkpoints", []))
-    for cp in cps:
+    for cp in task_checkpoints(t, settings, now):
         key = cp.isoformat(timespec="minutes")
-        if cp <= now and key not in seen:
-            return "⏰"
-    return ""
+        if cp > now and key not in seen:
+            return cp, key
+    return None
+
+
+class ReminderSchedule:
+    """Min-heap of the next checkpoint instant per task.
+
+    Stale heap entries (the task was re-armed or removed since) are skipped lazily
+    on pop, so re-arming one task is O(log n) and never touches the others.
+    ``stats`` records wakeups and firing latency (how late past the checkpoint a
+    firing happened) so the drivers can be measured.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[datetime, int, str]] = []
+        self._armed: dict[int, tuple[datetime, str]] = {}
+        self._tasks: dict[int, dict] = {}
+        self._settings: dict = dict(DEFAULT_REMINDER_SETTINGS)
+        self.stats = {"wakeups": 0, "fired": 0, "last_latency_ms": 0.0, "max_latency_ms": 0.0,
+                      "total_latency_ms": 0.0}
+
+    def __len__(self) -> int:
+        return len(self._armed)
+
+    def rebuild(self, db: dict, now: datetime | None = None) -> None:
+        """Re-arm every task from *db* (startup, or after a reload of the store)."""
+        now = now or datetime.now()
+        self._settings = db.get("settings") or dict(DEFAULT_REMINDER_SETTINGS)
+        self._heap = []
+        self._armed = {}
+        self._tasks = {}
+        for t in db.get("tasks", []):
+            self._tasks[t["id"]] = t
+            nxt = next_checkpoint(t, self._settings, now)
+            if nxt:
+                self._armed[t["id"]] = nxt
+                self._heap.append((nxt[0], t["id"], nxt[1]))
+        heapq.heapify(self._heap)
+
+    def update_task(self, t: dict, now: datetime | None = None) -> None:
+        """Re-arm a single task after it was added or edited."""
+        self._tasks[t["id"]] = t
+        nxt = next_checkpoint(t, self._settings, now)
+        if nxt:
+            self._armed[t["id"]] = nxt
+            heapq.heappush(self._heap, (nxt[0], t["id"], nxt[1]))
+        else:
+            self._armed.pop(t["id"], None)
+
+    def remove_task(self, tid: int) -> None:
+        self._armed.pop(tid, None)
+        self._tasks.pop(tid, None)
+
+    def _drop_stale(self) -> None:
+        while self._heap:
+            when, tid, key = self._heap[0]
+            if self._armed.get(tid) == (when, key):
+                return
+            heapq.heappop(self._heap)
+
+    def next_instant(self) -> Optional[datetime]:
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime | None = None) -> list[dict]:
+        """Pop every checkpoint at or before *now* and re-arm those tasks.
+
+        Returns one event dict per firing. Counts as one wakeup for ``stats``.
+        """
+        now = now or datetime.now()
+        self.stats["wakeups"] += 1
+        fired = []
+        while True:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            when, tid, key = heapq.heappop(self._heap)
+            self._armed.pop(tid, None)
+            t = self._tasks.get(tid)
+            if t is None:
+                continue
+            latency_ms = max(0.0, (now - when).total_seconds() * 1000)
+            self.stats["fired"] += 1
+            self.stats["last_latency_ms"] = latency_ms
+            self.stats["max_latency_ms"] = max(self.stats["max_latency_ms"], latency_ms)
+            self.stats["total_latency_ms"] += latency_ms
+            fired.append({
+                "id": tid,
+                "title": t.get("title", ""),
+                "priority": (t.get("priority", "M") or "M").upper(),
+                "due": t.get("due", ""),
+                "checkpoint": key,
+                "fired_at": now.isoformat(timespec="seconds"),
+                "latency_ms": round(latency_ms, 1),
+            })
+            # Arm the task's following checkpoint (strictly after this one).
+            nxt = next_checkpoint(t, self._settings, max(now, when))
+            if nxt:
+                self._armed[tid] = nxt
+                heapq.heappush(self._heap, (nxt[0], tid, nxt[1]))
+        return fired
+
+
+class ReminderDispatcher:
+    """Background thread that sleeps until the next checkpoint and fires *on_fire*.
+
+    Used by the web server; the desktop drives a ``ReminderSchedule`` from Tk's
+    ``after()`` instead so callbacks land on the UI thread. ``rearm(db)`` wakes
+    the thread to recompute its sleep after the store changed.
+    """
+
+    def __init__(self, on_fire: Callable[[dict], None], clock: Callable[[], datetime] = datetime.now):
+        self.on_fire = on_fire
+        self.clock = clock
+        self.schedule = ReminderSchedule()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: threading.Thread | None = None
+
+    @property
+    def stats(self) -> dict:
+        return self.schedule.stats
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="reminder-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def rearm(self, db: dict) -> None:
+        with self._cond:
+            self.schedule.rebuild(db, self.clock())
+            self._cond.notify_all()
+
+    def update_task(self, t: dict) -> None:
+        with self._cond:
+            self.schedule.update_task(t, self.clock())
+            self._cond.notify_all()
+
+    def wake(self) -> None:
+        """Recompute the sleep without re-arming (e.g. after resume from suspend)."""
+        with self._cond:
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                nxt = self.schedule.next_instant()
+                timeout = None if nxt is None else (nxt - self.clock()).total_seconds()
+                if timeout is None or timeout > 0:
+                    # Sleep until the earliest checkpoint (or a rearm/stop notify).
+                    self._cond.wait(timeout)
+                    if self._stopped:
+                        return
+                    nxt = self.schedule.next_instant()
+                    if nxt is None or nxt > self.clock():
+                        continue  # woken early by a rearm; recompute the sleep
+                events = self.schedule.pop_due(self.clock())
+            for ev in events:
+                try:
+                    self.on_fire(ev)
+                except Exception:
+                    pass  # a broken hook must not kill the dispatcher
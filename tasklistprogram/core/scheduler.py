@@ -1,12 +1,16 @@
 """Recurrence advancement for repeating tasks (the 'midnight reset' logic).
 
 Pure functions with no Tkinter dependency. `app.py` keeps the Tk timer
-(`self.after`) and calls `advance_repeating_tasks` at startup and each midnight.
+(`self.after`) and calls `run_maintenance` at startup and each midnight; the web
+server runs the same job from its maintenance thread.
 """
+import json
 from datetime import datetime, date
 from typing import Optional
 
 from .dates import parse_stored_due, next_due
+from .model import persistable_task
+from .reminders import reachable_checkpoint_keys
 
 
 def apply_skip_escalation(task: dict) -> None:
@@ -67,3 +71,46 @@ def advance_repeating_tasks(db: dict, today: Optional[date] = None, hazard_enabl
         t["due"] = due_dt.strftime("%Y-%m-%d %H:%M") if had_time else due_dt.strftime("%Y-%m-%d")
 
     return changed
+
+
+def compact_task_data(db: dict, now: Optional[datetime] = None) -> int:
+    """Prune ``acknowledged_checkpoints`` the current due can no longer produce.
+
+    Recurring tasks roll over daily and would otherwise collect keys forever.
+    Returns the bytes reclaimed, measured on the persisted JSON form of each task
+    (transient keys such as ``_display_title`` are stripped at write time by
+    ``model.persistable_task``).
+    """
+    now = now or datetime.now()
+    settings = db.get("settings") or {}
+    reclaimed = 0
+    for t in db.get("tasks", []):
+        acks = t.get("acknowledged_checkpoints")
+        if not acks:
+            if "acknowledged_checkpoints" in t:
+                reclaimed += len(json.dumps(persistable_task(t)))
+                t.pop("acknowledged_checkpoints")
+                reclaimed -= len(json.dumps(persistable_task(t)))
+            continue
+        keep = reachable_checkpoint_keys(t, settings, now)
+        pruned = sorted(k for k in acks if k in keep)
+        if len(pruned) == len(acks):
+            continue
+        before = len(json.dumps(persistable_task(t)))
+        if pruned:
+            t["acknowledged_checkpoints"] = pruned
+        else:
+            t.pop("acknowledged_checkpoints", None)
+        reclaimed += before - len(json.dumps(persistable_task(t)))
+    return reclaimed
+
+
+def run_maintenance(db: dict, today: Optional[date] = None, hazard_enabled: bool = False) -> dict:
+    """The rollover job: advance repeating tasks, then compact stale per-task data.
+
+    Returns ``{"advanced": bool, "bytes_reclaimed": int, "changed": bool}``;
+    callers save when ``changed`` is true.
+    """
+    advanced = advance_repeating_tasks(db, today=today, hazard_enabled=hazard_enabled)
+    reclaimed = compact_task_data(db)
+    return {"advanced": advanced, "bytes_reclaimed": reclaimed, "changed": advanced or reclaimed > 0}
@@ -0,0 +1,339 @@
+# search.py
+"""Full-text search over tasks, task documents and journals (SQLite FTS5).
+
+The index lives in the task store (``tasks.db``) beside the data it covers:
+
+* ``search_fts``  — FTS5 table of (title, body), ranked with bm25, title weighted.
+* ``search_docs`` — one row per indexed source: key, kind, ref, the FTS rowid and
+  a stamp telling whether the source changed since it was indexed.
+
+Nothing is scanned per keystroke. Before a query the index is brought up to date
+incrementally:
+
+* tasks (title, displayed notes, group) only when the store's rev moved, and then
+  only the tasks the change feed (``task_changes``) lists since the last indexed
+  rev, re-indexed if their content stamp differs (a full diff when the feed
+  doesn't reach back that far);
+* files this process wrote (``documents.DOCUMENT_WRITE_HOOKS`` marks them dirty:
+  ``sync_task_notes``, journal appends, document moves);
+* at most every RESCAN_SECONDS, an mtime/size walk of ``task_documents/`` and
+  ``journals/`` picks up edits made in an editor or by another process.
+
+For task documents only the private section (below the divider) is indexed; the
+displayed notes above it are already indexed with the task.
+
+With the SQLite document backend the documents are rows, not files: they are
+indexed from ``doc_task_notes`` / ``doc_journals`` by their version counter and
+no folder is walked (exported copies are not indexed twice).
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from . import documents, model
+
+KINDS = ("task", "doc", "journal")
+RESCAN_SECONDS = 30           # minimum gap between full mtime walks of the document folders
+SNIPPET_TOKENS = 12
+TITLE_WEIGHT = 10.0           # bm25 weight of the title column relative to the body
+_TASK_DOC_RE = re.compile(r"^(?P<title>.*)-(?P<id>\d+)\.md$")
+
+_dirty: set = set()
+_dirty_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+_last_rescan: Optional[float] = None  # time.monotonic() of the last walk; None = never
+
+
+def note_file_written(path) -> None:
+    """Mark a document as changed; it is re-indexed before the next query."""
+    with _dirty_lock:
+        _dirty.add(Path(path))
+
+
+documents.DOCUMENT_WRITE_HOOKS.append(note_file_written)
+
+
+def _init_schema(conn: sqlite3.Connection) -> None:
+    conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+                 "title, body, tokenize='unicode61 remove_diacritics 2')")
+    conn.execute("CREATE TABLE IF NOT EXISTS search_docs (key TEXT PRIMARY KEY, kind TEXT NOT NULL, "
+                 "ref TEXT NOT NULL, stamp TEXT NOT NULL, fts_rowid INTEGER NOT NULL)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_search_docs_rowid ON search_docs(fts_rowid)")
+    conn.execute("CREATE TABLE IF NOT EXISTS search_meta (key TEXT PRIMARY KEY, value TEXT)")
+    conn.commit()
+
+
+def fts_query(text: str) -> str:
+    """Turn what a user typed into a safe FTS5 MATCH expression.
+
+    Every word must match (as a prefix, so results appear while typing);
+    ``"double quoted"`` text must match as a phrase. FTS syntax characters in
+    the input are never interpreted. Returns "" when nothing is searchable.
+    """
+    parts = []
+    for phrase, word in re.findall(r'"([^"]*)"?|(\S+)', text or ""):
+        tokens = re.findall(r"\w+", phrase or word)
+        if not tokens:
+            continue
+        if phrase:
+            parts.append('"' + " ".join(tokens) + '"')
+        else:
+            parts.extend(f'"{t}"*' for t in tokens)
+    return " ".join(parts)
+
+
+# ---------- index maintenance ----------
+def _put(conn, key: str, kind: str, ref, stamp: str, title: str, body: str) -> None:
+    _drop(conn, key)
+    cur = conn.execute("INSERT INTO search_fts(title, body) VALUES(?, ?)", (title, body))
+    conn.execute("INSERT INTO search_docs(key, kind, ref, stamp, fts_rowid) VALUES(?, ?, ?, ?, ?)",
+                 (key, kind, str(ref), stamp, cur.lastrowid))
+
+
+def _drop(conn, key: str) -> None:
+    row = conn.execute("SELECT fts_rowid FROM search_docs WHERE key=?", (key,)).fetchone()
+    if row:
+        conn.execute("DELETE FROM search_fts WHERE rowid=?", row)
+        conn.execute("DELETE FROM search_docs WHERE key=?", (key,))
+
+
+def _task_stamp(t: dict) -> str:
+    key = "\x1f".join(str(t.get(k) or "") for k in ("title", "notes", "group"))
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _index_task(conn, tid, data, old_stamp) -> int:
+    key = f"task:{tid}"
+    t = json.loads(data) if data is not None else None
+    if t is None or t.get("is_deleted"):
+        if old_stamp is None:
+            return 0
+        _drop(conn, key)
+        return 1
+    stamp = _task_stamp(t)
+    if old_stamp == stamp:
+        return 0
+    body = "\n".join(s for s in (t.get("notes"), t.get("group")) if s)
+    _put(conn, key, "task", tid, stamp, t.get("title") or "", body)
+    return 1
+
+
+def _sync_tasks(conn) -> int:
+    rev = model._meta_get(conn, "rev", 0)
+    row = conn.execute("SELECT value FROM search_meta WHERE key='tasks_rev'").fetchone()
+    if row and row[0] == str(rev):
+        return 0
+    since = int(row[0]) if row else None
+    floor = model._meta_get(conn, "changes_floor")
+    changed = 0
+    if since is not None and floor is not None and floor <= since <= rev:
+        # The change feed names every task written after ``since``: only those
+        # are decoded and compared.
+        for tid, gone, data, old in conn.execute(
+                "SELECT c.id, c.deleted, t.data, d.stamp FROM task_changes c"
+                " LEFT JOIN tasks t ON t.id = c.id"
+                " LEFT JOIN search_docs d ON d.key = 'task:' || c.id"
+                " WHERE c.rev > ?", (since,)).fetchall():
+            changed += _index_task(conn, tid, None if gone else data, old)
+    else:
+        # First run, or the feed no longer reaches back far enough: full diff.
+        known = dict(conn.execute("SELECT key, stamp FROM search_docs WHERE kind='task'"))
+        for tid, data in conn.execute("SELECT id, data FROM tasks").fetchall():
+            changed += _index_task(conn, tid, data, known.pop(f"task:{tid}", None))
+        for key in known:
+            _drop(conn, key)
+        changed += len(known)
+    conn.execute("INSERT OR REPLACE INTO search_meta(key, value) VALUES('tasks_rev', ?)", (str(rev),))
+    return changed
+
+
+def _classify(path: Path):
+    """``(kind, ref, title)`` for an indexable document, else None."""
+    if path.suffix != ".md":
+        return None
+    if path.is_relative_to(documents.TASKS_DIR):
+        m = _TASK_DOC_RE.match(path.name)
+        return ("doc", int(m["id"]), m["title"]) if m else None
+    if path.is_relative_to(documents.JOURNALS_DIR):
+        return ("journal", path.stem, f"Journal {path.stem}")
+    return None
+
+
+def _file_stamp(st: os.stat_result) -> str:
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def _index_file(conn, path: Path, stamp: str, known_stamp: Optional[str]) -> bool:
+    kind_ref_title = _classify(path)
+    if kind_ref_title is None or stamp == known_stamp:
+        return False
+    kind, ref, title = kind_ref_title
+    try:
+        text = path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return False
+    body = documents._split_sections(text, documents.TASK_DIVIDER)[1] if kind == "doc" else text
+    _put(conn, f"file:{path}", kind, ref, stamp, title, body)
+    return True
+
+
+def _walk(root: Path):
+    """Yield ``(path, stat)`` for every ``*.md`` under ``root``."""
+    stack = [root]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for e in entries:
+            if e.is_dir(follow_symlinks=False):
+                stack.append(e.path)
+            elif e.name.endswith(".md"):
+                yield Path(e.path), e.stat()
+
+
+def _sync_dirty(conn) -> int:
+    with _dirty_lock:
+        paths = list(_dirty)
+        _dirty.clear()
+    changed = 0
+    for path in paths:
+        key = f"file:{path}"
+        row = conn.execute("SELECT stamp FROM search_docs WHERE key=?", (key,)).fetchone()
+        try:
+            st = path.stat()
+        except OSError:
+            if row:
+                _drop(conn, key)  # moved away or deleted
+                changed += 1
+            continue
+        changed += _index_file(conn, path, _file_stamp(st), row[0] if row else None)
+    return changed
+
+
+def _rescan(conn) -> int:
+    known = dict(conn.execute("SELECT key, stamp FROM search_docs WHERE kind != 'task'"))
+    changed = 0
+    for root in (documents.TASKS_DIR, documents.JOURNALS_DIR):
+        for path, st in _walk(root):
+            key = f"file:{path}"
+            changed += _index_file(conn, path, _file_stamp(st), known.pop(key, None))
+    for key in known:
+        _drop(conn, key)
+    return changed + len(known)
+
+
+def _sync_stored_docs(conn) -> int:
+    known = dict(conn.execute("SELECT key, stamp FROM search_docs WHERE kind != 'task'"))
+    rows = [(f"sqldoc:{tid}", "doc", tid, str(version), data, private) for tid, private, version, data in
+            conn.execute("SELECT d.id, d.private, d.version, t.data FROM doc_task_notes d"
+                         " LEFT JOIN tasks t ON t.id = d.id")]
+    rows += [(f"sqljournal:{day}", "journal", day, str(version), None, f"{top}\n{bottom}".strip())
+             for day, top, bottom, version in conn.execute("SELECT day, top, bottom, version FROM doc_journals")]
+    changed = 0
+    for key, kind, ref, stamp, data, body in rows:
+        old = known.pop(key, None)
+        if old == stamp or (old is None and not body):
+            continue
+        if not body:
+            _drop(conn, key)
+        elif kind == "doc":
+            _put(conn, key, kind, ref, stamp, (json.loads(data).get("title") or "") if data else "", body)
+        else:
+            _put(conn, key, kind, ref, stamp, f"Journal {ref}", body)
+        changed += 1
+    for key in known:
+        _drop(conn, key)  # file entries from the files backend, vanished rows
+    return changed + len(known)
+
+
+def refresh(conn: Optional[sqlite3.Connection] = None, rescan: Optional[bool] = None) -> int:
+    """Bring the index up to date; returns how many sources were (re)indexed.
+
+    ``rescan`` forces (True) or skips (False) the folder walk; None walks only
+    if RESCAN_SECONDS have passed since the last one.
+    """
+    global _last_rescan
+    own = conn is None
+    if own:
+        conn = model._open_store()
+    try:
+        _init_schema(conn)
+        with _refresh_lock:
+            now = time.monotonic()
+            if rescan is None:
+                rescan = _last_rescan is None or now - _last_rescan >= RESCAN_SECONDS
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if documents.document_backend() == "sqlite":
+                    with _dirty_lock:
+                        _dirty.clear()
+                    changed = _sync_tasks(conn) + _sync_stored_docs(conn)
+                else:
+                    changed = _sync_tasks(conn) + _sync_dirty(conn)
+                    if rescan:
+                        changed += _rescan(conn)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            if rescan:
+                _last_rescan = now
+            return changed
+    finally:
+        if own:
+            conn.close()
+
+
+# ---------- queries ----------
+def search(
+    query: str,
+    limit: int = 20,
+    kinds=None,
+    highlight: tuple = ("[", "]"),
+    conn: Optional[sqlite3.Connection] = None,
+    rescan: Optional[bool] = None,
+) -> list:
+    """Ranked hits for ``query`` across KINDS (or the ``kinds`` given).
+
+    Each hit is ``{"kind", "ref", "title", "snippet", "score", "path"}``: ``ref``
+    is the task id for "task"/"doc" hits and the ISO date for "journal";
+    ``path`` is the file for doc/journal hits. Matched terms in ``snippet``
+    are wrapped in ``highlight``. Lower ``score`` ranks higher (bm25).
+    """
+    match = fts_query(query)
+    if not match or limit <= 0:
+        return []
+    kinds = [k for k in (kinds or KINDS) if k in KINDS]
+    if not kinds:
+        return []
+    own = conn is None
+    if own:
+        conn = model._open_store()
+    try:
+        refresh(conn, rescan)
+        marks = ",".join("?" * len(kinds))
+        rows = conn.execute(
+            "SELECT d.kind, d.ref, d.key, search_fts.title,"
+            " snippet(search_fts, -1, ?, ?, '…', ?), bm25(search_fts, ?, 1.0) AS score"
+            " FROM search_fts JOIN search_docs d ON d.fts_rowid = search_fts.rowid"
+            f" WHERE search_fts MATCH ? AND d.kind IN ({marks}) ORDER BY score LIMIT ?",
+            (highlight[0], highlight[1], SNIPPET_TOKENS, TITLE_WEIGHT, match, *kinds, int(limit)),
+        ).fetchall()
+    finally:
+        if own:
+            conn.close()
+    return [{
+        "kind": kind,
+        "ref": ref if kind == "journal" else int(ref),
+        "title": title,
+        "snippet": snippet,
+        "score": round(score, 4),
+        "path": key[len("file:"):] if key.startswith("file:") else None,
+    } for kind, ref, key, title, snippet, score in rows]
@@ -0,0 +1,112 @@
+# textindex.py
+"""In-memory n-gram index over task titles and notes for as-you-type search.
+
+``NgramIndex`` maps every 1-, 2- and 3-character substring of a task's
+lowercased title/notes (padded with a space at each end) to the set of task ids
+containing it. A query intersects the posting sets of its own n-grams, smallest
+first, and checks only those candidates with the same substring test as
+``filters.search_match`` — so results are identical, but a keystroke costs in
+proportion to the candidates, not to the number of tasks.
+
+When nothing contains the query, ``fuzzy()`` ranks tasks by how many of the
+query's (padded) bigrams they share, which tolerates typos and transpositions
+("dentsit" still finds "Dentist").
+
+The index is kept current with ``sync(tasks)`` after each mutation (one cheap
+comparison per task; only changed titles/notes are re-indexed) or with
+``add``/``remove`` for single tasks.
+"""
+from collections import Counter, defaultdict
+
+NGRAM_MAX = 3
+FUZZY_MIN_SCORE = 0.5     # share of the query's bigrams a near match must contain
+FUZZY_MIN_GRAMS = 4       # shorter queries are too ambiguous to fuzz
+
+
+def _grams(text: str, sizes) -> set:
+    padded = f" {text} "
+    out = set()
+    for n in sizes:
+        out.update(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return out
+
+
+class NgramIndex:
+    def __init__(self):
+        self._postings = defaultdict(set)   # gram -> {task id}
+        self._docs = {}                     # id -> (title_l, notes_l, title, notes, grams)
+        self.stats = {"queries": 0, "candidates": 0}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, task: dict) -> None:
+        """Index (or re-index) one task's title and notes."""
+        tid = task["id"]
+        title, notes = task.get("title") or "", task.get("notes") or ""
+        if tid in self._docs:
+            self.remove(tid)
+        title_l, notes_l = title.lower(), notes.lower()
+        grams = _grams(title_l, range(1, NGRAM_MAX + 1)) | _grams(notes_l, range(1, NGRAM_MAX + 1))
+        for g in grams:
+            self._postings[g].add(tid)
+        self._docs[tid] = (title_l, notes_l, title, notes, grams)
+
+    def remove(self, tid: int) -> None:
+        doc = self._docs.pop(tid, None)
+        if doc is None:
+            return
+        for g in doc[4]:
+            ids = self._postings[g]
+            ids.discard(tid)
+            if not ids:
+                del self._postings[g]
+
+    def sync(self, tasks) -> int:
+        """Make the index match ``tasks``; returns how many entries changed."""
+        seen = set()
+        changed = 0
+        for t in tasks:
+            tid = t["id"]
+            seen.add(tid)
+            doc = self._docs.get(tid)
+            if doc is None or doc[2] != (t.get("title") or "") or doc[3] != (t.get("notes") or ""):
+                self.add(t)
+                changed += 1
+        for tid in set(self._docs) - seen:
+            self.remove(tid)
+            changed += 1
+        return changed
+
+    def search(self, query: str) -> set:
+        """Ids of tasks whose title or notes contain ``query`` (case-insensitive)."""
+        q = query.lower()
+        if not q:
+            return set(self._docs)
+        self.stats["queries"] += 1
+        n = min(len(q), NGRAM_MAX)
+        postings = sorted((self._postings.get(q[i:i + n], ()) for i in range(len(q) - n + 1)), key=len)
+        if not postings[0]:
+            return set()
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            candidates &= ids
+            if not candidates:
+                return candidates
+        self.stats["candidates"] += len(candidates)
+        docs = self._docs
+        return {tid for tid in candidates if q in docs[tid][0] or q in docs[tid][1]}
+
+    def fuzzy(self, query: str, limit: int = 50, min_score: float = FUZZY_MIN_SCORE) -> list:
+        """``[(id, score)]`` of near matches, best first; score is the share of the
+        query's bigrams (0..1] found in the task. Empty for very short queries."""
+        grams = _grams(" ".join(query.lower().split()), (2,))
+        if len(grams) < FUZZY_MIN_GRAMS:
+            return []
+        counts = Counter()
+        for g in grams:
+            counts.update(self._postings.get(g, ()))
+        need = min_score * len(grams)
+        scored = [(tid, c / len(grams)) for tid, c in counts.items() if c >= need]
+        scored.sort(key=lambda x: (-x[1], x[0]))
+        return scored[:limit]
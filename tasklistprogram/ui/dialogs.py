@@ -182,8 +182,13 @@ class SettingsDialog(tk.Toplevel):
         ttk.Checkbutton(frm, text="Reset all hazard escalation to baseline on Save", variable=self.reset_hazard_var)\
             .grid(row=6, column=0, columnspan=2, sticky="w", pady=(4, 0))
 
+        ttk.Label(frm, text="Store documents & journals:").grid(row=7, column=0, sticky="w", pady=(8, 0))
+        self.doc_backend_var = tk.StringVar(value=s.get("document_backend", "files"))
+        ttk.Combobox(frm, textvariable=self.doc_backend_var, values=["files", "sqlite"], state="readonly", width=8)\
+            .grid(row=7, column=1, sticky="w", padx=6, pady=(8, 4))
+
         btns = ttk.Frame(frm)
-        btns.grid(row=7, column=0, columnspan=2, sticky="e", pady=(12,0))
+        btns.grid(row=8, column=0, columnspan=2, sticky="e", pady=(12,0))
         ttk.Button(btns, text="Save", command=self.save).pack(side=tk.LEFT, padx=6)
         ttk.Button(btns, text="Cancel", command=self.destroy).pack(side=tk.LEFT, padx=6)
         _place_window(self, master)
@@ -198,6 +203,7 @@ class SettingsDialog(tk.Toplevel):
             "hazard_escalation_enabled": self.hazard_var.get(),
             "mantras_autoshow": self.mantra_autoshow_var.get(),
             "reset_hazard_escalation": self.reset_hazard_var.get(),
+            "document_backend": self.doc_backend_var.get(),
         }
         self.on_save(data)
         self.destroy()
@@ -350,6 +356,80 @@ class JournalDialog(tk.Toplevel):
         self.txt.delete("1.0", "end")
 
 
+class SearchDialog(tk.Toplevel):
+    """Search-everything box: tasks, private task notes and journals.
+
+    ``on_search(query)`` returns hits as produced by ``core.search.search``;
+    ``on_open(hit)`` is called when a result is double-clicked or Enter is pressed.
+    Searching runs as you type, debounced.
+    """
+    KIND_LABELS = {"task": "Task", "doc": "Notes", "journal": "Journal"}
+
+    def __init__(self, master, on_search, on_open):
+        super().__init__(master)
+        self.title("Search Everything")
+        self.resizable(True, True)
+        self.on_search = on_search
+        self.on_open = on_open
+        self._hits = []
+        self._after = None
+
+        frm = ttk.Frame(self, padding=10)
+        frm.pack(fill=tk.BOTH, expand=True)
+
+        self.query_var = tk.StringVar()
+        entry = ttk.Entry(frm, textvariable=self.query_var, width=60)
+        entry.pack(fill=tk.X)
+        entry.focus_set()
+        self.query_var.trace_add("write", lambda *a: self._schedule())
+
+        self.tree = ttk.Treeview(frm, columns=("kind", "title", "snippet"), show="headings", height=14)
+        for col, text, width in (("kind", "Where", 70), ("title", "Title", 200), ("snippet", "Match", 420)):
+            self.tree.heading(col, text=text)
+            self.tree.column(col, width=width, stretch=(col == "snippet"))
+        self.tree.pack(fill=tk.BOTH, expand=True, pady=6)
+        self.tree.bind("<Double-1>", lambda e: self._open())
+        self.tree.bind("<Return>", lambda e: self._open())
+        entry.bind("<Return>", lambda e: self._open(first=True))
+        entry.bind("<Down>", lambda e: self._focus_results())
+
+        self.status_var = tk.StringVar(value="Type to search titles, notes, task documents and journals.")
+        ttk.Label(frm, textvariable=self.status_var).pack(anchor="w")
+        self.bind("<Escape>", lambda e: self.destroy())
+        _place_window(self, master)
+
+    def _schedule(self):
+        if self._after:
+            self.after_cancel(self._after)
+        self._after = self.after(150, self._run)
+
+    def _run(self):
+        self._after = None
+        query = self.query_var.get().strip()
+        self._hits = self.on_search(query) if query else []
+        self.tree.delete(*self.tree.get_children())
+        for i, h in enumerate(self._hits):
+            snippet = " ".join(h["snippet"].split())
+            self.tree.insert("", "end", iid=str(i),
+                             values=(self.KIND_LABELS.get(h["kind"], h["kind"]), h["title"], snippet))
+        if query:
+            self.status_var.set(f"{len(self._hits)} result(s)" if self._hits else "No matches.")
+
+    def _focus_results(self):
+        children = self.tree.get_children()
+        if children:
+            self.tree.focus_set()
+            self.tree.selection_set(children[0])
+            self.tree.focus(children[0])
+
+    def _open(self, first: bool = False):
+        sel = self.tree.selection()
+        if not sel and first and self._hits:
+            sel = ("0",)
+        if sel:
+            self.on_open(self._hits[int(sel[0])])
+
+
 class PasteImportDialog(tk.Toplevel):
     def __init__(self, master, on_import_text):
         super().__init__(master)
@@ -364,6 +444,13 @@ class PasteImportDialog(tk.Toplevel):
         self.txt = tk.Text(frm, width=84, height=16, wrap="word")
         self.txt.pack(fill=tk.BOTH, expand=True, pady=6)
 
+        dup_row = ttk.Frame(frm)
+        dup_row.pack(fill=tk.X, pady=(0, 6))
+        ttk.Label(dup_row, text="Tasks that already exist:").pack(side=tk.LEFT)
+        self.dup_var = tk.StringVar(value="skip")
+        ttk.Combobox(dup_row, textvariable=self.dup_var, state="readonly", width=8,
+                     values=["skip", "merge", "flag", "allow"]).pack(side=tk.LEFT, padx=6)
+
         btns = ttk.Frame(frm)
         btns.pack(fill=tk.X)
         ttk.Button(btns, text="Import", command=self._do_import).pack(side=tk.LEFT)
@@ -376,16 +463,21 @@ class PasteImportDialog(tk.Toplevel):
             messagebox.showinfo("Import", "Nothing to import.")
             return
         try:
-            added, failed, details = self.on_import_text(text)
+            mode = self.dup_var.get()
+            added, failed, details, dupes = self.on_import_text(text, mode)
+            summary = f"Imported {added} task(s). Failed: {failed}."
+            if dupes:
+                verb = {"skip": "skipped", "merge": "merged", "flag": "flagged", "allow": "imported"}[mode]
+                summary += f" Duplicates {verb}: {dupes}."
             if failed:
                 preview = "\n".join(f"- {d}" for d in details[:8])
                 extra = "" if len(details) <= 8 else f"\n...and {len(details)-8} more."
                 messagebox.showwarning(
                     "Import",
-                    f"Imported {added} task(s). Failed: {failed}.\n\nReasons:\n{preview}{extra}"
+                    f"{summary}\n\nReasons:\n{preview}{extra}"
                 )
             else:
-                messagebox.showinfo("Import", f"Imported {added} task(s). Failed: {failed}.")
+                messagebox.showinfo("Import", summary)
             self.destroy()
         except Exception as e:
             messagebox.showerror("Import failed", str(e))
@@ -433,3 +525,44 @@ class RemindersDialog(tk.Toplevel):
             self.on_ack(pairs)
             for iid in list(sels):
                 self.tree.delete(iid)
+
+
+class ReminderToast(tk.Toplevel):
+    """Small borderless popup in the bottom-right corner for a fired reminder.
+
+    Closes itself after ``timeout_ms``; "Open" jumps to the Reminders dialog so
+    the checkpoint can be acknowledged.
+    """
+    def __init__(self, master, event: dict, on_open=None, timeout_ms: int = 8000):
+        super().__init__(master)
+        self.overrideredirect(True)
+        self.attributes("-topmost", True)
+        self.on_open = on_open
+
+        frm = ttk.Frame(self, padding=10, relief="solid", borderwidth=1)
+        frm.pack(fill=tk.BOTH, expand=True)
+        ttk.Label(frm, text=f"⏰ {event.get('title', '')}", font=("TkDefaultFont", 10, "bold"),
+                  wraplength=300).pack(anchor="w")
+        due = event.get("due", "")
+        ttk.Label(frm, text=f"Due {due}" if due else "Reminder checkpoint reached").pack(anchor="w", pady=(2, 8))
+
+        btns = ttk.Frame(frm)
+        btns.pack(fill=tk.X)
+        if on_open is not None:
+            ttk.Button(btns, text="Open", command=self._open).pack(side=tk.LEFT)
+        ttk.Button(btns, text="Dismiss", command=self.destroy).pack(side=tk.RIGHT)
+
+        self.update_idletasks()
+        w, h = self.winfo_width(), self.winfo_height()
+        x = self.winfo_screenwidth() - w - 24
+        y = self.winfo_screenheight() - h - 64
+        self.geometry(f"+{max(0, x)}+{max(0, y)}")
+        self.after(timeout_ms, self._expire)
+
+    def _open(self):
+        self.destroy()
+        self.on_open()
+
+    def _expire(self):
+        if self.winfo_exists():
+            self.destroy()
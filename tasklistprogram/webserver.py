@@ -9,18 +9,38 @@ This is local-first: it binds to 127.0.0.1 by default and reads/writes the same
 `data/tasks_gui.json` the desktop app uses. It is NOT hardened for public exposure
 (no auth yet) — see docs/DESIGN.md for the planned auth/hosting phase.
 """
+import base64
+import copy
+import gzip
+import hashlib
+import html
+import io
 import json
+import logging
 import sys
 import threading
+import time
 import mimetypes
-from datetime import datetime, date
+import queue
+import re
+import sqlite3
+import zlib
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from datetime import datetime, date, timedelta
+from email.utils import formatdate, parsedate_to_datetime
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from urllib.parse import urlparse
+from urllib.parse import urlparse, parse_qs, parse_qsl, urlencode
 
-from .core import model
+from .core import model, scheduler
 from .core.dates import parse_due_entry, fmt_due_for_store, parse_stored_due, next_due
-from .core.io_import import import_from_string
+from .core import documents, filters, io_export, search
+from .core.io_import import import_stream, DEFAULT_DUPLICATE_MODE, DUPLICATE_MODES
+from .core.inbox import InboxWatcher, INBOX_POLL_SECONDS
+from .core.constants import PRIORITY_ORDER, normalize_priority
+from .core.reminders import ReminderDispatcher
+from .core.events import EventHub, format_event
+from .core.textindex import NgramIndex
 
 ROOT = Path(__file__).resolve().parent.parent
 WEB_DIR = ROOT / "web"
@@ -29,6 +49,270 @@ WEB_DIR = ROOT / "web"
 # threaded) can't clobber each other's changes.
 _DB_LOCK = threading.Lock()
 
+SEARCH_MAX_RESULTS = 100
+QUERY_PAGE_SIZE = 100          # /api/tasks query mode: default and maximum page
+QUERY_MAX_LIMIT = 1000
+BATCH_MAX_OPS = 1000
+GROUP_COMMIT_MAX = 256         # writes applied and committed together, at most
+WRITE_TIMEOUT_SECONDS = 30     # a handler waiting longer for its commit gives up
+QUERY_PARAMS = ("category", "time", "date", "min_prio", "q", "group", "sort", "order", "limit", "cursor")
+EVENT_HEARTBEAT_SECONDS = 15   # idle SSE streams get a comment line this often
+EVENT_RETRY_MS = 3000          # client reconnect delay announced to EventSource
+STORE_WATCH_SECONDS = 1.0      # rev poll for writes made outside this server (desktop app)
+COMPRESS_MIN_BYTES = 1024      # smaller bodies are sent as-is (headers + CPU outweigh the saving)
+COMPRESS_LEVEL = 6             # per-response JSON; static assets use 9 (compressed once)
+ENCODINGS = ("gzip", "deflate")  # server preference order
+STATIC_IMMUTABLE_SECONDS = 31536000  # max-age for fingerprinted (?v=hash) asset URLs
+
+logger = logging.getLogger(__name__)
+
+# Reminder firings are pushed to every callable here (SSE, logging, tests...).
+REMINDER_HOOKS: list = []
+_DISPATCHER = None  # ReminderDispatcher, started by main()
+# Live updates for GET /api/events (tasks changed, reminders, rollovers).
+_EVENTS = EventHub()
+
+
+def _on_reminder_fired(event: dict) -> None:
+    logger.info("reminder fired: %s", event)
+    _EVENTS.publish("reminder", event)
+    for hook in list(REMINDER_HOOKS):
+        try:
+            hook(event)
+        except Exception:
+            logger.exception("reminder hook failed")
+
+
+class StoreCache:
+    """The server's decoded copy of the store, revalidated by the store's rev.
+
+    ``get()`` costs one indexed read of ``meta.rev`` on a kept-open connection
+    when nothing changed (~5 µs); ``model.load_db()`` runs only when another
+    writer (the desktop app, the inbox importer) moved the rev. Our own saves
+    keep the copy current, since ``save_db`` stamps the new rev into the dict.
+    ``view(name, fn)`` memoizes a derived form (the client task list) per rev.
+
+    Callers hold ``_DB_LOCK`` while using or mutating the copy; a write that
+    fails after mutating it must ``invalidate()``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._db = None
+        self._conn = None
+        self._conn_file = None
+        self._views = {}
+        self.stats = {"hits": 0, "loads": 0}
+
+    def _store_rev(self) -> int:
+        if self._conn is None or self._conn_file != model.DB_FILE:  # a relocated store (tests) reconnects
+            self._close()
+            model.current_rev()  # creates the store/schema if needed
+            self._conn = sqlite3.connect(model.DB_FILE, timeout=15, check_same_thread=False)
+            self._conn_file = model.DB_FILE
+            self._db = None
+        row = self._conn.execute("SELECT value FROM meta WHERE key='rev'").fetchone()
+        return int(json.loads(row[0])) if row else 0
+
+    def rev(self) -> int:
+        """The store's current rev (one indexed read; the copy is not touched)."""
+        with self._lock:
+            return self._store_rev()
+
+    def get(self) -> dict:
+        with self._lock:
+            rev = self._store_rev()
+            if self._db is not None and self._db.get("_rev") == rev:
+                self.stats["hits"] += 1
+                return self._db
+            self._db = model.load_db()
+            self._views.clear()
+            self.stats["loads"] += 1
+            return self._db
+
+    def view(self, name: str, fn, db: dict | None = None):
+        """``fn(db)``, computed once per rev. ``db`` (default: ``get()``) is the
+        copy the caller already holds; the value is tagged with *its* rev, so a
+        view never pairs with a copy another writer has since replaced."""
+        if db is None:
+            db = self.get()
+        rev = db.get("_rev")
+        with self._lock:
+            hit = self._views.get(name)
+            if hit is not None and hit[0] == rev:
+                return hit[1]
+        value = fn(db)
+        with self._lock:
+            self._views[name] = (rev, value)
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._db = None
+            self._views.clear()
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+            self._db = None
+
+
+_STORE = StoreCache()
+
+
+def _save(db: dict, touched=None) -> None:
+    """``model.save_db`` for the cached copy; a failed save drops the copy (it
+    holds the unsaved mutation) so the next request reloads from the store."""
+    try:
+        model.save_db(db, touched=touched)
+    except Exception:
+        _STORE.invalidate()
+        raise
+
+
+def _after_write(db: dict) -> None:
+    """Post-commit bookkeeping for a write made by this server."""
+    if _DISPATCHER is not None:
+        _DISPATCHER.rearm(db)
+    _EVENTS.publish_rev(db["_rev"])
+
+
+class Rollback(Exception):
+    """Raised by a write job to discard its own changes; ``value`` goes back to
+    the submitter (via the exception) instead of a result."""
+
+    def __init__(self, value):
+        super().__init__("write rolled back")
+        self.value = value
+
+
+class GroupCommitWriter:
+    """The web server's single writer (group commit).
+
+    Handlers ``submit(fn)`` and wait on the returned future. ``fn(db)`` runs
+    on the writer thread against the cached store copy and returns
+    ``(changed, value)``; ``changed`` is False, the ids of the tasks the job
+    added/changed/removed (only those are diffed on save), or True when it
+    can't say. The writer takes every job queued at that moment (up
+    to ``max_group``), runs them in order under ``_DB_LOCK``, saves once if
+    any changed something — one transaction, one rev, one backup snapshot —
+    and then resolves each future with its value (``future.rev`` is the rev
+    the group left the store at). Under concurrency N writers
+    share one commit instead of queuing for N; alone, a write costs one thread
+    hand-off more than before.
+
+    A job must not change the copy when it raises. If one does raise (a bug,
+    or ``Rollback``), the copy is dropped, that job's future gets the
+    exception, and the rest of its group is re-run on a fresh copy.
+
+    A submitter that stops waiting should ``cancel()`` its future: a job still
+    queued is then skipped (nothing written), but one the writer has already
+    started runs to the end and may commit.
+    """
+
+    def __init__(self, max_group: int = GROUP_COMMIT_MAX):
+        self.max_group = max_group
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stats = {"commits": 0, "jobs": 0, "largest_group": 0}
+
+    def submit(self, fn) -> Future:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="group-commit", daemon=True)
+                self._thread.start()
+        fut = Future()
+        self._queue.put((fn, fut))
+        return fut
+
+    def run(self, fn, timeout: float = WRITE_TIMEOUT_SECONDS):
+        """``submit(fn)`` and wait for its value (re-raising its exception). On
+        timeout the job is cancelled if it hasn't started yet (see above)."""
+        fut = self.submit(fn)
+        try:
+            return fut.result(timeout)
+        except FutureTimeout:
+            fut.cancel()
+            raise
+
+    def stop(self) -> None:
+        """Finish what is queued, then end the thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            group = [item]
+            while len(group) < self.max_group:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._commit(group)
+                    return
+                group.append(item)
+            self._commit(group)
+
+    def _commit(self, group: list) -> None:
+        pending = [(fn, fut) for fn, fut in group if fut.set_running_or_notify_cancel()]
+        while pending:
+            values, changed, touched, failed = [], False, set(), None
+            with _DB_LOCK:
+                db = _STORE.get()
+                for i, (fn, _) in enumerate(pending):
+                    try:
+                        ch, value = fn(db)
+                    except Exception as e:
+                        failed = (i, e)
+                        # Before releasing the lock: the copy may hold the group's
+                        # (and a misbehaving job's) uncommitted changes.
+                        _STORE.invalidate()
+                        break
+                    changed = changed or bool(ch)
+                    if ch is True:
+                        touched = None
+                    elif ch and touched is not None:
+                        touched.update(ch)
+                    values.append(value)
+                if failed is None and changed:
+                    try:
+                        _save(db, touched)
+                    except Exception as e:
+                        for _, fut in pending:
+                            fut.set_exception(e)
+                        return
+                    try:
+                        _after_write(db)
+                    except Exception:  # committed: the waiters get their results regardless
+                        logger.exception("post-commit bookkeeping failed")
+            if failed is not None:
+                i, e = failed
+                pending.pop(i)[1].set_exception(e)
+                continue
+            self.stats["commits"] += int(changed)
+            self.stats["jobs"] += len(pending)
+            self.stats["largest_group"] = max(self.stats["largest_group"], len(pending))
+            for (_, fut), value in zip(pending, values):
+                fut.rev = db.get("_rev")
+                fut.set_result(value)
+            return
+
+
+_WRITER = GroupCommitWriter()
+
 
 # ---------- task <-> client adapters ----------
 def to_client(t: dict) -> dict:
@@ -47,6 +331,7 @@ def to_client(t: dict) -> dict:
         "skip_count": int(t.get("skip_count", 0) or 0),
         "is_deleted": bool(t.get("is_deleted")),
         "history": t.get("history", []),
+        "possible_duplicate": bool(t.get("possible_duplicate")),
     }
 
 
@@ -64,10 +349,325 @@ def op_reset_hazard(db: dict) -> int:
     return changed
 
 
+def client_task(t: dict) -> dict:
+    """``to_client`` plus the task's ETag, which the client echoes in If-Match."""
+    c = to_client(t)
+    c["etag"] = task_etag(t)
+    return c
+
+
 def client_tasks(db: dict) -> list:
     # Return ALL tasks (including deleted) so the client can filter by category
     # exactly like the desktop, including a Deleted view with restore.
-    return [to_client(t) for t in db["tasks"]]
+    return [client_task(t) for t in db["tasks"]]
+
+
+# ---------- payload shapes (?fields= / ?format=columns / ?history=) ----------
+CLIENT_FIELDS = tuple(to_client({"id": 0})) + ("etag",)
+DICT_FIELDS = ("group", "priority", "repeat")   # few distinct values: sent as indexes
+HISTORY_DAYS_MAX = 3660
+
+
+def parse_shape(qs) -> dict:
+    """``{"fields", "format", "history"}`` from a query; ValueError on bad input.
+    ``fields`` (None = all) always includes ``id``; ``history`` is a day window
+    (None = the full list)."""
+    arg = lambda k: (qs.get(k) or [""])[0].strip()
+    fields = None
+    if arg("fields"):
+        wanted = [f.strip() for f in arg("fields").split(",") if f.strip()]
+        unknown = sorted(set(wanted) - set(CLIENT_FIELDS))
+        if unknown:
+            raise ValueError(f"unknown field(s): {', '.join(unknown)}")
+        fields = tuple(f for f in CLIENT_FIELDS if f == "id" or f in wanted)
+    fmt = arg("format") or "objects"
+    if fmt not in ("objects", "columns"):
+        raise ValueError("format must be objects or columns")
+    history = None
+    if arg("history"):
+        if not arg("history").isdigit() or not 0 < int(arg("history")) <= HISTORY_DAYS_MAX:
+            raise ValueError(f"history must be a number of days (1-{HISTORY_DAYS_MAX})")
+        history = int(arg("history"))
+    return {"fields": fields, "format": fmt, "history": history}
+
+
+def project(rows: list, fields=None, history=None, today: date | None = None) -> list:
+    """Client tasks cut down to ``fields``, with ``history`` trimmed to the
+    completions of the last ``history`` days."""
+    if fields is None and history is None:
+        return rows
+    keep = fields or CLIENT_FIELDS
+    first = ((today or date.today()) - timedelta(days=history - 1)).isoformat() if history else None
+    out = []
+    for row in rows:
+        p = {f: row[f] for f in keep}
+        if first and "history" in p:
+            p["history"] = [h for h in p["history"] if str(h)[:10] >= first]
+        out.append(p)
+    return out
+
+
+def history_bitmap(history, days: int, today: date, _ago: dict | None = None) -> str:
+    """Completion days of the last ``days`` days as base64 bits: bit ``i``
+    (byte ``i // 8``, bit ``i % 8``) is set when the task was done ``i`` days
+    before ``today``. Empty when there are none. ``_ago`` maps ISO day ->
+    days ago for the window (shared across tasks by ``columnar``)."""
+    if _ago is None:
+        _ago = {(today - timedelta(days=i)).isoformat(): i for i in range(days)}
+    bits = bytearray((days + 7) // 8)
+    for h in history:
+        ago = _ago.get(str(h)[:10])
+        if ago is not None:
+            bits[ago >> 3] |= 1 << (ago & 7)
+    return base64.b64encode(bits).decode("ascii") if any(bits) else ""
+
+
+def columnar(rows: list, fields=None, history=None, today: date | None = None) -> dict:
+    """Client tasks as one array per field. ``group``/``priority``/``repeat``
+    hold indexes into ``dicts``; booleans are 0/1; ``history`` is a
+    ``history_bitmap`` over ``history_days`` (default 371) ending ``history_anchor``."""
+    today = today or date.today()
+    days = history or 371
+    fields = fields or CLIENT_FIELDS
+    columns, dicts = {}, {}
+    for f in fields:
+        values = [row[f] for row in rows]
+        if f in DICT_FIELDS:
+            index = {}
+            values = [index.setdefault(v, len(index)) for v in values]
+            dicts[f] = list(index)
+        elif f == "history":
+            ago = {(today - timedelta(days=i)).isoformat(): i for i in range(days)}
+            values = [history_bitmap(v, days, today, ago) for v in values]
+        elif values and isinstance(values[0], bool):
+            values = [int(v) for v in values]
+        columns[f] = values
+    out = {"format": "columns", "count": len(rows), "fields": list(fields),
+           "columns": columns, "dicts": dicts}
+    if "history" in fields:
+        out.update(history_anchor=today.isoformat(), history_days=days)
+    return out
+
+
+# ---------- validators (ETag / If-None-Match / If-Match) ----------
+def _digest(text: str, size: int = 8) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=size).hexdigest()
+
+
+def task_etag(t: dict) -> str:
+    """Strong validator for one task: a hash of its stored form."""
+    stored = json.dumps(model.persistable_task(t), sort_keys=True, separators=(",", ":"))
+    return f'"t{t.get("id")}-{_digest(stored)}"'
+
+
+def rev_etag(rev, target: str, day: date | None = None) -> str:
+    """Strong validator for a response that is a pure function of the store:
+    its rev plus the request path and (order-normalized) query, so different
+    queries never share a tag. ``day`` is the history window's last day for
+    responses that also depend on the date."""
+    url = urlparse(target)
+    key = url.path + "?" + urlencode(sorted(parse_qsl(url.query)))
+    if day is not None:
+        key += "@" + day.isoformat()
+    return f'"r{rev}-{_digest(key, 6)}"'
+
+
+def etag_matches(header, etag: str, weak: bool = True) -> bool:
+    """Whether an If-None-Match (``weak`` comparison) or If-Match (strong)
+    header names ``etag``; ``*`` matches anything."""
+    for tag in (header or "").split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            if not weak:
+                continue
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+# ---------- compression (Accept-Encoding) ----------
+COMPRESSION_STATS = {"responses": 0, "bytes_in": 0, "bytes_out": 0, "cpu_seconds": 0.0}
+_STATS_LOCK = threading.Lock()
+
+
+def negotiate_encoding(header) -> str | None:
+    """The content-coding to use for an Accept-Encoding header: the best-q
+    entry among ENCODINGS (ties go to server preference), None for identity.
+    ``q=0`` refuses a coding; ``*`` stands for any coding not listed."""
+    prefs = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name == "x-gzip":
+            name = "gzip"
+        if name:
+            prefs[name] = q
+    best, best_q = None, 0.0
+    for enc in ENCODINGS:
+        q = prefs.get(enc, prefs.get("*", 0.0))
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+def compress(data: bytes, encoding: str, level: int = COMPRESS_LEVEL) -> bytes:
+    """``data`` in the given content-coding (``deflate`` is the zlib format,
+    as HTTP defines it). gzip output has a zero mtime so it is reproducible."""
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if encoding == "deflate":
+        return zlib.compress(data, level)
+    raise ValueError(f"unknown content-coding: {encoding}")
+
+
+def encoded_etag(etag: str, encoding: str | None) -> str:
+    """The validator of ``etag``'s representation in ``encoding``: a strong
+    ETag must differ between content-codings of the same resource."""
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+
+def _record_compression(size_in: int, size_out: int, cpu: float) -> None:
+    with _STATS_LOCK:
+        COMPRESSION_STATS["responses"] += 1
+        COMPRESSION_STATS["bytes_in"] += size_in
+        COMPRESSION_STATS["bytes_out"] += size_out
+        COMPRESSION_STATS["cpu_seconds"] += cpu
+
+
+def _server_timing(encoding: str, size_in: int, size_out: int, cpu: float) -> str:
+    """Server-Timing entry reporting one compression: CPU milliseconds and the
+    ratio (compressed / original) — visible in the browser's network panel."""
+    return (f'compress;dur={cpu * 1000:.2f};desc="{encoding} {size_in}>{size_out} '
+            f'ratio={size_out / size_in:.3f}"')
+
+
+# src="app.js" / href="assets/icon.png": relative, no scheme, query or fragment
+_ASSET_REF = re.compile(r'\b(src|href)="(?![a-z][a-z0-9+.-]*:|/|#)([^"?#]+)"', re.IGNORECASE)
+
+
+def _compressible(ctype: str) -> bool:
+    return ctype.startswith("text/") or ctype in ("application/javascript", "application/json",
+                                                  "image/svg+xml")
+
+
+class StaticAssets:
+    """The files under ``web/``, read and pre-compressed once and served from
+    memory. Each lookup re-stats the file (mtime/size) so an edited asset is
+    picked up without a restart; nothing else touches the disk.
+
+    Every entry carries a content hash (``version``, also its ETag) and a
+    Last-Modified date. HTML pages have their local ``src``/``href`` references
+    rewritten to ``name?v=<version>``; such fingerprinted URLs never change
+    content, so they are served as immutable. A page is re-rendered when one of
+    the assets it references changes.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root.resolve()
+        self._lock = threading.Lock()
+        self._entries = {}   # resolved path -> entry dict
+        self.stats = {"hits": 0, "loads": 0}
+
+    def preload(self) -> int:
+        """Load every asset now (server startup); returns how many."""
+        count = 0
+        for path in sorted(self.root.rglob("*")):
+            if path.is_file() and self.get(path) is not None:
+                count += 1
+        return count
+
+    def get(self, target: Path) -> dict | None:
+        """``{"type", "data", "encoded": {coding: bytes}, "version", "etag",
+        "mtime", "last_modified"}`` for a file inside the root, or None
+        (missing, or outside the root)."""
+        target = target.resolve()
+        if not target.is_relative_to(self.root):
+            return None
+        try:
+            st = target.stat()
+        except OSError:
+            return None
+        if not target.is_file():
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(target)
+        if entry is not None and entry["stamp"] == stamp and self._deps_current(entry):
+            with self._lock:
+                self.stats["hits"] += 1
+            return entry
+        entry = self._load(target, stamp, st.st_mtime)
+        with self._lock:
+            self._entries[target] = entry
+            self.stats["loads"] += 1
+        return entry
+
+    def _deps_current(self, entry: dict) -> bool:
+        for dep, version in entry["deps"].items():
+            current = self.get(dep)
+            if current is None or current["version"] != version:
+                return False
+        return True
+
+    def _load(self, target: Path, stamp, mtime: float) -> dict:
+        ctype = mimetypes.guess_type(str(target))[0] or "application/octet-stream"
+        data = target.read_bytes()
+        deps = {}
+        if ctype == "text/html":
+            data, deps = self._fingerprint(target, data)
+            mtime = max([mtime] + [self.get(dep)["mtime"] for dep in deps])
+        encoded = {}
+        if _compressible(ctype) and len(data) >= COMPRESS_MIN_BYTES:
+            for enc in ENCODINGS:
+                packed = compress(data, enc, level=9)
+                if len(packed) < len(data):
+                    encoded[enc] = packed
+        version = hashlib.blake2b(data, digest_size=6).hexdigest()
+        return {"type": ctype, "data": data, "encoded": encoded, "stamp": stamp, "deps": deps,
+                "version": version, "etag": f'"s-{version}"', "mtime": mtime,
+                "last_modified": formatdate(mtime, usegmt=True)}
+
+    def _fingerprint(self, page: Path, data: bytes):
+        """``page`` with references to local non-HTML files as ``?v=`` URLs,
+        plus ``{file: version}`` of what it references."""
+        deps = {}
+
+        def rewrite(m):
+            ref = m.group(2)
+            entry = self.get(page.parent / ref)
+            if entry is None or entry["type"] == "text/html":
+                return m.group(0)
+            deps[(page.parent / ref).resolve()] = entry["version"]
+            return f'{m.group(1)}="{ref}?v={entry["version"]}"'
+
+        text = _ASSET_REF.sub(rewrite, data.decode("utf-8"))
+        return text.encode("utf-8"), deps
+
+
+_ASSETS = StaticAssets(WEB_DIR)
+# Title/notes n-grams for ?q= (synced to the store copy once per rev).
+_TEXT_INDEX = NgramIndex()
+
+
+def stale_precondition(if_match, t: dict) -> bool:
+    """Whether an If-Match header is present and does not name ``t``'s current ETag."""
+    return if_match is not None and not etag_matches(if_match, task_etag(t), weak=False)
+
+
+def precondition_body(t: dict) -> dict:
+    """The 412 answer: the current task, so the client can show what changed."""
+    return {"error": "task changed since you loaded it", "task": client_task(t)}
 
 
 # ---------- operations (mirror the desktop, minus Tk) ----------
@@ -107,6 +707,7 @@ def op_update(t: dict, payload: dict) -> None:
         title = (payload.get("title") or "").strip()
         if title:
             t["title"] = title
+        t.pop("possible_duplicate", None)  # a full edit means the import flag was reviewed
     if "notes" in payload:
         t["notes"] = payload.get("notes") or ""
     if "group" in payload:
@@ -179,21 +780,173 @@ def op_add(db: dict, payload: dict) -> dict:
     return t
 
 
+def op_delete(t: dict) -> None:
+    t["is_deleted"] = True
+    t["deleted_at"] = datetime.now().isoformat(timespec="seconds")
+
+
+def op_restore(t: dict) -> None:
+    t["is_deleted"] = False
+    t.pop("deleted_at", None)
+
+
+# POST /api/batch: op name -> fn(task, op) for the ops that change one task.
+BATCH_TASK_OPS = {
+    "toggle": lambda t, op: op_toggle(t),
+    "done": lambda t, op: op_mark_done(t),
+    "patch": lambda t, op: op_update(t, op.get("fields") or {}),
+    "delete": lambda t, op: op_delete(t),
+    "restore": lambda t, op: op_restore(t),
+}
+BATCH_OPS = tuple(BATCH_TASK_OPS) + ("harddelete", "add")
+
+
+def apply_batch(db: dict, ops: list) -> list:
+    """Run ``ops`` in order against ``db`` (mutated in place, not saved) and
+    return one result per op: ``{"ok": True, "status", "task"?}`` or
+    ``{"ok": False, "status", "error", "task"?}``. An op is ``{"op", "id"}``
+    (``"fields"`` for patch and add; optional ``"if_match"``: the task's ETag,
+    refused with 412 and the current task when stale). A failed op changes
+    nothing; the rest still apply."""
+    by_id = {t["id"]: t for t in db["tasks"]}
+    removed = set()
+    results = []
+    for op in ops:
+        name = op.get("op") if isinstance(op, dict) else None
+        if name not in BATCH_OPS:
+            results.append({"ok": False, "status": 400, "error": f"op must be one of {', '.join(BATCH_OPS)}"})
+            continue
+        if not isinstance(op.get("fields") or {}, dict):
+            results.append({"ok": False, "status": 400, "error": "fields must be an object"})
+            continue
+        if name == "add":
+            try:
+                t = op_add(db, op.get("fields") or {})
+            except ValueError as e:
+                results.append({"ok": False, "status": 400, "error": str(e)})
+                continue
+            by_id[t["id"]] = t
+            results.append({"ok": True, "status": 201, "task": client_task(t)})
+            continue
+        if type(op.get("id")) is not int:  # bool is an int subclass: refuse true/false as ids
+            results.append({"ok": False, "status": 400, "error": "id must be an integer"})
+            continue
+        t = by_id.get(op["id"])
+        if t is None:
+            results.append({"ok": False, "status": 404, "error": "not found"})
+            continue
+        if op.get("if_match") and not etag_matches(op["if_match"], task_etag(t), weak=False):
+            results.append({"ok": False, "status": 412, "error": "task changed since you loaded it",
+                            "task": client_task(t)})
+            continue
+        if name == "harddelete":
+            del by_id[t["id"]]
+            removed.add(t["id"])
+            results.append({"ok": True, "status": 200})
+            continue
+        BATCH_TASK_OPS[name](t, op)
+        results.append({"ok": True, "status": 200, "task": client_task(t)})
+    if removed:
+        db["tasks"] = [t for t in db["tasks"] if t["id"] not in removed]
+    return results
+
+
+def batch_undo(db: dict, ops: list):
+    """Snapshot what ``apply_batch(db, ops)`` can change (the task list,
+    ``next_id`` and the tasks the ops name) and return a function restoring it,
+    so an atomic batch leaves the shared copy as it found it."""
+    tasks, next_id = list(db["tasks"]), db.get("next_id")
+    ids = {op.get("id") for op in ops if isinstance(op, dict)}
+    saved = [(t, copy.deepcopy(t)) for t in tasks if t["id"] in ids]
+
+    def undo():
+        for t, before in saved:
+            t.clear()
+            t.update(before)
+        db["tasks"], db["next_id"] = tasks, next_id
+    return undo
+
+
+class _BodyReader(io.RawIOBase):
+    """Raw reader over exactly ``length`` bytes of a request body.
+
+    Wrapped in a TextIOWrapper it yields lines lazily straight off the socket,
+    so a large import never has to be held in memory as one string.
+    """
+
+    def __init__(self, rfile, length: int):
+        self._rfile = rfile
+        self._left = length
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self._left <= 0:
+            return 0
+        chunk = self._rfile.read(min(len(b), self._left, 65536))
+        self._left -= len(chunk)
+        b[:len(chunk)] = chunk
+        return len(chunk)
+
+
 # ---------- HTTP handler ----------
 class Handler(BaseHTTPRequestHandler):
     def log_message(self, *args):
         pass  # quiet
 
     # -- helpers --
-    def _send_json(self, obj, status=200):
+    def _send_json(self, obj, status=200, etag=None, content_etag=False):
+        """Send ``obj`` as JSON. With an ``etag`` (or ``content_etag``: one hashed
+        from the body) the response is revalidatable, and a matching
+        If-None-Match gets an empty 304 instead."""
         body = json.dumps(obj).encode("utf-8")
+        if content_etag:
+            etag = f'"c-{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            if status == 200 and self._client_has(etag):
+                return self._send_not_modified(etag)
+        encoding = self._accepted_encoding() if len(body) >= COMPRESS_MIN_BYTES else None
+        if encoding:
+            cpu = time.thread_time()
+            packed = compress(body, encoding)
+            cpu = time.thread_time() - cpu
+            _record_compression(len(body), len(packed), cpu)
+            timing = _server_timing(encoding, len(body), len(packed), cpu)
+            body = packed
         self.send_response(status)
         self.send_header("Content-Type", "application/json; charset=utf-8")
         self.send_header("Content-Length", str(len(body)))
-        self.send_header("Cache-Control", "no-store")
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+            self.send_header("Server-Timing", timing)
+        if etag:
+            self.send_header("ETag", encoded_etag(etag, encoding))
+            self.send_header("Cache-Control", "no-cache")  # may be kept, must be revalidated
+        else:
+            self.send_header("Cache-Control", "no-store")
         self.end_headers()
         self.wfile.write(body)
 
+    def _accepted_encoding(self) -> str | None:
+        return negotiate_encoding(self.headers.get("Accept-Encoding"))
+
+    def _client_has(self, etag: str) -> bool:
+        """If-None-Match names ``etag`` in any of its content-codings."""
+        header = self.headers.get("If-None-Match")
+        return any(etag_matches(header, encoded_etag(etag, enc)) for enc in (None,) + ENCODINGS)
+
+    def _send_not_modified(self, etag: str, cache: str = "no-cache"):
+        # Echo the variant the client holds, so its cached headers stay consistent.
+        header = self.headers.get("If-None-Match")
+        etag = next((encoded_etag(etag, enc) for enc in ENCODINGS
+                     if etag_matches(header, encoded_etag(etag, enc))), etag)
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache)
+        self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+
     def _read_json(self):
         length = int(self.headers.get("Content-Length", 0) or 0)
         if not length:
@@ -210,43 +963,68 @@ class Handler(BaseHTTPRequestHandler):
     def do_GET(self):
         path = urlparse(self.path).path
         if path == "/api/tasks":
-            with _DB_LOCK:
-                db = model.load_db()
-                payload = {"tasks": client_tasks(db), "settings": db.get("settings", {})}
-            return self._send_json(payload)
+            return self._send_tasks(parse_qs(urlparse(self.path).query, keep_blank_values=True))
+        if path.startswith("/api/tasks/") and path.count("/") == 3:
+            return self._send_task(path.split("/")[3])
         if path == "/api/stats":
             with _DB_LOCK:
-                stats = model.stats_summary(model.load_db())
-            return self._send_json(stats)
-        return self._serve_static(path)
+                stats = model.stats_summary(_STORE.get())  # time-dependent: not memoized
+            return self._send_json(stats, content_etag=True)
+        if path == "/api/export":
+            return self._send_export(parse_qs(urlparse(self.path).query))
+        if path == "/api/search":
+            return self._send_search(parse_qs(urlparse(self.path).query))
+        if path == "/api/events":
+            return self._send_events(parse_qs(urlparse(self.path).query))
+        return self._serve_static(path, parse_qs(urlparse(self.path).query))
 
     def do_POST(self):
         path = urlparse(self.path).path
         if path == "/api/tasks":
             payload = self._read_json()
-            with _DB_LOCK:
-                db = model.load_db()
+
+            def add(db):
                 try:
                     t = op_add(db, payload)
                 except ValueError as e:
-                    return self._send_json({"error": str(e)}, 400)
-                model.save_db(db)
-                client = to_client(t)
-            return self._send_json(client, 201)
+                    return False, {"error": str(e)}
+                return {t["id"]}, client_task(t)
+
+            done = self._write(add)
+            if done is None:
+                return
+            client = done[0]
+            if "error" in client:
+                return self._send_json(client, 400)
+            return self._send_json(client, 201, etag=client["etag"])
         if path == "/api/hazard/reset":
-            with _DB_LOCK:
-                db = model.load_db()
-                count = op_reset_hazard(db)
-                model.save_db(db)
-            return self._send_json({"ok": True, "reset": count})
+            done = self._write(lambda db: (True, op_reset_hazard(db)))
+            if done is None:
+                return
+            return self._send_json({"ok": True, "reset": done[0]})
         if path == "/api/import":
-            text = self._read_json().get("text", "")
-            with _DB_LOCK:
-                db = model.load_db()
-                added, failed, details = import_from_string(text, db, return_details=True)
-                if added:
-                    model.save_db(db)
-            return self._send_json({"added": added, "failed": failed, "details": details})
+            # text/plain bodies are streamed line by line from the socket; the
+            # legacy {"text": ...} JSON body still works for small pastes.
+            mode = (parse_qs(urlparse(self.path).query).get("duplicates") or [DEFAULT_DUPLICATE_MODE])[0]
+            if mode not in DUPLICATE_MODES:
+                return self._send_json({"error": f"duplicates must be one of {', '.join(DUPLICATE_MODES)}"}, 400)
+            ctype = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+            if ctype == "text/plain":
+                length = int(self.headers.get("Content-Length", 0) or 0)
+                lines = io.TextIOWrapper(io.BufferedReader(_BodyReader(self.rfile, length)),
+                                         encoding="utf-8", errors="replace")
+            else:
+                lines = self._read_json().get("text", "").splitlines()
+            dupes = []
+            added, failed, details = import_stream(lines, lock=_DB_LOCK, duplicates=mode,
+                                                   on_duplicate=lambda line_no, tid: dupes.append(line_no))
+            if added or (dupes and mode == "merge"):
+                with _DB_LOCK:
+                    _after_write(_STORE.get())  # import_stream wrote rows: the rev moved, so this reloads
+            return self._send_json({"added": added, "failed": failed, "details": details,
+                                    "duplicates": len(dupes), "duplicate_mode": mode})
+        if path == "/api/batch":
+            return self._batch(self._read_json())
         if path.startswith("/api/tasks/") and path.endswith("/toggle"):
             return self._mutate_one(path.split("/")[3], op_toggle)
         if path.startswith("/api/tasks/") and path.endswith("/done"):
@@ -265,70 +1043,497 @@ class Handler(BaseHTTPRequestHandler):
     def do_DELETE(self):
         path = urlparse(self.path).path
         if path.startswith("/api/tasks/"):
-            def _del(t):
-                t["is_deleted"] = True
-                t["deleted_at"] = datetime.now().isoformat(timespec="seconds")
-            return self._mutate_one(path.split("/")[3], _del)
+            return self._mutate_one(path.split("/")[3], op_delete)
         return self._send_json({"error": "not found"}, 404)
 
+    def _write(self, job):
+        """Run ``job`` on the group-commit writer and return ``(value, rev)``,
+        or None once an error response went out: 503 when the commit didn't
+        come within ``WRITE_TIMEOUT_SECONDS`` (a job still queued is cancelled;
+        one already running may yet commit, and the message says so), 500 when
+        the job or the save raised. ``Rollback`` is left to the caller."""
+        fut = _WRITER.submit(job)
+        try:
+            return fut.result(WRITE_TIMEOUT_SECONDS), fut.rev
+        except Rollback:
+            raise
+        except FutureTimeout:
+            error = ("server busy: nothing was written, try again" if fut.cancel()
+                     else "server busy: the write is still running and may yet be saved")
+            self._send_json({"error": error}, 503)
+        except Exception:
+            logger.exception("write failed: %s %s", self.command, self.path)
+            self._send_json({"error": "write failed"}, 500)
+        return None
+
     def _mutate_one(self, raw_id, fn):
         try:
             tid = int(raw_id)
         except ValueError:
             return self._send_json({"error": "bad id"}, 400)
-        with _DB_LOCK:
-            db = model.load_db()
+        if_match = self.headers.get("If-Match")
+
+        def job(db):
             t = self._find(db, tid)
             if not t:
-                return self._send_json({"error": "not found"}, 404)
+                return False, (404, {"error": "not found"})
+            if stale_precondition(if_match, t):
+                return False, (412, precondition_body(t))
             fn(t)
-            model.save_db(db)
-            client = to_client(t)
-        return self._send_json(client)
+            return {tid}, (200, client_task(t))
+
+        done = self._write(job)
+        if done is None:
+            return
+        status, body = done[0]
+        return self._send_json(body, status, etag=(body.get("task") or body).get("etag"))
+
+    def _batch(self, body):
+        """``POST /api/batch`` ``{"ops": [...], "atomic": false}``: every op
+        (see ``apply_batch``) against one snapshot, then one save — one
+        transaction, one rev — however many tasks changed. With ``atomic``
+        any failed op discards the whole batch (409, nothing written)."""
+        ops = body.get("ops") if isinstance(body, dict) else None
+        if not isinstance(ops, list) or not ops:
+            return self._send_json({"error": "ops must be a non-empty list"}, 400)
+        if len(ops) > BATCH_MAX_OPS:
+            return self._send_json({"error": f"at most {BATCH_MAX_OPS} ops per batch"}, 400)
+        atomic = bool(body.get("atomic"))
+
+        def job(db):
+            undo = batch_undo(db, ops) if atomic else None
+            results = apply_batch(db, ops)
+            failed = sum(not r["ok"] for r in results)
+            if atomic and failed:
+                undo()  # a raising job must leave the copy untouched
+                raise Rollback({"rev": db["_rev"], "applied": 0, "failed": failed, "results": results})
+            touched = {r["task"]["id"] if "task" in r else op["id"] for op, r in zip(ops, results) if r["ok"]}
+            return touched, {"applied": len(results) - failed, "failed": failed, "results": results}
+
+        try:
+            done = self._write(job)
+        except Rollback as e:
+            return self._send_json(e.value, 409)
+        if done is None:
+            return
+        out, rev = done
+        return self._send_json(dict(out, rev=rev))
 
     def _hard_delete(self, raw_id):
+        try:
+            tid = int(raw_id)
+        except ValueError:
+            return self._send_json({"error": "bad id"}, 400)
+        if_match = self.headers.get("If-Match")
+
+        def job(db):
+            t = self._find(db, tid)
+            if not t:
+                return False, (404, {"error": "not found"})
+            if stale_precondition(if_match, t):
+                return False, (412, precondition_body(t))
+            db["tasks"] = [x for x in db["tasks"] if x["id"] != tid]
+            return {tid}, (200, {"ok": True})
+
+        done = self._write(job)
+        if done is None:
+            return
+        status, body = done[0]
+        return self._send_json(body, status, etag=(body.get("task") or {}).get("etag"))
+
+    def _send_export(self, qs):
+        """Stream an export straight off a store cursor (no Content-Length; the
+        response ends when the connection closes)."""
+        arg = lambda k: (qs.get(k) or [""])[0].strip()
+        fmt = arg("format") or "pipe"
+        if fmt not in io_export.FORMATS:
+            return self._send_json({"error": f"format must be one of {', '.join(io_export.FORMATS)}"}, 400)
+        lines = io_export.iter_export(fmt, category=arg("category") or None,
+                                      time_scope=arg("time") or None, query=arg("q"),
+                                      min_priority=arg("min_priority") or None)
+        self.send_response(200)
+        self.send_header("Content-Type", io_export.CONTENT_TYPES[fmt])
+        self.send_header("Content-Disposition",
+                         f'attachment; filename="tasks-{date.today().isoformat()}{io_export.FILE_SUFFIXES[fmt]}"')
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.close_connection = True
+        buf = []
+        size = 0
+        for line in lines:
+            buf.append(line)
+            size += len(line)
+            if size >= 65536:
+                self.wfile.write("".join(buf).encode("utf-8"))
+                buf.clear()
+                size = 0
+        self.wfile.write("".join(buf).encode("utf-8"))
+
+    def _send_tasks(self, qs):
+        """All tasks, or with ``?since=<rev>`` only what changed after that rev:
+        ``{"rev", "upserted": [task], "deleted": [id], "settings"}`` from the
+        store's change feed. A client the feed can't serve (too far behind, or
+        a replaced store) gets the full snapshot, marked ``"full": true``.
+
+        ``?fields=a,b`` projects each task, ``?history=<days>`` trims its
+        completion history, and ``?format=columns`` sends a full snapshot
+        column-wise (see ``columnar``); deltas stay one object per task.
+        Any of QUERY_PARAMS switches to a filtered page (``_send_query``)."""
+        since = (qs.get("since") or [""])[0].strip()
+        if since and not since.lstrip("-").isdigit():
+            return self._send_json({"error": "since must be a revision number"}, 400)
+        try:
+            shape = parse_shape(qs)
+        except ValueError as e:
+            return self._send_json({"error": str(e)}, 400)
+        if any(k in qs for k in QUERY_PARAMS):
+            if since:
+                return self._send_json({"error": "since cannot be combined with a query"}, 400)
+            return self._send_query(qs, shape)
+        # A history window or columnar body ends today: the same rev reads
+        # differently tomorrow, so the day is part of the tag.
+        today = date.today() if shape["history"] or shape["format"] == "columns" else None
+        with _DB_LOCK:
+            db = _STORE.get()
+            etag = rev_etag(db["_rev"], self.path, today)
+            if self._client_has(etag):
+                return self._send_not_modified(etag)
+            delta = model.changes_since(int(since)) if since else None
+            if delta is not None:
+                rows = [client_task(t) for t in delta["upserted"]]
+                payload = {"rev": delta["rev"], "full": False,
+                           "upserted": project(rows, shape["fields"], shape["history"], today),
+                           "deleted": delta["deleted"], "settings": db.get("settings", {})}
+            else:
+                payload = self._full_tasks(shape, db, today)
+                if since:
+                    payload = dict(payload, full=True)
+        # Tag what is actually sent (another writer may have moved the rev meanwhile).
+        return self._send_json(payload, etag=rev_etag(payload["rev"], self.path, today))
+
+    @staticmethod
+    def _full_tasks(shape: dict | None = None, db: dict | None = None, today: date | None = None) -> dict:
+        db = _STORE.get() if db is None else db
+
+        def full(d):
+            return _STORE.view("tasks", lambda x: {"rev": x["_rev"], "tasks": client_tasks(x),
+                                                   "settings": x.get("settings", {})}, d)
+
+        if not shape or shape == {"fields": None, "format": "objects", "history": None}:
+            return full(db)
+        today = today or date.today()  # history windows depend on the day: part of the memo key
+
+        def shaped(d):
+            base = full(d)
+            rows = base["tasks"]
+            if shape["format"] == "columns":
+                body = columnar(rows, shape["fields"], shape["history"], today)
+            else:
+                body = {"tasks": project(rows, shape["fields"], shape["history"], today)}
+            return dict(body, rev=base["rev"], settings=base["settings"])
+
+        key = ("tasks", shape["fields"], shape["format"], shape["history"], today)
+        return _STORE.view(key, shaped, db)
+
+    def _send_query(self, qs, shape: dict):
+        """One page of the tasks matching ``category``/``time`` (+ ``date`` for
+        custom)/``min_prio``/``group``/``q``, ordered by ``sort``/``order``, run
+        against the per-rev ``filters.ScopeIndex`` and the n-gram text index:
+        ``{"rev", "tasks", "total", "next_cursor", "counts", "groups", "fuzzy",
+        "settings"}``. ``counts`` holds every category's size and ``groups`` the
+        active tasks per group, so a sidebar needs no task list. ``limit=0``
+        returns just those. ``q`` falls back to typo-tolerant matches
+        (``"fuzzy": true``) when nothing contains it, as on the desktop."""
+        arg = lambda k: (qs.get(k) or [""])[0].strip()
+        category, time_scope = arg("category") or "active", arg("time") or "any"
+        sort, order = arg("sort"), arg("order") or "asc"
+        errors = []
+        if category not in filters.CATEGORY_SCOPES:
+            errors.append(f"category must be one of {', '.join(filters.CATEGORY_SCOPES)}")
+        if time_scope not in filters.TIME_SCOPES:
+            errors.append(f"time must be one of {', '.join(filters.TIME_SCOPES)}")
+        if sort and sort not in filters.SORT_COLUMNS:
+            errors.append(f"sort must be one of {', '.join(filters.SORT_COLUMNS)}")
+        if order not in ("asc", "desc"):
+            errors.append("order must be asc or desc")
+        min_prio = normalize_priority(arg("min_prio")) if arg("min_prio") not in ("", "all") else None
+        if min_prio and min_prio not in PRIORITY_ORDER:
+            errors.append(f"min_prio must be one of {', '.join(PRIORITY_ORDER)} or all")
+        custom = None
+        if time_scope == "custom":
+            try:
+                custom = date.fromisoformat(arg("date"))
+            except ValueError:
+                errors.append("time=custom needs date=YYYY-MM-DD")
+        try:
+            limit = int(arg("limit") or QUERY_PAGE_SIZE)
+            offset = int(arg("cursor") or 0)
+            if not (0 <= limit <= QUERY_MAX_LIMIT and offset >= 0):
+                raise ValueError
+        except ValueError:
+            errors.append(f"limit must be 0-{QUERY_MAX_LIMIT} and cursor one returned by a previous page")
+        if errors:
+            return self._send_json({"error": "; ".join(errors)}, 400)
+        if not sort:
+            sort, order = ("completed", "desc") if category == "done" else ("agenda", order)
+        query, group = arg("q"), qs.get("group", [None])[0]
+        now = datetime.now()
+        with _DB_LOCK:
+            db = _STORE.get()
+            index = _STORE.view("scopes", lambda d: filters.ScopeIndex(d["tasks"]), db)
+            select = lambda ids: index.select(category, time_scope, min_prio, group, ids, custom, now)
+            fuzzy = False
+            if query:
+                text = _STORE.view("text_index", lambda d: (_TEXT_INDEX.sync(d["tasks"]), _TEXT_INDEX)[1], db)
+                matches = index.sort(select(text.search(query)), sort, order == "desc")
+                if not matches:
+                    ranked = [tid for tid, _ in text.fuzzy(query)]
+                    hits = {t["id"]: t for t in select(set(ranked))}
+                    matches = [hits[tid] for tid in ranked if tid in hits]
+                    fuzzy = bool(matches)
+            else:
+                matches = index.sort(select(None), sort, order == "desc")
+            page = [client_task(t) for t in matches[offset:offset + limit]]
+            payload = {"rev": db["_rev"], "total": len(matches),
+                       "next_cursor": str(offset + limit) if limit and offset + limit < len(matches) else None,
+                       "counts": index.counts(now), "groups": dict(index.groups), "fuzzy": fuzzy,
+                       "settings": db.get("settings", {})}
+        if shape["format"] == "columns":
+            payload.update(columnar(page, shape["fields"], shape["history"]))
+        else:
+            payload["tasks"] = project(page, shape["fields"], shape["history"])
+        # Time-dependent (overdue, today...): validated by content, not by rev.
+        return self._send_json(payload, content_etag=True)
+
+    def _send_task(self, raw_id):
+        """One task's full record (the list may carry only a projection)."""
         try:
             tid = int(raw_id)
         except ValueError:
             return self._send_json({"error": "bad id"}, 400)
         with _DB_LOCK:
-            db = model.load_db()
-            before = len(db["tasks"])
-            db["tasks"] = [t for t in db["tasks"] if t["id"] != tid]
-            if len(db["tasks"]) == before:
+            by_id = _STORE.view("by_id", lambda db: {t["id"]: t for t in db["tasks"]})
+            t = by_id.get(tid)
+            if t is None:
                 return self._send_json({"error": "not found"}, 404)
-            model.save_db(db)
-        return self._send_json({"ok": True})
+            etag = task_etag(t)
+            if self._client_has(etag):
+                return self._send_not_modified(etag)
+            client = client_task(t)
+        return self._send_json(client, etag=etag)
 
-    def _serve_static(self, path):
+    def _send_events(self, qs):
+        """Server-Sent Events: ``tasks`` / ``reminder`` / ``rollover`` / ``resync``
+        (see core.events) until the client goes away or the server stops.
+        Resumes after ``Last-Event-ID`` (header, or ``?lastEventId=``)."""
+        last = (self.headers.get("Last-Event-ID") or (qs.get("lastEventId") or [""])[0]).strip()
+        sub = _EVENTS.subscribe(int(last) if last.isdigit() else None)
+        if sub is None:
+            return self._send_json({"error": "too many live-update subscribers"}, 503)
+        self.close_connection = True  # the stream ends with the connection
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+            self.send_header("Cache-Control", "no-store")
+            self.send_header("X-Accel-Buffering", "no")
+            self.end_headers()
+            self.wfile.write(f"retry: {EVENT_RETRY_MS}\n\n".encode("utf-8"))
+            while True:
+                events = _EVENTS.next(sub, EVENT_HEARTBEAT_SECONDS)
+                if events is None:
+                    break
+                chunk = "".join(format_event(ev) for ev in events) if events else ": ping\n\n"
+                self.wfile.write(chunk.encode("utf-8"))
+                self.wfile.flush()
+        except OSError:
+            pass  # client went away
+        finally:
+            _EVENTS.unsubscribe(sub)
+
+    def _send_search(self, qs):
+        """Ranked full-text hits (see core.search). ``snippet`` is HTML-escaped
+        with the matched terms in <mark>."""
+        arg = lambda k: (qs.get(k) or [""])[0].strip()
+        try:
+            limit = max(1, min(int(arg("limit") or 20), SEARCH_MAX_RESULTS))
+        except ValueError:
+            return self._send_json({"error": "limit must be a number"}, 400)
+        kinds = [k for k in arg("kind").split(",") if k] or None
+        if kinds and not set(kinds) <= set(search.KINDS):
+            return self._send_json({"error": f"kind must be among {', '.join(search.KINDS)}"}, 400)
+        hits = search.search(arg("q"), limit=limit, kinds=kinds, highlight=("\x02", "\x03"))
+        for h in hits:
+            h["snippet"] = html.escape(h["snippet"]).replace("\x02", "<mark>").replace("\x03", "</mark>")
+            h.pop("path")  # server-local detail
+        return self._send_json({"query": arg("q"), "results": hits})
+
+    def _serve_static(self, path, qs):
+        """A file from web/ (see StaticAssets). ``?v=<version>`` URLs — the ones
+        index.html links to — are cacheable forever; plain URLs must revalidate
+        (ETag / Last-Modified, answered with 304)."""
         if path in ("/", ""):
             path = "/index.html"
-        target = (WEB_DIR / path.lstrip("/")).resolve()
-        # prevent path traversal outside web/
-        if not str(target).startswith(str(WEB_DIR.resolve())) or not target.is_file():
+        # StaticAssets refuses paths that resolve outside web/ (traversal)
+        asset = _ASSETS.get(WEB_DIR / path.lstrip("/"))
+        if asset is None:
             self.send_error(404)
             return
-        ctype = mimetypes.guess_type(str(target))[0] or "application/octet-stream"
-        data = target.read_bytes()
+        if (qs.get("v") or [""])[0] == asset["version"]:
+            cache = f"public, max-age={STATIC_IMMUTABLE_SECONDS}, immutable"
+        else:
+            cache = "no-cache"
+        if self._static_unchanged(asset):
+            return self._send_not_modified(asset["etag"], cache)
+        encoding = self._accepted_encoding()
+        data = asset["encoded"].get(encoding) if encoding else None
+        if data is None:
+            encoding, data = None, asset["data"]
         self.send_response(200)
-        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Type", asset["type"])
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+            self.send_header("Server-Timing", _server_timing(encoding, len(asset["data"]), len(data), 0.0))
         self.send_header("Content-Length", str(len(data)))
-        self.send_header("Cache-Control", "no-store")  # always serve fresh during dev
+        if asset["encoded"]:
+            self.send_header("Vary", "Accept-Encoding")
+        self.send_header("ETag", encoded_etag(asset["etag"], encoding))
+        self.send_header("Last-Modified", asset["last_modified"])
+        self.send_header("Cache-Control", cache)
         self.end_headers()
         self.wfile.write(data)
 
+    def _static_unchanged(self, asset: dict) -> bool:
+        if self.headers.get("If-None-Match") is not None:  # takes precedence over the date
+            return self._client_has(asset["etag"])
+        since = self.headers.get("If-Modified-Since")
+        if not since:
+            return False
+        try:
+            return int(asset["mtime"]) <= parsedate_to_datetime(since).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+class WebServer(ThreadingHTTPServer):
+    # socketserver's default listen backlog (5) resets connections as soon as a
+    # handful of clients connect at once; writes now queue in the group-commit
+    # writer instead, so let the connections in.
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def start_reminder_dispatcher() -> ReminderDispatcher:
+    """Start the background reminder thread, armed from the current store."""
+    global _DISPATCHER
+    _DISPATCHER = ReminderDispatcher(_on_reminder_fired)
+    with _DB_LOCK:
+        _DISPATCHER.rearm(_STORE.get())
+    _DISPATCHER.start()
+    return _DISPATCHER
+
+
+def run_maintenance_once() -> dict:
+    """Rollover + compaction against the store; saves only if something changed."""
+    with _DB_LOCK:
+        db = _STORE.get()
+        try:
+            result = scheduler.run_maintenance(
+                db, today=date.today(),
+                hazard_enabled=bool(db.get("settings", {}).get("hazard_escalation_enabled", False)),
+            )
+        except Exception:
+            _STORE.invalidate()
+            raise
+        if result["changed"]:
+            _save(db)
+            _after_write(db)
+            _EVENTS.publish("rollover", {"rev": db["_rev"], "advanced": bool(result["advanced"])})
+    if result["bytes_reclaimed"]:
+        logger.info("maintenance reclaimed %d bytes", result["bytes_reclaimed"])
+    return result
+
+
+def poll_inbox_once(watcher: InboxWatcher) -> dict:
+    """Import anything new in the inbox folder; rearm reminders if tasks arrived."""
+    result = watcher.poll()
+    if result["added"]:
+        logger.info("inbox imported %d task(s) (%d invalid, %d duplicate)",
+                    result["added"], result["failed"], result["duplicates"])
+        with _DB_LOCK:
+            _after_write(_STORE.get())
+    return result
+
+
+def _maintenance_loop(stop: threading.Event) -> None:
+    """Run maintenance at startup and after each midnight (like the desktop), and
+    poll the inbox folder every INBOX_POLL_SECONDS in between."""
+    watcher = InboxWatcher(lock=_DB_LOCK)  # idle while the desktop app owns the inbox
+    last_day = None
+    try:
+        while not stop.is_set():
+            if date.today() != last_day:
+                last_day = date.today()
+                try:
+                    run_maintenance_once()
+                except Exception:
+                    logger.exception("maintenance failed")
+            try:
+                poll_inbox_once(watcher)
+            except Exception:
+                logger.exception("inbox poll failed")
+            stop.wait(INBOX_POLL_SECONDS)
+    finally:
+        watcher.close()
+
+
+def _watch_store(stop: threading.Event) -> None:
+    """Announce writes made outside this server (the desktop app) to live
+    subscribers; polls the rev only while someone is listening."""
+    while not stop.wait(STORE_WATCH_SECONDS):
+        if not len(_EVENTS):
+            continue
+        try:
+            _EVENTS.publish_rev(_STORE.rev())
+        except Exception:
+            logger.exception("store watch failed")
+
+
+def start_store_watcher() -> threading.Event:
+    stop = threading.Event()
+    _EVENTS.publish_rev(_STORE.rev())  # baseline: only later revs are news
+    threading.Thread(target=_watch_store, args=(stop,), name="store-watch", daemon=True).start()
+    return stop
+
+
+def start_maintenance_thread() -> threading.Event:
+    stop = threading.Event()
+    threading.Thread(target=_maintenance_loop, args=(stop,), name="maintenance", daemon=True).start()
+    return stop
+
 
 def main():
     port = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
     host = "127.0.0.1"
-    server = ThreadingHTTPServer((host, port), Handler)
+    server = WebServer((host, port), Handler)
+    # Search reads task documents/journals from wherever the desktop keeps them.
+    with _DB_LOCK:
+        documents.set_document_backend(_STORE.get()["settings"]["document_backend"])
+    start_reminder_dispatcher()
+    maintenance_stop = start_maintenance_thread()
+    watch_stop = start_store_watcher()
+    _ASSETS.preload()
     print(f"Tiny Tasklist web server on http://{host}:{port}  (serving {WEB_DIR})")
     print("Press Ctrl+C to stop.")
     try:
         server.serve_forever()
     except KeyboardInterrupt:
         print("\nstopping…")
+        _EVENTS.close()  # ends open event streams
+        _WRITER.stop()
+        watch_stop.set()
         server.shutdown()
+        maintenance_stop.set()
+        if _DISPATCHER is not None:
+            _DISPATCHER.stop()
 
 
 if __name__ == "__main__":
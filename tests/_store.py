@@ -0,0 +1,28 @@
+"""Shared test fixture: a throwaway store for tests that touch core.model's files."""
+import shutil
+import tempfile
+from pathlib import Path
+
+from tasklistprogram.core import model
+
+
+class TempStoreMixin:
+    """Point core.model at a throwaway data dir for the duration of a test."""
+    PATHS = ("DATA_DIR", "DB_FILE", "DATA_FILE", "BACKUP_FILE", "BACKUP_DIR",
+             "LEGACY_DATA_FILE", "LEGACY_BACKUP_FILE")
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self._orig = {k: getattr(model, k) for k in self.PATHS}
+        model.DATA_DIR = self.tmp
+        model.DB_FILE = self.tmp / "tasks.db"
+        model.DATA_FILE = self.tmp / "tasks_gui.json"
+        model.BACKUP_FILE = self.tmp / "tasks_gui.json.bak"
+        model.BACKUP_DIR = self.tmp / "backups"
+        model.LEGACY_DATA_FILE = self.tmp / "nope.json"
+        model.LEGACY_BACKUP_FILE = self.tmp / "nope.bak"
+
+    def tearDown(self):
+        for k, v in self._orig.items():
+            setattr(model, k, v)
+        shutil.rmtree(self.tmp, ignore_errors=True)
@@ -136,5 +136,23 @@ class RecurrenceTests(unittest.TestCase):
         self.assertEqual(dates.add_months_dateonly(date(2026, 1, 31)), dates.month_add(date(2026, 1, 31)))
 
 
+class PinnedNowTests(unittest.TestCase):
+    NOW = datetime(2026, 3, 4, 10, 15)  # a Wednesday
+
+    def test_relative_tokens_use_pinned_now(self):
+        self.assertEqual(dates.parse_due_flexible("+2h", now=self.NOW), datetime(2026, 3, 4, 12, 15))
+        self.assertEqual(dates.parse_due_flexible("+1d", now=self.NOW), ("dateonly", datetime(2026, 3, 5)))
+
+    def test_words_and_weekdays_use_pinned_today(self):
+        self.assertEqual(dates.parse_due_flexible("tomorrow 0900", now=self.NOW), datetime(2026, 3, 5, 9, 0))
+        self.assertEqual(dates.parse_due_flexible("fri", now=self.NOW), ("dateonly", datetime(2026, 3, 6)))
+        self.assertEqual(dates.parse_due_flexible("sept 29", now=self.NOW), ("dateonly", datetime(2026, 9, 29)))
+
+    def test_invalid_calendar_values_return_none(self):
+        self.assertIsNone(dates.parse_due_flexible("2026-13-45"))
+        self.assertIsNone(dates.parse_due_flexible("2026-10-05 2599"))
+        self.assertIsNone(dates.parse_due_flexible("10/05 25"))
+
+
 if __name__ == "__main__":
     unittest.main()
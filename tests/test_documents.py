@@ -0,0 +1,293 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+from tasklistprogram.core import documents, model
+from tasklistprogram.core.documents import (
+    JOURNAL_DIVIDER, _split_sections, append_journal_manual, append_journal_task, append_journal_tasks,
+)
+
+from tests._store import TempStoreMixin
+
+T = datetime(2026, 10, 19, 9, 30)
+
+
+class JournalWriterTests(unittest.TestCase):
+    def setUp(self):
+        self._orig = documents.JOURNALS_DIR
+        documents.JOURNALS_DIR = Path(tempfile.mkdtemp())
+        documents._JOURNAL_INDEX.clear()
+
+    def tearDown(self):
+        documents.JOURNALS_DIR = self._orig
+        documents._JOURNAL_INDEX.clear()
+
+    def sections(self, path):
+        return _split_sections(path.read_text(encoding="utf-8"), JOURNAL_DIVIDER)
+
+    def test_sections_stay_in_place(self):
+        path = append_journal_tasks(["A", "B"], T)
+        append_journal_manual("felt good", T)
+        append_journal_task("C", T)
+        append_journal_manual("second note", T)
+        top, bottom = self.sections(path)
+        self.assertEqual(top, "- 09:30 felt good\n- 09:30 second note")
+        self.assertEqual(bottom.splitlines(), [
+            "## Completed Tasks", "- 09:30 Completed: A", "- 09:30 Completed: B", "- 09:30 Completed: C"])
+
+    def test_completions_append_without_reading_the_file(self):
+        path = append_journal_task("first", T)
+        with mock.patch.object(Path, "read_bytes", side_effect=AssertionError("re-read")), \
+                mock.patch.object(Path, "read_text", side_effect=AssertionError("re-read")):
+            append_journal_tasks(["x"] * 50, T)
+        self.assertEqual(self.sections(path)[1].count("Completed: x"), 50)
+
+    def test_appends_from_several_threads_all_land(self):
+        import threading
+        path = append_journal_task("first", T)
+
+        def write(n):
+            for i in range(20):
+                append_journal_manual(f"note {n}.{i}", T)
+                append_journal_task(f"task {n}.{i}", T)
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        top, bottom = self.sections(path)
+        self.assertEqual(len(top.splitlines()), 80)
+        self.assertEqual(bottom.count("Completed: task"), 80)
+
+    def test_crlf_journal_takes_the_append_path(self):
+        path = documents._ensure_journal(T.date())
+        self.assertNotIn(b"\r", path.read_bytes())  # written with LF on every OS
+        path.write_bytes(b"morning\r\n---\r\n## Completed Tasks\r\n- 08:00 Completed: early\r\n")
+        with mock.patch.object(documents, "_write_sections", side_effect=AssertionError("rewrite")):
+            append_journal_manual("later", T)
+            append_journal_tasks(["a", "b"], T)
+        self.assertEqual(path.read_bytes(), b"morning\r\n- 09:30 later\r\n---\r\n## Completed Tasks\r\n"
+                         b"- 08:00 Completed: early\r\n- 09:30 Completed: a\r\n- 09:30 Completed: b\r\n")
+
+    def test_external_edit_is_rescanned(self):
+        path = append_journal_task("first", T)
+        path.write_text("my notes\n\n---\n## Completed Tasks\n- 08:00 Completed: early\n", encoding="utf-8")
+        append_journal_manual("later", T)
+        append_journal_task("second", T)
+        top, bottom = self.sections(path)
+        self.assertEqual(top, "my notes\n- 09:30 later")
+        self.assertEqual(bottom.splitlines()[1:], ["- 08:00 Completed: early", "- 09:30 Completed: second"])
+
+    def test_hand_written_bottom_gets_header_first(self):
+        path = documents._ensure_journal(T.date())
+        path.write_text("top\n---\nstray text\n", encoding="utf-8")
+        append_journal_task("done", T)
+        self.assertEqual(self.sections(path)[1].splitlines(),
+                         ["## Completed Tasks", "stray text", "- 09:30 Completed: done"])
+
+
+class DocDirsMixin(TempStoreMixin):
+    """Temp store plus temp task_documents/ and journals/."""
+
+    def setUp(self):
+        super().setUp()
+        self._docs = (documents.JOURNALS_DIR, documents.TASKS_DIR)
+        documents.JOURNALS_DIR = self.tmp / "journals"
+        documents.TASKS_DIR = self.tmp / "task_documents"
+        documents._JOURNAL_INDEX.clear()
+        self.io = documents.DocumentIO()  # not started: flush() runs the queue inline
+
+    def tearDown(self):
+        documents.JOURNALS_DIR, documents.TASKS_DIR = self._docs
+        documents._JOURNAL_INDEX.clear()
+        super().tearDown()
+
+
+class DocumentIOTests(DocDirsMixin, unittest.TestCase):
+    def test_task_syncs_coalesce_into_one_move_and_write(self):
+        t = {"id": 7, "title": "Report", "group": "Work", "notes": "v1"}
+        self.io.sync_task(t)
+        self.io.flush()
+        first = Path(t["doc_path"])
+        t.update(group="School", notes="v2")
+        self.io.sync_task(t)
+        t.update(title="Final report", notes="v3")
+        self.io.sync_task(t)
+        self.assertEqual(self.io.stats["coalesced"], 1)
+        self.assertTrue(self.io.flush())
+        self.assertFalse(first.exists())
+        self.assertEqual(Path(t["doc_path"]), documents.task_doc_path(t))
+        self.assertTrue(Path(t["doc_path"]).read_text(encoding="utf-8").startswith("v3"))
+
+    def test_journal_entries_for_a_day_are_one_job(self):
+        with mock.patch.object(documents, "_append_completions",
+                               wraps=documents._append_completions) as spy:
+            self.io.append_journal_tasks(["a", "b"], T)
+            self.io.append_journal_manual("note", T)
+            self.io.append_journal_tasks(["c"], T)
+            self.io.flush()
+        spy.assert_called_once()
+        top, bottom = _split_sections(documents._journal_path(T.date()).read_text(encoding="utf-8"),
+                                      JOURNAL_DIVIDER)
+        self.assertEqual(top, "- 09:30 note")
+        self.assertEqual([l[-1] for l in bottom.splitlines()[1:]], ["a", "b", "c"])
+
+    def test_worker_thread_flushes_and_reports_failures(self):
+        self.io.start()
+        with mock.patch.object(documents, "sync_task_notes", side_effect=OSError("disk gone")):
+            self.io.sync_task({"id": 1, "title": "x", "group": "", "notes": ""})
+            self.assertTrue(self.io.flush(timeout=5))
+        errors = self.io.drain_errors()
+        self.assertEqual(len(errors), 1)
+        self.assertIn("task #1", errors[0])
+        self.io.append_journal_tasks(["late"], T)
+        self.io.close()
+        self.assertIn("late", documents._journal_path(T.date()).read_text(encoding="utf-8"))
+
+
+class GroupMoveTests(DocDirsMixin, unittest.TestCase):
+    def make(self, tid, title, group):
+        t = {"id": tid, "title": title, "group": group, "notes": title}
+        documents.sync_task_notes(t)
+        t.pop("doc_path")  # as loaded from the store: location comes from DOC_PATHS
+        return t
+
+    def test_whole_group_rename_is_one_directory_move(self):
+        tasks = [self.make(1, "A", "Work"), self.make(2, "B", "Work"), self.make(3, "C", "Home")]
+        changed = documents.rename_group(tasks, "Work", "Job")
+        self.assertEqual([t["id"] for t in changed], [1, 2])
+        with mock.patch.object(Path, "replace", side_effect=AssertionError("per-file move")):
+            stats = documents.move_documents(documents.plan_moves(changed))
+        self.assertEqual(stats, {"dirs": 1, "files": 0, "skipped": 0})
+        self.assertFalse((documents.TASKS_DIR / "Work").exists())
+        documents.DOC_PATHS.invalidate()  # re-read from the store
+        self.assertEqual(documents.DOC_PATHS.get(2), documents.TASKS_DIR / "Job" / "B-2.md")
+        self.assertEqual(documents.DOC_PATHS.get(3), documents.TASKS_DIR / "Home" / "C-3.md")
+
+    def test_partial_or_merging_moves_go_file_by_file(self):
+        tasks = [self.make(1, "A", "Work"), self.make(2, "B", "Work"), self.make(3, "C", "Home")]
+        tasks[0]["group"] = "Home"  # Work keeps B, Home already exists
+        self.io.move_tasks(tasks)
+        self.io.flush()
+        self.assertEqual(sorted(p.name for p in (documents.TASKS_DIR / "Home").iterdir()), ["A-1.md", "C-3.md"])
+        self.assertEqual(self.io.stats["failed"], 0)
+        # Re-running the same plan finds the targets already there.
+        stale = [(1, documents.TASKS_DIR / "Work" / "A-1.md", documents.TASKS_DIR / "Home" / "A-1.md")]
+        self.assertEqual(documents.move_documents(stale)["skipped"], 1)
+
+    def test_reconcile_rebuilds_map_and_files_strays(self):
+        t = self.make(5, "Report", "Work")
+        t["group"] = "School"  # regrouped elsewhere (e.g. the web app): file still in Work/
+        model.save_db({"version": 1, "next_id": 6, "tasks": [dict(t, doc_path="/legacy/path.md")]})
+        self.assertNotIn("doc_path", model.load_db()["tasks"][0])
+        with model.store_connection() as conn:
+            model.save_doc_paths({5: None, 99: "Gone/X-99.md"}, conn)
+        documents.DOC_PATHS.invalidate()
+        stats = documents.reconcile_documents([t])
+        self.assertEqual(stats, {"found": 1, "misplaced": 1, "moved": 1})
+        self.assertEqual(documents.DOC_PATHS.get(5), documents.TASKS_DIR / "School" / "Report-5.md")
+        self.assertIsNone(documents.DOC_PATHS.get(99))
+
+
+class SqliteBackendTests(DocDirsMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        documents.set_document_backend("sqlite")
+        self.addCleanup(documents.set_document_backend, "files")
+        self.task = {"id": 1, "title": "Report", "group": "Work", "notes": "shown"}
+        model.save_db({"version": 1, "next_id": 2, "tasks": [dict(self.task)]})
+
+    def journal_row(self):
+        with model.store_connection() as conn:
+            return documents._sql_journal(conn, T.date())
+
+    def test_journal_lives_in_the_store_and_commits_with_the_save(self):
+        append_journal_manual("felt good", T)
+        append_journal_tasks(["A"], T)
+        self.assertFalse(documents.JOURNALS_DIR.exists())
+        with documents.deferred():
+            self.io.append_journal_tasks(["B"], T)  # inline, staged
+            self.assertNotIn("B", self.journal_row()[1])
+            db = model.load_db()
+            db["tasks"][0]["completed_at"] = "2026-10-19T09:30:00"
+            with mock.patch.object(model, "SAVE_HOOKS", [documents._apply_staged, mock.Mock(side_effect=OSError)]):
+                with self.assertRaises(OSError):
+                    model.save_db(db)  # rolled back: neither the task nor the line
+            self.assertEqual(model.load_db()["tasks"][0].get("completed_at", ""), "")
+            self.assertNotIn("B", self.journal_row()[1])
+            self.io.append_journal_tasks(["C"], T)
+            model.save_db(db)
+            self.assertEqual(self.journal_row()[1].splitlines(),
+                             ["## Completed Tasks", "- 09:30 Completed: A", "- 09:30 Completed: C"])
+        self.assertEqual(self.journal_row()[0], "- 09:30 felt good")
+
+    def test_export_then_reimport_only_changed_content(self):
+        append_journal_manual("note", T)
+        stats = documents.export_documents([self.task])
+        self.assertEqual(stats, {"tasks": 1, "journals": 1, "kept": 0})
+        path = documents.task_doc_path(self.task)
+        self.assertEqual(_split_sections(path.read_text(encoding="utf-8"), documents.TASK_DIVIDER), ("shown", ""))
+        os.utime(path, ns=(0, 10**9))  # touched, same bytes: read once, nothing stored
+        with mock.patch.object(documents, "_split_sections", wraps=_split_sections) as spy:
+            self.assertEqual(documents.import_documents([self.task]), [])
+            self.assertEqual(documents.import_documents([self.task]), [])
+        self.assertEqual(spy.call_count, 1)
+        path.write_text(f"edited{documents.TASK_DIVIDER}secret\n", encoding="utf-8")
+        self.assertEqual(documents.export_documents([self.task])["kept"], 1)  # never clobbers edits
+        self.assertEqual(documents.import_documents([self.task]), [self.task])
+        self.assertEqual(self.task["notes"], "edited")
+        with model.store_connection() as conn:
+            self.assertEqual(documents._sql_private_notes(conn, 1), "secret")
+
+    def test_switching_backends_carries_documents_across(self):
+        documents.set_document_backend("files")
+        documents.sync_task_notes(self.task)
+        path = documents.task_doc_path(self.task)
+        path.write_text(f"shown{documents.TASK_DIVIDER}from files\n", encoding="utf-8")
+        append_journal_manual("old entry", T)
+        documents.set_document_backend("sqlite")
+        self.assertEqual(documents.import_documents([self.task], scan=True), [])
+        with model.store_connection() as conn:
+            self.assertEqual(documents._sql_private_notes(conn, 1), "from files")
+        self.assertEqual(self.journal_row()[0], "- 09:30 old entry")
+        append_journal_manual("new entry", T)
+        self.assertEqual(documents.export_documents([self.task]), {"tasks": 1, "journals": 1, "kept": 0})
+        self.assertIn("new entry", documents._journal_path(T.date()).read_text(encoding="utf-8"))
+
+
+class FileCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp())
+        self.cache = documents.FileCache(max_entries=2)
+
+    def test_hit_skips_read_and_parse_until_file_changes(self):
+        path = self.dir / "m.md"
+        path.write_text("# c\nOne\nTwo\n", encoding="utf-8")
+        parse = mock.Mock(side_effect=documents._parse_mantras)
+        self.assertEqual(self.cache.parsed(path, "mantras", parse), ["One", "Two"])
+        with mock.patch.object(Path, "read_text", side_effect=AssertionError("re-read")):
+            self.assertEqual(self.cache.parsed(path, "mantras", parse), ["One", "Two"])
+        self.assertEqual(parse.call_count, 1)
+        path.write_text("# c\nOne\nTwo\nThree\n", encoding="utf-8")  # size changes
+        self.assertEqual(self.cache.parsed(path, "mantras", parse)[-1], "Three")
+        self.assertEqual(self.cache.stats, {"hits": 1, "misses": 2})
+
+    def test_lru_eviction_and_write_through(self):
+        paths = [self.dir / f"{i}.md" for i in range(3)]
+        for p in paths:
+            p.write_text(p.name, encoding="utf-8")
+            self.cache.read_text(p)
+        self.assertNotIn(paths[0], self.cache._entries)
+        documents.FILE_CACHE.invalidate()
+        target = self.dir / "doc.md"
+        documents._write_sections(target, "top", "bottom", documents.TASK_DIVIDER)
+        with mock.patch.object(Path, "read_text", side_effect=AssertionError("re-read")):
+            self.assertEqual(documents._cached_sections(target, documents.TASK_DIVIDER), ("top", "bottom"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import threading
+import unittest
+
+from tasklistprogram.core.events import EventHub, format_event
+
+
+class EventHubTests(unittest.TestCase):
+    def test_fan_out_and_heartbeat_timeout(self):
+        hub = EventHub()
+        a, b = hub.subscribe(), hub.subscribe()
+        self.assertEqual(hub.next(a, 0), [])  # nothing yet: heartbeat time
+        hub.publish("tasks", {"rev": 3})
+        self.assertEqual(hub.next(a, 0), [(1, "tasks", {"rev": 3})])
+        self.assertEqual(hub.next(b, 0), [(1, "tasks", {"rev": 3})])
+        self.assertEqual(format_event((1, "tasks", {"rev": 3})), 'id: 1\nevent: tasks\ndata: {"rev": 3}\n\n')
+
+    def test_slow_subscriber_is_capped_then_told_to_resync(self):
+        hub = EventHub(queue_max=3)
+        slow = hub.subscribe()
+        for i in range(10):
+            hub.publish("tasks", {"rev": i})
+        self.assertEqual(len(slow.queue), 0)
+        self.assertEqual(hub.next(slow, 0), [(10, "resync", {})])
+        hub.publish("tasks", {"rev": 10})
+        self.assertEqual(hub.next(slow, 0), [(11, "tasks", {"rev": 10})])
+        self.assertEqual(hub.stats["overflows"], 1)
+
+    def test_resume_from_last_event_id(self):
+        hub = EventHub(history=3)
+        for i in range(5):
+            hub.publish("tasks", {"rev": i})
+        self.assertEqual([ev[0] for ev in hub.next(hub.subscribe(last_id=3), 0)], [4, 5])
+        self.assertEqual(hub.next(hub.subscribe(last_id=1), 0), [(5, "resync", {})])  # 2 was forgotten
+        self.assertEqual(hub.next(hub.subscribe(last_id=5), 0), [])
+
+    def test_rev_dedup_limits_and_close(self):
+        hub = EventHub(max_subscribers=1)
+        sub = hub.subscribe()
+        self.assertIsNone(hub.subscribe())
+        self.assertTrue(hub.publish_rev(7))
+        self.assertFalse(hub.publish_rev(7))
+        got = []
+        waiter = threading.Thread(target=lambda: got.append((hub.next(sub, 5), hub.next(sub, 5))))
+        waiter.start()
+        hub.close()
+        waiter.join(5)
+        self.assertEqual(got, [([(1, "tasks", {"rev": 7})], None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -98,5 +98,40 @@ class SearchAndSortTests(unittest.TestCase):
         )
 
 
+class ScopeIndexTests(unittest.TestCase):
+    def tasks(self):
+        out = []
+        for i, kw in enumerate([
+            {}, {"due": due_in(-2)}, {"due": due_in(0), "priority": "H"}, {"due": due_in(5), "repeat": "daily"},
+            {"due": due_in(20), "priority": "L", "group": "Home"}, {"completed_at": "2026-01-02T00:00:00"},
+            {"is_deleted": True, "due": due_in(-1)}, {"is_suspended": True}, {"due": due_in(-9), "repeat": "weekly"},
+        ], start=1):
+            out.append(task(id=i, **kw))
+        return out
+
+    def test_select_matches_passes_filter(self):
+        tasks = self.tasks()
+        idx = filters.ScopeIndex(tasks)
+        custom = date.today() + timedelta(days=7)
+        for cat in filters.CATEGORY_SCOPES:
+            for ts in filters.TIME_SCOPES:
+                expected = [t["id"] for t in tasks if filters.passes_filter(t, {"min_priority_visible": "M"}, cat, ts, custom)]
+                got = [t["id"] for t in idx.select(cat, ts, "M", custom_date=custom)]
+                self.assertEqual(got, expected, (cat, ts))
+        counts = idx.counts()
+        for cat in filters.CATEGORY_SCOPES:
+            self.assertEqual(counts[cat], sum(filters.passes_category_filter(t, cat) for t in tasks), cat)
+
+    def test_group_ids_and_sort(self):
+        idx = filters.ScopeIndex(self.tasks())
+        self.assertEqual([t["id"] for t in idx.select(group="Home")], [5])
+        self.assertEqual([t["id"] for t in idx.select(ids={1, 2, 6})], [1, 2])
+        self.assertEqual(idx.groups, {"": 5, "Home": 1})
+        agenda = [t["id"] for t in idx.sort(idx.select(), "agenda")]
+        self.assertEqual(agenda, [9, 2, 3, 4, 5, 1])
+        self.assertEqual([t["id"] for t in idx.sort(idx.select(), "title", reverse=True)],
+                         [1, 2, 3, 4, 5, 9])  # equal keys keep store order
+
+
 if __name__ == "__main__":
     unittest.main()
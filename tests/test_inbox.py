@@ -0,0 +1,91 @@
+import os
+import unittest
+from unittest import mock
+
+from tasklistprogram.core import inbox, model
+
+from tests._store import TempStoreMixin
+
+
+class InboxWatcherTests(TempStoreMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.now = 0.0  # clock far in the past: nothing has "settled"
+        self.watcher = inbox.InboxWatcher(clock=lambda: self.now)
+        self.addCleanup(self.watcher.close)
+        self.dir = inbox.inbox_dir()
+
+    def titles(self):
+        return [t["title"] for t in model.load_db()["tasks"]]
+
+    def append(self, name, text, mode="ab"):
+        with open(self.dir / name, mode) as f:
+            f.write(text.encode("utf-8"))
+
+    def test_missing_dir_is_created(self):
+        self.assertEqual(self.watcher.poll()["files"], 0)
+        self.assertTrue(self.dir.is_dir())
+
+    def test_reads_only_appended_complete_lines(self):
+        self.dir.mkdir(parents=True)
+        self.append("phone.txt", "﻿A | prio: H\nB\nC-partial")
+        self.assertEqual(self.watcher.poll()["added"], 2)
+        self.append("phone.txt", " done\nD\n")
+        result = self.watcher.poll()
+        self.assertEqual((result["added"], result["duplicates"]), (2, 0))
+        self.assertEqual(self.titles(), ["A", "B", "C-partial done", "D"])
+
+    def test_unchanged_files_are_not_opened(self):
+        self.dir.mkdir(parents=True)
+        self.append("a.txt", "A\n")
+        self.watcher.poll()
+        with mock.patch.object(inbox, "import_stream") as imp:
+            self.assertEqual(self.watcher.poll()["files"], 0)
+        imp.assert_not_called()
+
+    def test_settled_file_yields_unterminated_last_line(self):
+        self.dir.mkdir(parents=True)
+        self.append("drop.txt", "A\nB")
+        self.assertEqual(self.watcher.poll()["added"], 1)
+        self.now = os.stat(self.dir / "drop.txt").st_mtime + inbox.INBOX_SETTLE_SECONDS
+        self.assertEqual(self.watcher.poll()["added"], 1)
+        self.assertEqual(self.watcher.poll()["files"], 0)
+
+    def test_rewritten_or_truncated_file_restarts_and_duplicates_skip(self):
+        self.dir.mkdir(parents=True)
+        self.append("a.txt", "A\nB\n")
+        self.watcher.poll()
+        self.append("a.txt", "A\nC\nD\n", mode="wb")  # rewritten in place, longer
+        result = self.watcher.poll()
+        self.assertEqual((result["added"], result["duplicates"]), (2, 1))
+        self.append("a.txt", "E\n", mode="wb")  # truncated
+        self.assertEqual(self.watcher.poll()["added"], 1)
+        self.assertEqual(self.titles(), ["A", "B", "C", "D", "E"])
+
+    def test_offsets_survive_a_new_watcher(self):
+        self.dir.mkdir(parents=True)
+        self.append("a.txt", "A\n")
+        self.watcher.poll()
+        self.append("a.txt", "B\n")
+        self.watcher.close()
+        fresh = inbox.InboxWatcher(clock=lambda: self.now)
+        self.addCleanup(fresh.close)
+        result = fresh.poll()
+        self.assertEqual((result["added"], result["duplicates"]), (1, 0))
+
+    def test_one_watcher_owns_the_inbox(self):
+        self.dir.mkdir(parents=True)
+        self.append("a.txt", "A\n")
+        other = inbox.InboxWatcher(clock=lambda: self.now)  # the other front-end
+        self.addCleanup(other.close)
+        self.assertEqual(self.watcher.poll()["added"], 1)
+        self.append("a.txt", "B\n")
+        self.assertEqual(other.poll(), {"added": 0, "failed": 0, "duplicates": 0, "files": 0})
+        self.assertFalse(other.owns_inbox)
+        self.watcher.close()  # the owner exits: the other takes over where it stopped
+        self.assertEqual(other.poll()["added"], 1)
+        self.assertEqual(self.titles(), ["A", "B"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+import unittest
+
+from tasklistprogram.core import io_export, model
+from tasklistprogram.core.io_import import import_from_string
+
+from tests._store import TempStoreMixin
+
+
+def task(tid, title, **kw):
+    t = {"id": tid, "title": title, "notes": "", "priority": "M", "due": "", "repeat": "none",
+         "group": "", "completed_at": "", "times_completed": 0, "history": [],
+         "is_deleted": False, "is_suspended": False, "skip_count": 0}
+    t.update(kw)
+    return t
+
+
+IMPORT_FIELDS = ("title", "notes", "priority", "due", "repeat", "group")
+
+
+class PipeFormatTests(unittest.TestCase):
+    def test_round_trips_through_import(self):
+        tasks = [
+            task(1, "Exam", due="2026-10-13 14:00", priority="H", group="School", notes="bring: pen"),
+            task(2, "Meeting: standup", priority="X", repeat="weekly"),
+            task(3, "# not a comment", priority="D", repeat="daily"),
+            task(4, "Water plants", priority="L", repeat="custom:6", due="2026-10-20"),
+            task(5, "Plain"),
+        ]
+        text = "".join(io_export.export_lines(tasks, "pipe"))
+        db = {"version": 1, "tasks": [], "next_id": 1}
+        added, failed = import_from_string(text, db)
+        self.assertEqual((added, failed), (5, 0))
+        for orig, back in zip(tasks, db["tasks"]):
+            self.assertEqual({k: orig[k] for k in IMPORT_FIELDS}, {k: back[k] for k in IMPORT_FIELDS})
+
+    def test_ultra_exports_base_priority_and_delimiters_are_neutralized(self):
+        line = io_export.task_to_pipe(task(1, "A|B", priority="U", base_priority="L", notes="x\ny"))
+        self.assertEqual(line, "A/B | prio: L | notes: x y")
+        self.assertIn("prio: H", io_export.task_to_pipe(task(2, "C", priority="U")))
+
+
+class StoreExportTests(TempStoreMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        model.save_db({"version": 1, "next_id": 4, "tasks": [
+            task(1, "Open", priority="H", group="G", _display_title="ui only"),
+            task(2, "Done", completed_at="2026-10-01T09:00:00"),
+            task(3, "Low, quoted \"x\"", priority="L", notes="multi\nline"),
+        ]})
+
+    def test_jsonl_streams_persisted_tasks(self):
+        rows = [json.loads(line) for line in io_export.iter_export("jsonl")]
+        self.assertEqual([r["id"] for r in rows], [1, 2, 3])
+        self.assertNotIn("_display_title", rows[0])
+
+    def test_csv_has_header_and_survives_quoting(self):
+        text = "".join(io_export.iter_export("csv"))
+        rows = list(csv.DictReader(io.StringIO(text)))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2]["title"], 'Low, quoted "x"')
+        self.assertEqual(rows[2]["notes"], "multi\nline")
+
+    def test_filters_reuse_core_predicates(self):
+        ids = lambda **f: [json.loads(line)["id"] for line in io_export.iter_export("jsonl", **f)]
+        self.assertEqual(ids(category="active"), [1, 3])
+        self.assertEqual(ids(category="done"), [2])
+        self.assertEqual(ids(min_priority="H"), [1])
+        self.assertEqual(ids(query="quoted"), [3])
+
+    def test_export_to_file_counts_tasks(self):
+        path = self.tmp / "out.csv"
+        self.assertEqual(io_export.export_to_file(path, "csv"), 3)
+        self.assertEqual(io_export.export_to_file(self.tmp / "out.txt", "pipe", category="done"), 1)
+
+    def test_unknown_format_rejected(self):
+        with self.assertRaises(ValueError):
+            io_export.iter_export("xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,10 @@
 import unittest
+from datetime import datetime
 
-from tasklistprogram.core.io_import import import_from_string
+from tasklistprogram.core import io_import, model
+from tasklistprogram.core.io_import import import_from_string, import_stream
+
+from tests._store import TempStoreMixin
 
 
 def fresh_db():
@@ -77,5 +81,122 @@ class ImportTests(unittest.TestCase):
         self.assertEqual(db["tasks"][0]["title"], "Bullet task")
 
 
+class StreamImportTests(TempStoreMixin, unittest.TestCase):
+    def test_streams_in_batches_and_keeps_existing_rows(self):
+        model.save_db({"version": 1, "next_id": 2, "tasks": [{"id": 1, "title": "keep", "notes": "n"}]})
+        rev0 = model.current_rev()
+        progress = []
+        lines = (f"Task {i} | prio: H" for i in range(2500))  # lazy: never a list
+        added, failed, details = import_stream(lines, batch_size=1000,
+                                               on_progress=lambda *a: progress.append(a))
+        self.assertEqual((added, failed, details), (2500, 0, []))
+        self.assertEqual([p[0] for p in progress], [1000, 2000, 2500])
+        self.assertEqual(model.current_rev(), rev0 + 3)  # one transaction per batch
+        db = model.load_db()
+        self.assertEqual(db["tasks"][0], {"id": 1, "title": "keep", "notes": "n"})
+        self.assertEqual([t["id"] for t in db["tasks"][1:4]], [2, 3, 4])
+        self.assertEqual(db["next_id"], 2502)
+
+    def test_errors_reported_incrementally_with_line_numbers(self):
+        seen = []
+        added, failed, details = import_stream(["ok", "| due: x", "bad | due: notadate"],
+                                               on_error=seen.append)
+        self.assertEqual((added, failed), (1, 2))
+        self.assertEqual(details, seen)
+        self.assertTrue(seen[1].startswith("Line 3:"))
+
+    def test_matches_in_memory_parser(self):
+        text = "A | due: 2026-10-13 14:00 | prio: Misc | group: G\n# c\nB | repeat: custom:3"
+        db = {"version": 1, "tasks": [], "next_id": 1}
+        import_from_string(text, db)
+        import_stream(text.splitlines())
+        stored = model.load_db()["tasks"]
+        for mem, st in zip(db["tasks"], stored):
+            mem.pop("created_at"), st.pop("created_at")
+            self.assertEqual(mem, st)
+
+
+class DuplicateImportTests(TempStoreMixin, unittest.TestCase):
+    EXISTING = {"id": 1, "title": "Pay rent", "notes": "", "priority": "M", "due": "",
+                "repeat": "monthly", "group": "Life Admin"}
+    LINES = ["pay  RENT | repeat: monthly | group: life admin | notes: by card | prio: H",
+             "Pay rent | repeat: weekly | group: Life Admin",   # different repeat: new
+             "Fresh", "fresh"]                                  # second is an in-file dup
+
+    def test_in_memory_modes(self):
+        for mode, added, titles, fresh_id in (("skip", 2, 3, 3), ("merge", 2, 3, 3),
+                                              ("flag", 4, 5, 4), ("allow", 4, 5, 4)):
+            db = {"version": 1, "tasks": [dict(self.EXISTING)], "next_id": 2}
+            seen = []
+            got = import_from_string("\n".join(self.LINES), db, duplicates=mode,
+                                     on_duplicate=lambda line, tid: seen.append((line, tid)))
+            self.assertEqual(got, (added, 0), mode)
+            self.assertEqual(len(db["tasks"]), titles, mode)
+            self.assertEqual(seen, [] if mode == "allow" else [(1, 1), (4, fresh_id)], mode)
+            if mode == "merge":
+                self.assertEqual((db["tasks"][0]["notes"], db["tasks"][0]["priority"]), ("by card", "H"))
+            if mode == "flag":
+                self.assertTrue(db["tasks"][1]["possible_duplicate"])
+
+    def test_default_still_imports_everything(self):
+        db = {"version": 1, "tasks": [dict(self.EXISTING)], "next_id": 2}
+        self.assertEqual(import_from_string("\n".join(self.LINES), db), (4, 0))
+        self.assertNotIn("possible_duplicate", db["tasks"][1])
+
+    def test_stored_db_uses_the_hash_index(self):
+        model.save_db({"version": 1, "next_id": 2, "tasks": [dict(self.EXISTING)]})
+        db = model.load_db()
+        hashed = []
+        real = model.content_hash
+        model.content_hash = lambda t: hashed.append(t.get("title")) or real(t)
+        try:
+            got = import_from_string("\n".join(self.LINES), db, duplicates="merge")
+        finally:
+            model.content_hash = real
+        self.assertEqual(got, (2, 0))
+        self.assertEqual(hashed, ["pay  RENT", "Pay rent", "Fresh", "fresh"])  # the lines only
+        self.assertEqual((db["tasks"][0]["notes"], db["tasks"][0]["priority"]), ("by card", "H"))
+
+    def test_stream_modes_use_store_index(self):
+        model.save_db({"version": 1, "next_id": 2, "tasks": [dict(self.EXISTING)]})
+        seen = []
+        added, failed, _ = import_stream(self.LINES, batch_size=2, duplicates="skip",
+                                         on_duplicate=lambda line, tid: seen.append((line, tid)))
+        self.assertEqual((added, failed), (2, 0))
+        self.assertEqual(seen, [(1, 1), (4, 3)])  # "Fresh" was already committed (batch of 2)
+        # Re-importing the same list is now a no-op.
+        self.assertEqual(import_stream(self.LINES, duplicates="skip")[0], 0)
+        added, _, _ = import_stream(self.LINES, duplicates="merge")
+        self.assertEqual(added, 0)
+        self.assertEqual(model.load_db()["tasks"][0]["notes"], "by card")
+        with self.assertRaises(ValueError):
+            import_stream(self.LINES, duplicates="maybe")
+
+
+class ParallelImportTests(unittest.TestCase):
+    LINES = [
+        "A | due: 2026-10-13 14:00 | prio: Misc | group: G", "# comment", "",
+        "| due: 2026-10-13", "B | repeat: custom:3", "C | due: notadate",
+        "- D | prio: D", "E | repeat: fortnightly", "F | due: +2d",
+    ] * 5
+
+    def test_chunked_pool_matches_serial_in_order(self):
+        now = datetime(2026, 10, 19, 9, 0)
+        serial = list(io_import._iter_parsed(self.LINES, now))
+        pooled = list(io_import._iter_parsed(iter(self.LINES), now, workers=2, chunk_size=7))
+        self.assertEqual(pooled, serial)
+
+    def test_parse_lines_output_identical(self):
+        now = datetime(2026, 10, 19, 9, 0)
+        a = {"version": 1, "tasks": [], "next_id": 5}
+        b = {"version": 1, "tasks": [], "next_id": 5}
+        ra = io_import._parse_lines(self.LINES, a, return_details=True, now=now)
+        rb = io_import._parse_lines(self.LINES, b, return_details=True, workers=2, now=now)
+        self.assertEqual(ra, rb)
+        self.assertTrue(rb[2][0].startswith("Line 4:"))
+        self.assertEqual(a, b)
+        self.assertEqual([t["id"] for t in b["tasks"]][:3], [5, 6, 7])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,4 +1,6 @@
+import json
 import unittest
+from unittest import mock
 from datetime import datetime, date, timedelta
 
 from tasklistprogram.core import model
@@ -75,6 +77,27 @@ class StoreTests(unittest.TestCase):
         self.assertEqual(got["tasks"][1]["notes"], "n")
         self.assertTrue(model.DB_FILE.exists())
 
+    def test_transient_keys_not_persisted(self):
+        model.save_db({"version": 1, "next_id": 2,
+                       "tasks": [{"id": 1, "title": "a", "_display_title": "⚠ a"}]})
+        self.assertNotIn("_display_title", model.load_db()["tasks"][0])
+
+    def test_hash_index_tracks_writes(self):
+        a = {"id": 1, "title": "Pay  Rent", "group": "Life", "due": "2026-10-20", "repeat": "none"}
+        b = {"id": 2, "title": "gone", "is_deleted": True}
+        model.save_db({"version": 1, "next_id": 3, "tasks": [a, b]})
+        with model.store_connection() as conn:
+            # case/whitespace-insensitive title, "" repeat == "none"
+            h = model.content_hash({"title": "pay rent", "group": "life", "due": "2026-10-20"})
+            self.assertEqual(model.find_duplicate(conn, h), 1)
+            self.assertIsNone(model.find_duplicate(conn, model.content_hash(b)))  # deleted
+            model.append_tasks([{"title": "new"}], conn)
+            self.assertEqual(model.find_duplicate(conn, model.content_hash({"title": "New"})), 3)
+            conn.execute("DELETE FROM task_hashes")  # e.g. a store from before the index
+            conn.commit()
+        with model.store_connection() as conn:
+            self.assertEqual(model.find_duplicate(conn, h), 1)
+
     def test_rev_increments_on_save(self):
         model.save_db({"version": 1, "next_id": 1, "tasks": []})
         r1 = model.current_rev()
@@ -103,6 +126,140 @@ class StoreTests(unittest.TestCase):
         db = model.load_db()
         self.assertEqual(len(db["tasks"]), 1)
 
+    def test_change_feed_tracks_only_what_each_write_touched(self):
+        from unittest import mock
+        model.save_db({"version": 1, "next_id": 4, "tasks": [
+            {"id": 1, "title": "a"}, {"id": 2, "title": "b"}, {"id": 3, "title": "c"}]})
+        db = model.load_db()
+        rev = db["_rev"]
+        self.assertEqual(model.changes_since(rev), {"rev": rev, "upserted": [], "deleted": []})
+        db["tasks"][0]["title"] = "a2"
+        del db["tasks"][2]
+        model.save_db(db)
+        model.append_tasks([{"title": "d"}])
+        model.merge_task_fields([(2, {"notes": "n"})])
+        delta = model.changes_since(rev)
+        self.assertEqual([(t["id"], t["title"]) for t in delta["upserted"]], [(1, "a2"), (2, "b"), (4, "d")])
+        self.assertEqual((delta["deleted"], delta["rev"]), ([3], rev + 3))
+        self.assertIsNone(model.changes_since(rev + 10))  # ahead of the store
+        self.assertEqual(len(model.changes_since(0)["upserted"]), 3)  # the feed began with the store
+        with mock.patch.object(model, "CHANGE_TOMBSTONE_REVS", 1):
+            model.save_db(model.load_db())
+        self.assertIsNone(model.changes_since(rev))  # tombstone pruned: too far behind
+        self.assertEqual(model.changes_since(rev + 3)["upserted"], [])
+
+    def test_concurrent_saves_get_distinct_revs(self):
+        import threading
+        model.save_db({"version": 1, "next_id": 3, "tasks": [{"id": 1, "title": "a"}, {"id": 2, "title": "b"}]})
+        desktop, web = model.load_db(), model.load_db()
+        desktop["tasks"][0]["title"] = "a-desktop"
+        web["tasks"][1]["title"] = "b-web"
+        other = threading.Thread(target=model.save_db, args=(web,))
+
+        def interleave(conn):  # the web server saves while the desktop's transaction is open
+            other.start()
+            other.join(0.3)
+
+        with mock.patch.object(model, "SAVE_HOOKS", [interleave]):
+            model.save_db(desktop)
+        other.join(5)
+        self.assertEqual(web["_rev"], desktop["_rev"] + 1)
+        self.assertIn(2, [t["id"] for t in model.changes_since(desktop["_rev"])["upserted"]])
+
+    def test_rebased_save_keeps_what_another_process_wrote(self):
+        model.save_db({"version": 1, "next_id": 4, "tasks": [
+            {"id": 1, "title": "a"}, {"id": 2, "title": "b"}, {"id": 3, "title": "c"}]})
+        desktop, web = model.load_db(), model.load_db()
+        web["tasks"][0]["title"] = "a-web"
+        del web["tasks"][2]
+        web["tasks"].append({"id": 4, "title": "imported"})
+        web["next_id"] = 5
+        model.save_db(web)
+        desktop["tasks"][1]["title"] = "b-desktop"
+        desktop["tasks"].append({"id": 4, "title": "added on the desktop"})
+        desktop["next_id"] = 5
+        folded = model.save_db(desktop, rebase=True)
+        self.assertEqual([t["title"] for t in folded["moved"]], ["added on the desktop"])
+        expected = [(1, "a-web"), (2, "b-desktop"), (4, "imported"), (5, "added on the desktop")]
+        self.assertEqual([(t["id"], t["title"]) for t in model.load_db()["tasks"]], expected)
+        self.assertEqual([(t["id"], t["title"]) for t in desktop["tasks"]], expected)
+        self.assertEqual((desktop["next_id"], model.load_db()["next_id"]), (6, 6))
+
+    def test_rebased_save_merges_a_task_both_sides_changed(self):
+        model.save_db({"version": 1, "next_id": 4, "tasks": [
+            {"id": 1, "title": "a", "completed_at": ""}, {"id": 2, "title": "b"}, {"id": 3, "title": "c"}]})
+        desktop, web = model.load_db(keep_base=True), model.load_db()
+        web["tasks"][0]["title"] = "a-web"
+        web["tasks"][1]["title"] = "b-web"
+        web["tasks"] = web["tasks"][:2]  # c removed on the web...
+        model.save_db(web)
+        desktop["tasks"][0]["completed_at"] = "2026-10-19T09:00:00"  # done on the desktop
+        desktop["tasks"][1]["title"] = "b-desktop"
+        desktop["tasks"][2]["notes"] = "...while edited here"
+        folded = model.save_db(desktop, rebase=True)
+        self.assertEqual([(t["id"], f) for t, f in folded["conflicts"]],
+                         [(2, ["title"]), (3, ["deleted elsewhere"])])
+        self.assertEqual(model.load_db()["tasks"], [
+            {"id": 1, "title": "a-web", "completed_at": "2026-10-19T09:00:00"},
+            {"id": 2, "title": "b-desktop"}, {"id": 3, "title": "c", "notes": "...while edited here"}])
+        web = model.load_db()  # the base follows the save: a second rebase sees only new edits
+        web["tasks"][2]["notes"] = "edited on the web"
+        model.save_db(web)
+        desktop["tasks"][0]["title"] = "a-desktop"
+        self.assertEqual(model.save_db(desktop, rebase=True)["conflicts"], [])
+        self.assertEqual([t.get("notes") for t in model.load_db()["tasks"]], [None, None, "edited on the web"])
+
+    def test_rebased_save_without_change_history_takes_the_stored_rows(self):
+        model.save_db({"version": 1, "next_id": 3, "tasks": [{"id": 1, "title": "a"}, {"id": 2, "title": "b"}]})
+        desktop, web = model.load_db(), model.load_db()
+        web["tasks"] = [{"id": 1, "title": "a-web"}]
+        model.save_db(web)
+        conn = model._connect()
+        with conn:
+            model._meta_set(conn, "changes_floor", web["_rev"])  # the feed no longer reaches back
+        conn.close()
+        desktop["tasks"].append({"id": 3, "title": "new"})
+        desktop["next_id"] = 4
+        model.save_db(desktop, rebase=True)
+        self.assertEqual([(t["id"], t["title"]) for t in model.load_db()["tasks"]], [(1, "a-web"), (3, "new")])
+
+    def test_unchanged_rows_are_not_rewritten(self):
+        model.save_db({"version": 1, "next_id": 3, "tasks": [{"id": 1, "title": "a"}, {"id": 2, "title": "b"}]})
+        db = model.load_db()
+        db["tasks"][1]["title"] = "b2"
+        conn = model._connect()
+        try:
+            model._write_all(conn, db)
+            self.assertEqual(conn.total_changes, 7)  # 1 task + 1 hash + 1 feed row + 4 meta keys
+        finally:
+            conn.close()
+
+
+    def test_touched_save_compares_only_those_tasks(self):
+        model.save_db({"version": 1, "next_id": 4, "tasks": [
+            {"id": 1, "title": "a"}, {"id": 2, "title": "b"}, {"id": 3, "title": "c"}]})
+        db = model.load_db()
+        db["tasks"][0]["title"] = "not reported"
+        db["tasks"][1]["title"] = "b2"
+        del db["tasks"][2]
+        with mock.patch.object(model, "persistable_task", wraps=model.persistable_task) as serialized:
+            model.save_db(db, touched={2, 3})
+        self.assertEqual([c.args[0]["id"] for c in serialized.call_args_list], [2])
+        self.assertEqual([(t["id"], t["title"]) for t in model.load_db()["tasks"]], [(1, "a"), (2, "b2")])
+        self.assertEqual(model.changes_since(db["_rev"] - 1),
+                         {"rev": db["_rev"], "upserted": [{"id": 2, "title": "b2"}], "deleted": [3]})
+
+    def test_backup_is_refreshed_at_most_once_per_interval(self):
+        db = {"version": 1, "next_id": 2, "tasks": [{"id": 1, "title": "a"}]}
+        model.save_db(db)
+        db["tasks"][0]["title"] = "b"
+        model.save_db(db)  # writes the first .bak (the store held "a")
+        db["tasks"][0]["title"] = "c"
+        model.save_db(db)  # within the interval: .bak still holds "a"
+        self.assertEqual(json.loads(model.BACKUP_FILE.read_text("utf-8"))["tasks"][0]["title"], "a")
+        with mock.patch.object(model, "BACKUP_INTERVAL_SECONDS", 0):
+            model.save_db(db)
+        self.assertEqual(json.loads(model.BACKUP_FILE.read_text("utf-8"))["tasks"][0]["title"], "c")
 
 class BackupTests(unittest.TestCase):
     def test_save_creates_daily_backup_and_prunes(self):
@@ -69,10 +69,81 @@ class PendingRemindersTests(unittest.TestCase):
         t = make_task(priority="H", completed_at="2026-01-01T00:00:00")
         self.assertEqual(reminders.pending_reminders({"tasks": [t], "settings": ENABLED}), [])
 
+    def test_suspended_tasks_are_left_out_like_the_scheduler(self):
+        t = make_task(priority="H", is_suspended=True)
+        self.assertEqual(reminders.pending_reminders({"tasks": [t], "settings": ENABLED}), [])
+        self.assertEqual(reminders.reminder_chip(t, ENABLED), "")
+
+    def test_row_is_the_latest_elapsed_checkpoint(self):
+        t = make_task(priority="H")
+        now = datetime.now()
+        elapsed = [cp for cp in reminders.task_checkpoints(t, ENABLED, now) if cp <= now]
+        rows = reminders.pending_reminders({"tasks": [t], "settings": ENABLED}, now)
+        self.assertEqual(rows[0]["_cp_key"], elapsed[-1].isoformat(timespec="minutes"))
+
     def test_pending_empty_when_disabled(self):
         settings = dict(ENABLED, reminders_enabled=False)
         self.assertEqual(reminders.pending_reminders({"tasks": [make_task()], "settings": settings}), [])
 
 
+class ReminderScheduleTests(unittest.TestCase):
+    def test_next_checkpoint_is_future_and_unacknowledged(self):
+        now = datetime.now()
+        t = make_task(priority="H", created_days_ago=10, due_days_ahead=10)
+        when, key = reminders.next_checkpoint(t, ENABLED, now)
+        self.assertGreater(when, now)
+        t["acknowledged_checkpoints"] = [key]
+        self.assertGreater(reminders.next_checkpoint(t, ENABLED, now)[0], when)
+
+    def test_next_checkpoint_none_for_ineligible(self):
+        self.assertIsNone(reminders.next_checkpoint(make_task(priority="L"), ENABLED))
+        self.assertIsNone(reminders.next_checkpoint(make_task(due=""), ENABLED))
+
+    def test_pop_due_fires_in_order_and_rearms(self):
+        now = datetime.now()
+        a = make_task(priority="H", created_days_ago=10, due_days_ahead=10)
+        b = dict(make_task(priority="H", created_days_ago=1, due_days_ahead=3), id=2)
+        sched = reminders.ReminderSchedule()
+        sched.rebuild({"tasks": [a, b], "settings": ENABLED}, now)
+        self.assertEqual(len(sched), 2)
+        first = sched.next_instant()
+        self.assertEqual(sched.pop_due(now), [])  # nothing due yet
+        fired = sched.pop_due(first)
+        self.assertEqual(len(fired), 1)
+        self.assertEqual(sched.stats["fired"], 1)
+        self.assertEqual(sched.stats["wakeups"], 2)
+        self.assertGreater(sched.next_instant(), first)  # the task re-armed its next checkpoint
+
+    def test_update_task_replaces_stale_entry(self):
+        now = datetime.now()
+        t = make_task(priority="H")
+        sched = reminders.ReminderSchedule()
+        sched.rebuild({"tasks": [t], "settings": ENABLED}, now)
+        t["is_deleted"] = True
+        sched.update_task(t, now)
+        self.assertIsNone(sched.next_instant())
+
+    def test_dispatcher_fires_once_clock_reaches_checkpoint(self):
+        import threading
+        t = make_task(priority="H")
+        clock = {"now": datetime.now()}
+        done = threading.Event()
+        fired = []
+        disp = reminders.ReminderDispatcher(lambda ev: (fired.append(ev), done.set()),
+                                            clock=lambda: clock["now"])
+        disp.rearm({"tasks": [t], "settings": ENABLED})
+        disp.start()
+        try:
+            self.assertFalse(done.wait(0.05))  # sleeping: checkpoint is in the future
+            clock["now"] = disp.schedule.next_instant() + timedelta(seconds=1)
+            disp.wake()
+            self.assertTrue(done.wait(2))
+        finally:
+            disp.stop()
+        self.assertEqual(fired[0]["id"], 1)
+        self.assertEqual(disp.stats["fired"], 1)
+        self.assertAlmostEqual(disp.stats["last_latency_ms"], 1000.0, delta=1.0)
+
+
 if __name__ == "__main__":
     unittest.main()
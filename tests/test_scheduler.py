@@ -84,5 +84,44 @@ class HazardEscalationTests(unittest.TestCase):
         self.assertEqual(t["priority"], "U")
 
 
+class CompactionTests(unittest.TestCase):
+    SETTINGS = {"reminders_enabled": True, "reminder_count": 4, "reminder_min_priority": "M"}
+
+    def _task(self, **kw):
+        from datetime import datetime
+        now = datetime.now()
+        base = task(repeat="none", priority="H",
+                    created_at=(now - timedelta(days=10)).isoformat(timespec="seconds"),
+                    due=(now + timedelta(days=10)).strftime("%Y-%m-%d %H:%M"))
+        base.update(kw)
+        return base
+
+    def test_drops_unreachable_keys_and_reports_bytes(self):
+        from tasklistprogram.core.reminders import reachable_checkpoint_keys
+        t = self._task()
+        live = sorted(reachable_checkpoint_keys(t, self.SETTINGS))[:1]
+        t["acknowledged_checkpoints"] = ["2020-01-01T00:00", "2020-01-02T00:00"] + live
+        reclaimed = scheduler.compact_task_data({"tasks": [t], "settings": self.SETTINGS})
+        self.assertGreater(reclaimed, 0)
+        self.assertEqual(t["acknowledged_checkpoints"], live)
+
+    def test_past_due_drops_all_acks(self):
+        t = self._task(due=(date.today() - timedelta(days=1)).strftime("%Y-%m-%d"),
+                       acknowledged_checkpoints=["2020-01-01T00:00"])
+        scheduler.compact_task_data({"tasks": [t], "settings": self.SETTINGS})
+        self.assertNotIn("acknowledged_checkpoints", t)
+
+    def test_nothing_to_do_reclaims_zero(self):
+        self.assertEqual(scheduler.compact_task_data({"tasks": [self._task()]}), 0)
+
+    def test_run_maintenance_reports_changes(self):
+        old = (date.today() - timedelta(days=2)).strftime("%Y-%m-%d")
+        db = {"tasks": [task(due=old, acknowledged_checkpoints=["2020-01-01T00:00"])]}
+        result = scheduler.run_maintenance(db, today=date.today())
+        self.assertTrue(result["advanced"])
+        self.assertTrue(result["changed"])
+        self.assertGreater(result["bytes_reclaimed"], 0)
+
+
 if __name__ == "__main__":
     unittest.main()
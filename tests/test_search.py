@@ -0,0 +1,106 @@
+import os
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from tasklistprogram.core import documents, model, search
+
+from tests._store import TempStoreMixin
+
+
+class FtsQueryTests(unittest.TestCase):
+    def test_words_become_prefix_terms_and_syntax_is_inert(self):
+        self.assertEqual(search.fts_query("dent appoint"), '"dent"* "appoint"*')
+        self.assertEqual(search.fts_query('"tax return" AND -x*'), '"tax return" "AND"* "x"*')
+        self.assertEqual(search.fts_query(' ( ) " '), "")
+
+
+class SearchIndexTests(TempStoreMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self._docs = (documents.TASKS_DIR, documents.JOURNALS_DIR)
+        documents.TASKS_DIR = self.tmp / "task_documents"
+        documents.JOURNALS_DIR = self.tmp / "journals"
+        documents._JOURNAL_INDEX.clear()
+        search._dirty.clear()
+        model.save_db({"version": 1, "next_id": 4, "tasks": [
+            {"id": 1, "title": "Dentist appointment", "notes": "bring insurance card", "group": "Health"},
+            {"id": 2, "title": "Renew insurance", "notes": "", "group": ""},
+            {"id": 3, "title": "Old insurance task", "notes": "", "group": "", "is_deleted": True},
+        ]})
+
+    def tearDown(self):
+        documents.TASKS_DIR, documents.JOURNALS_DIR = self._docs
+        documents._JOURNAL_INDEX.clear()
+        super().tearDown()
+
+    def hits(self, query, **kw):
+        kw.setdefault("rescan", False)
+        return [(h["kind"], h["ref"]) for h in search.search(query, **kw)]
+
+    def test_tasks_ranked_title_first_and_deleted_left_out(self):
+        self.assertEqual(self.hits("insur"), [("task", 2), ("task", 1)])
+        hit = search.search("card", rescan=False)[0]
+        self.assertEqual(hit["snippet"].splitlines()[0], "bring insurance [card]")
+
+    def test_task_changes_are_reindexed_by_rev(self):
+        self.hits("x")
+        db = model.load_db()
+        db["tasks"][1]["title"] = "Renew passport"
+        db["tasks"].pop(0)
+        model.save_db(db)
+        self.assertEqual(search.refresh(rescan=False), 2)  # one changed, one removed
+        self.assertEqual(self.hits("insurance"), [])
+        self.assertEqual(self.hits("passport"), [("task", 2)])
+        self.assertEqual(search.refresh(rescan=False), 0)
+
+    def test_task_sync_reads_only_the_change_feed(self):
+        self.hits("x")
+        db = model.load_db()
+        db["tasks"][1]["title"] = "Renew passport"
+        model.save_db(db, touched={2})
+        with mock.patch.object(search, "_task_stamp", wraps=search._task_stamp) as stamp:
+            self.assertEqual(search.refresh(rescan=False), 1)
+        self.assertEqual([c.args[0]["id"] for c in stamp.call_args_list], [2])
+        self.assertEqual(self.hits("passport"), [("task", 2)])
+
+    def test_private_notes_and_journals_are_fed_by_writes(self):
+        path = documents.sync_task_notes({"id": 1, "title": "Dentist appointment", "group": "Health",
+                                          "notes": "bring insurance card"})
+        path.write_text(path.read_text(encoding="utf-8") + "ask about the molar\n", encoding="utf-8")
+        documents.sync_task_notes({"id": 1, "title": "Dentist appointment", "group": "Health", "notes": "v2"})
+        documents.append_journal_tasks(["Dentist appointment"], datetime(2026, 10, 19, 9, 30))
+        documents.append_journal_manual("felt calm afterwards", datetime(2026, 10, 19, 10, 0))
+        self.assertEqual(self.hits("molar"), [("doc", 1)])
+        self.assertEqual(self.hits("calm"), [("journal", "2026-10-19")])
+        self.assertEqual(set(self.hits("dentist")), {("task", 1), ("doc", 1), ("journal", "2026-10-19")})
+        self.assertEqual(self.hits("dentist", kinds=["journal"]), [("journal", "2026-10-19")])
+
+    def test_rescan_picks_up_external_edits_and_removals(self):
+        journal = documents.ensure_journal_path(datetime(2026, 1, 2).date())
+        search.refresh(rescan=True)
+        journal.write_text("went sailing\n---\n", encoding="utf-8")
+        os.utime(journal, ns=(0, 10**9))  # distinct mtime even on coarse clocks
+        with mock.patch.object(search, "_index_file", wraps=search._index_file) as spy:
+            self.assertEqual(self.hits("sailing"), [])  # throttled walk: not seen yet
+            self.assertEqual(self.hits("sailing", rescan=True), [("journal", "2026-01-02")])
+        self.assertEqual(spy.call_count, 1)  # unchanged files aren't re-read
+        journal.unlink()
+        self.assertEqual(self.hits("sailing", rescan=True), [])
+
+    def test_sqlite_backend_indexes_stored_documents_not_files(self):
+        documents.append_journal_manual("went sailing", datetime(2026, 1, 2, 8, 0))
+        self.assertEqual(self.hits("sailing", rescan=True), [("journal", "2026-01-02")])
+        documents.set_document_backend("sqlite")
+        self.addCleanup(documents.set_document_backend, "files")
+        self.assertEqual(self.hits("sailing"), [])  # file entries dropped
+        documents.append_journal_manual("went rowing", datetime(2026, 1, 3, 8, 0))
+        with model.store_connection() as conn, conn:
+            conn.execute("INSERT INTO doc_task_notes(id, private, version) VALUES(1, 'ask about the molar', 1)")
+        documents.export_documents(days=None)
+        self.assertEqual(self.hits("rowing", rescan=True), [("journal", "2026-01-03")])
+        self.assertEqual(search.search("molar", rescan=False)[0]["title"], "Dentist appointment")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import random
+import unittest
+
+from tasklistprogram.core.filters import search_match
+from tasklistprogram.core.textindex import NgramIndex
+
+WORDS = ["Dentist", "appointment", "tax", "return", "Buy", "milk", "call", "the", "vet",
+         "Ölwechsel", "garden", "e-mail", "report", "exam", "prep", "Q3", "x"]
+
+
+def make_tasks(n, seed=7):
+    rnd = random.Random(seed)
+    return [{"id": i, "title": " ".join(rnd.choices(WORDS, k=rnd.randint(1, 4))),
+             "notes": " ".join(rnd.choices(WORDS, k=rnd.randint(0, 6)))} for i in range(1, n + 1)]
+
+
+class NgramIndexTests(unittest.TestCase):
+    def test_matches_search_match_exactly(self):
+        tasks = make_tasks(300)
+        idx = NgramIndex()
+        idx.sync(tasks)
+        for q in ["d", "De", "tax", "x r", "Ölw", "e-ma", "milk call", "zzz", "appointment the", " "]:
+            q = q.strip() or q
+            expected = {t["id"] for t in tasks if search_match(t, q)}
+            self.assertEqual(idx.search(q), expected, q)
+
+    def test_sync_reindexes_only_changes(self):
+        tasks = make_tasks(50)
+        idx = NgramIndex()
+        self.assertEqual(idx.sync(tasks), 50)
+        self.assertEqual(idx.sync(tasks), 0)
+        tasks[3]["title"] = "Renew passport"
+        del tasks[10]
+        self.assertEqual(idx.sync(tasks), 2)
+        self.assertEqual(idx.search("passport"), {tasks[3]["id"]})
+        self.assertNotIn(11, idx.search(""))
+        idx.remove(tasks[3]["id"])
+        self.assertEqual(idx.search("passport"), set())
+        self.assertNotIn(" passport", idx._postings)  # emptied postings are dropped
+
+    def test_rare_query_checks_few_candidates(self):
+        tasks = make_tasks(5000)
+        tasks.append({"id": 9999, "title": "Call plumber", "notes": ""})
+        idx = NgramIndex()
+        idx.sync(tasks)
+        self.assertEqual(idx.search("plumb"), {9999})
+        self.assertLess(idx.stats["candidates"], 5)
+
+    def test_fuzzy_ranks_typos_by_overlap(self):
+        idx = NgramIndex()
+        idx.sync([{"id": 1, "title": "Dentist appointment", "notes": ""},
+                  {"id": 2, "title": "Dentures", "notes": ""},
+                  {"id": 3, "title": "Buy milk", "notes": "dent in car"}])
+        self.assertEqual(idx.search("dentsit"), set())
+        ranked = idx.fuzzy("dentsit")
+        self.assertEqual(ranked[0][0], 1)
+        self.assertTrue(all(0 < s <= 1 for _, s in ranked))
+        self.assertEqual(idx.fuzzy("apointment")[0][0], 1)
+        self.assertEqual(idx.fuzzy("xq"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,19 @@
+import gzip
+import http.client
+import json
+import re
+import tempfile
+import threading
 import unittest
+import zlib
 from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
 
 from tasklistprogram import webserver as ws
+from tasklistprogram.core import model
+
+from tests._store import TempStoreMixin
 
 
 def fresh_db():
@@ -136,5 +148,523 @@ class OpDoneTests(unittest.TestCase):
         self.assertTrue(t["completed_at"])
 
 
+class ReminderHookTests(unittest.TestCase):
+    def test_fired_reminder_reaches_hooks_and_survives_bad_hook(self):
+        got = []
+        def bad(ev):
+            raise RuntimeError("boom")
+        ws.REMINDER_HOOKS[:] = [bad, got.append]
+        try:
+            ws._on_reminder_fired({"id": 7, "checkpoint": "2026-01-01T09:00"})
+        finally:
+            ws.REMINDER_HOOKS.clear()
+        self.assertEqual(got, [{"id": 7, "checkpoint": "2026-01-01T09:00"}])
+
+
+class BodyReaderTests(unittest.TestCase):
+    def test_reads_exactly_content_length_lines(self):
+        import io
+        raw = io.BytesIO("a | prio: H\nb\nNEXT REQUEST".encode("utf-8"))
+        reader = io.TextIOWrapper(io.BufferedReader(ws._BodyReader(raw, 14)), encoding="utf-8")
+        self.assertEqual(list(reader), ["a | prio: H\n", "b\n"])
+
+
+class StoreCacheTests(TempStoreMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        model.save_db({"version": 1, "next_id": 2, "tasks": [{"id": 1, "title": "a"}]})
+        self.cache = ws.StoreCache()
+        self.addCleanup(self.cache.close)
+
+    def test_reloads_only_when_another_writer_moved_the_rev(self):
+        with mock.patch.object(model, "load_db", wraps=model.load_db) as loads:
+            db = self.cache.get()
+            self.assertIs(self.cache.get(), db)
+            ws.op_add(db, {"title": "b"})
+            model.save_db(db)  # our own write: the copy stays valid
+            self.assertIs(self.cache.get(), db)
+            self.assertEqual(loads.call_count, 1)
+            other = model.load_db()
+            other["tasks"][0]["title"] = "edited elsewhere"
+            model.save_db(other)
+            self.assertEqual(self.cache.get()["tasks"][0]["title"], "edited elsewhere")
+        self.assertEqual(self.cache.stats, {"hits": 2, "loads": 2})
+
+    def test_views_are_memoized_per_rev(self):
+        fn = mock.Mock(side_effect=lambda db: len(db["tasks"]))
+        self.assertEqual(self.cache.view("n", fn), 1)
+        self.assertEqual(self.cache.view("n", fn), 1)
+        db = self.cache.get()
+        ws.op_add(db, {"title": "b"})
+        model.save_db(db)
+        self.assertEqual(self.cache.view("n", fn), 2)
+        self.assertEqual(fn.call_count, 2)
+
+    def test_view_is_tagged_with_the_rev_of_the_copy_it_was_given(self):
+        db = self.cache.get()
+        other = model.load_db()
+        other["tasks"][0]["title"] = "edited elsewhere"
+        model.save_db(other)  # lands between the caller's get() and its view()
+        self.assertEqual(self.cache.view("title", lambda d: d["tasks"][0]["title"], db), "a")
+        self.assertEqual(self.cache.view("title", lambda d: d["tasks"][0]["title"]), "edited elsewhere")
+
+    def test_failed_save_drops_the_mutated_copy(self):
+        with mock.patch.object(ws, "_STORE", self.cache):
+            db = self.cache.get()
+            db["tasks"][0]["title"] = "unsaved"
+            with mock.patch.object(model, "save_db", side_effect=OSError("disk full")):
+                with self.assertRaises(OSError):
+                    ws._save(db)
+            self.assertEqual(self.cache.get()["tasks"][0]["title"], "a")
+
+
+class GroupCommitWriterTests(TempStoreMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        model.save_db({"version": 1, "next_id": 3, "tasks": [{"id": 1, "title": "a"}, {"id": 2, "title": "b"}]})
+        patcher = mock.patch.object(ws, "_STORE", ws.StoreCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(ws._STORE.close)
+        self.writer = ws.GroupCommitWriter()
+        self.addCleanup(self.writer.stop)
+
+    def hold_writer(self, job):
+        """Submit ``job`` and return once the writer is running it, stalled until
+        the returned event is set (so whatever is submitted meanwhile queues)."""
+        started, release = threading.Event(), threading.Event()
+
+        def held(db):
+            started.set()
+            release.wait(5)
+            return job(db)
+
+        fut = self.writer.submit(held)
+        started.wait(5)
+        return fut, release
+
+    def retitle(self, tid, title):
+        def job(db):
+            t = next(t for t in db["tasks"] if t["id"] == tid)
+            t["title"] = title
+            return {tid}, title
+        return job
+
+    def test_queued_writes_share_one_commit(self):
+        rev = model.current_rev()
+        first, release = self.hold_writer(self.retitle(1, "first"))
+        futures = [self.writer.submit(self.retitle(2, f"b{i}")) for i in range(10)]
+        futures.append(self.writer.submit(lambda db: (False, "read-only")))
+        release.set()
+        self.assertEqual([f.result(5) for f in futures][-2:], ["b9", "read-only"])
+        self.assertEqual(first.result(5), "first")
+        self.assertEqual(model.current_rev(), rev + 2)
+        self.assertEqual(self.writer.stats, {"commits": 2, "jobs": 12, "largest_group": 11})
+        self.assertEqual(futures[0].rev, rev + 2)
+        self.assertEqual([t["title"] for t in model.load_db()["tasks"]], ["first", "b9"])
+
+    def test_failed_job_drops_the_copy_before_releasing_the_lock(self):
+        held = []
+        invalidate = ws._STORE.invalidate
+        with mock.patch.object(ws._STORE, "invalidate",
+                               side_effect=lambda: (held.append(ws._DB_LOCK.locked()), invalidate())):
+            fut = self.writer.submit(lambda db: (db["tasks"][0].update(title="dirty"), 1 / 0))
+            self.assertRaises(ZeroDivisionError, fut.result, 5)
+        self.assertEqual(held, [True])
+        self.assertEqual(ws._STORE.get()["tasks"][0]["title"], "a")
+
+    def test_post_commit_failure_still_resolves_the_waiters(self):
+        with mock.patch.object(ws, "_after_write", side_effect=RuntimeError("rearm")), \
+                self.assertLogs(ws.logger, "ERROR"):
+            self.assertEqual(self.writer.run(self.retitle(1, "landed")), "landed")
+        self.assertEqual(model.load_db()["tasks"][0]["title"], "landed")
+
+    def test_failing_job_does_not_sink_its_group(self):
+        def broken(db):
+            db["tasks"][0]["title"] = "half-done"
+            raise RuntimeError("bug")
+
+        def refuse(db):
+            db["tasks"][1]["title"] = "never"
+            raise ws.Rollback({"why": "atomic"})
+
+        _, release = self.hold_writer(self.retitle(1, "a1"))
+        bad, rolled, good = (self.writer.submit(fn) for fn in (broken, refuse, self.retitle(2, "b2")))
+        release.set()
+        self.assertEqual(good.result(5), "b2")
+        self.assertRaises(RuntimeError, bad.result, 5)
+        with self.assertRaises(ws.Rollback) as cm:
+            rolled.result(5)
+        self.assertEqual(cm.exception.value, {"why": "atomic"})
+        self.assertEqual([t["title"] for t in model.load_db()["tasks"]], ["a1", "b2"])
+
+    def test_group_saves_only_the_tasks_its_jobs_touched(self):
+        with mock.patch.object(model, "save_db", wraps=model.save_db) as save:
+            _, release = self.hold_writer(lambda db: (False, None))
+            futures = [self.writer.submit(self.retitle(tid, "x")) for tid in (1, 2)]
+            release.set()
+            futures[-1].result(5)
+            self.writer.run(lambda db: (True, None))  # can't name its tasks: a full diff
+        self.assertEqual([c.kwargs["touched"] for c in save.call_args_list], [{1, 2}, None])
+
+    def test_timed_out_run_cancels_a_job_still_queued(self):
+        _, release = self.hold_writer(self.retitle(1, "a1"))
+        with self.assertRaises(ws.FutureTimeout):
+            self.writer.run(self.retitle(2, "late"), timeout=0.05)
+        release.set()
+        self.writer.run(lambda db: (False, None))  # the queue has drained
+        self.assertEqual([t["title"] for t in model.load_db()["tasks"]], ["a1", "b"])
+
+
+
+class ServerTestMixin(TempStoreMixin):
+    """A live server on an ephemeral port over a temp store, with its own cache."""
+
+    def setUp(self):
+        super().setUp()
+        model.save_db({"version": 1, "next_id": 3, "tasks": [{"id": 1, "title": "a"}, {"id": 2, "title": "b"}]})
+        patcher = mock.patch.object(ws, "_STORE", ws.StoreCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(ws._STORE.close)
+        self.server = ws.WebServer(("127.0.0.1", 0), ws.Handler)
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def request(self, method, path, body=None, **headers):
+        conn = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=5)
+        self.addCleanup(conn.close)
+        conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+        r = conn.getresponse()
+        data = r.read()
+        return r, (json.loads(data) if data else None)
+
+
+class ConditionalRequestTests(ServerTestMixin, unittest.TestCase):
+    def test_unchanged_store_answers_304(self):
+        r, data = self.request("GET", "/api/tasks")
+        etag = r.getheader("ETag")
+        self.assertEqual((r.status, r.getheader("Cache-Control")), (200, "no-cache"))
+        r, data = self.request("GET", "/api/tasks", **{"If-None-Match": etag})
+        self.assertEqual((r.status, data), (304, None))
+        self.assertNotEqual(self.request("GET", "/api/tasks?x=1")[0].getheader("ETag"), etag)
+        self.request("PATCH", "/api/tasks/2", {"notes": "n"})
+        r, data = self.request("GET", "/api/tasks", **{"If-None-Match": etag})
+        self.assertEqual(r.status, 200)
+        self.assertEqual(data["tasks"][1]["notes"], "n")
+
+    def test_if_match_refuses_stale_writes(self):
+        _, data = self.request("GET", "/api/tasks")
+        stale = data["tasks"][0]["etag"]
+        r, fresh = self.request("PATCH", "/api/tasks/1", {"title": "a2"}, **{"If-Match": stale})
+        self.assertEqual((r.status, r.getheader("ETag")), (200, fresh["etag"]))
+        r, data = self.request("DELETE", "/api/tasks/1", **{"If-Match": stale})
+        self.assertEqual(r.status, 412)
+        self.assertEqual(data["task"]["title"], "a2")
+        self.assertFalse(model.load_db()["tasks"][0].get("is_deleted"))
+        self.assertEqual(self.request("DELETE", "/api/tasks/1", **{"If-Match": fresh["etag"]})[0].status, 200)
+
+    def test_stats_revalidate_by_content(self):
+        r, _ = self.request("GET", "/api/stats")
+        self.assertEqual(self.request("GET", "/api/stats", **{"If-None-Match": r.getheader("ETag")})[0].status, 304)
+
+    def test_since_returns_only_changes_or_a_full_fallback(self):
+        _, full = self.request("GET", "/api/tasks")
+        rev = full["rev"]
+        self.request("PATCH", "/api/tasks/2", {"notes": "n"})
+        self.request("POST", "/api/tasks/1/harddelete")
+        r, delta = self.request("GET", f"/api/tasks?since={rev}")
+        self.assertEqual((delta["full"], delta["rev"], delta["deleted"]), (False, rev + 2, [1]))
+        self.assertEqual([t["notes"] for t in delta["upserted"]], ["n"])
+        r, _ = self.request("GET", f"/api/tasks?since={rev}", **{"If-None-Match": r.getheader("ETag")})
+        self.assertEqual(r.status, 304)
+        _, behind = self.request("GET", "/api/tasks?since=999")
+        self.assertEqual((behind["full"], [t["id"] for t in behind["tasks"]]), (True, [2]))
+        self.assertEqual(self.request("GET", "/api/tasks?since=x")[0].status, 400)
+
+    def test_event_stream_pushes_writes(self):
+        with mock.patch.object(ws, "_EVENTS", ws.EventHub()):
+            conn = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=5)
+            self.addCleanup(conn.close)
+            conn.request("GET", "/api/events")
+            stream = conn.getresponse()
+            self.assertEqual(stream.getheader("Content-Type"), "text/event-stream; charset=utf-8")
+            self.assertEqual(stream.fp.readline(), b"retry: 3000\n")
+            stream.fp.readline()
+            _, t = self.request("PATCH", "/api/tasks/1", {"notes": "n"})
+            rev = model.current_rev()
+            self.assertEqual([stream.fp.readline() for _ in range(3)],
+                             [b"id: 1\n", b"event: tasks\n", f'data: {{"rev": {rev}}}\n'.encode()])
+            ws._EVENTS.close()  # shutdown ends the stream
+            self.assertEqual(stream.fp.read(), b"\n")  # the blank line closing the event, then EOF
+
+    def test_etag_matching_rules(self):
+        self.assertTrue(ws.etag_matches('"a", W/"b"', '"b"'))
+        self.assertFalse(ws.etag_matches('W/"b"', '"b"', weak=False))
+        self.assertTrue(ws.etag_matches("*", '"b"', weak=False))
+        self.assertEqual(ws.rev_etag(3, "/api/tasks?b=1&a=2"), ws.rev_etag(3, "/api/tasks?a=2&b=1"))
+
+
+class PayloadShapeTests(ServerTestMixin, unittest.TestCase):
+    def test_fields_and_history_window(self):
+        today = date.today()
+        model.save_db({"version": 1, "next_id": 3, "tasks": [
+            {"id": 1, "title": "a", "notes": "long", "repeat": "daily",
+             "history": [(today - timedelta(days=k)).isoformat() for k in (40, 3, 0)]},
+            {"id": 2, "title": "b", "group": "Work"}]})
+        r, data = self.request("GET", "/api/tasks?fields=title,history&history=7")
+        self.assertEqual(data["tasks"][0], {"id": 1, "title": "a",
+                                            "history": [(today - timedelta(days=k)).isoformat() for k in (3, 0)]})
+        r, data = self.request("GET", "/api/tasks?fields=title,bogus")
+        self.assertEqual((r.status, data["error"]), (400, "unknown field(s): bogus"))
+        self.assertEqual(self.request("GET", "/api/tasks?format=xml")[0].status, 400)
+
+    def test_history_window_tag_moves_with_the_day(self):
+        r, _ = self.request("GET", "/api/tasks?history=7")
+        etag = r.getheader("ETag")
+        self.assertEqual(self.request("GET", "/api/tasks?history=7", **{"If-None-Match": etag})[0].status, 304)
+
+        class Tomorrow(date):
+            @classmethod
+            def today(cls):
+                return date.today() + timedelta(days=1)
+
+        with mock.patch.object(ws, "date", Tomorrow):
+            r, _ = self.request("GET", "/api/tasks?history=7", **{"If-None-Match": etag})
+        self.assertEqual(r.status, 200)
+        self.assertNotEqual(r.getheader("ETag"), etag)
+
+    def test_columnar_snapshot(self):
+        model.save_db({"version": 1, "next_id": 4, "tasks": [
+            {"id": 1, "title": "a", "group": "Work", "priority": "H"},
+            {"id": 2, "title": "b", "group": "Home", "is_deleted": True},
+            {"id": 3, "title": "c", "group": "Work", "history": [date.today().isoformat() + "T09:00:00"]}]})
+        _, data = self.request("GET", "/api/tasks?format=columns&history=14")
+        cols = data["columns"]
+        self.assertEqual((data["count"], cols["id"], cols["is_deleted"]), (3, [1, 2, 3], [0, 1, 0]))
+        self.assertEqual([data["dicts"]["group"][i] for i in cols["group"]], ["Work", "Home", "Work"])
+        self.assertEqual(cols["history"], ["", "", "AQA="])  # bit 0: done today
+        self.assertEqual(data["history_days"], 14)
+        self.assertTrue(all(tag.startswith('"t') for tag in cols["etag"]))
+
+    def test_single_task_endpoint(self):
+        model.save_db({"version": 1, "next_id": 2, "tasks": [
+            {"id": 1, "title": "a", "history": ["2020-01-01", "2026-01-01"]}]})
+        r, data = self.request("GET", "/api/tasks/1")
+        self.assertEqual((r.status, data["history"]), (200, ["2020-01-01", "2026-01-01"]))
+        self.assertEqual(r.getheader("ETag"), data["etag"])
+        self.assertEqual(self.request("GET", "/api/tasks/1", **{"If-None-Match": data["etag"]})[0].status, 304)
+        self.assertEqual(self.request("GET", "/api/tasks/9")[0].status, 404)
+        self.assertEqual(self.request("GET", "/api/tasks/x")[0].status, 400)
+
+
+class TaskQueryTests(ServerTestMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        day = lambda n: (date.today() + timedelta(days=n)).isoformat()
+        model.save_db({"version": 1, "next_id": 7, "tasks": [
+            {"id": 1, "title": "Call dentist", "due": day(3), "priority": "M", "group": "Health"},
+            {"id": 2, "title": "Pay rent", "due": day(-1), "priority": "H"},
+            {"id": 3, "title": "Buy milk", "priority": "L", "group": "Home"},
+            {"id": 4, "title": "Dentist bill", "completed_at": "2026-01-01T10:00:00"},
+            {"id": 5, "title": "Old thing", "is_deleted": True},
+            {"id": 6, "title": "Water plants", "due": day(1), "priority": "H", "group": "Home"}]})
+
+    def ids(self, data):
+        return [t["id"] for t in data["tasks"]]
+
+    def test_filters_sort_and_counts(self):
+        _, data = self.request("GET", "/api/tasks?category=active")
+        self.assertEqual(self.ids(data), [2, 6, 1, 3])  # by due, undated last
+        self.assertEqual(data["counts"], {"active": 4, "repeating": 0, "done": 1, "deleted": 1,
+                                          "suspended": 0, "overdue": 1, "all": 4})
+        self.assertEqual(data["groups"], {"Health": 1, "": 1, "Home": 2})
+        self.assertEqual(self.ids(self.request("GET", "/api/tasks?time=week&min_prio=H")[1]), [2, 6])
+        self.assertEqual(self.ids(self.request("GET", "/api/tasks?group=Home&sort=title&order=desc")[1]), [6, 3])
+        self.assertEqual(self.ids(self.request("GET", "/api/tasks?group=")[1]), [2])
+        self.assertEqual(self.ids(self.request("GET", "/api/tasks?category=done")[1]), [4])
+
+    def test_search_and_paging(self):
+        _, data = self.request("GET", "/api/tasks?q=dentist&category=all")
+        self.assertEqual((self.ids(data), data["fuzzy"]), ([1], False))  # the done one is not "all"
+        _, data = self.request("GET", "/api/tasks?q=dentsit")
+        self.assertEqual((self.ids(data), data["fuzzy"]), ([1], True))
+        _, first = self.request("GET", "/api/tasks?limit=3")
+        self.assertEqual((self.ids(first), first["total"]), ([2, 6, 1], 4))
+        _, rest = self.request("GET", f"/api/tasks?limit=3&cursor={first['next_cursor']}")
+        self.assertEqual((self.ids(rest), rest["next_cursor"]), ([3], None))
+        _, counts_only = self.request("GET", "/api/tasks?limit=0&fields=id")
+        self.assertEqual((counts_only["tasks"], counts_only["counts"]["active"]), ([], 4))
+
+    def test_bad_query_parameters(self):
+        r, data = self.request("GET", "/api/tasks?category=nope&order=up&limit=x")
+        self.assertEqual(r.status, 400)
+        self.assertIn("category must be one of", data["error"])
+        self.assertIn("order must be asc or desc", data["error"])
+        self.assertEqual(self.request("GET", "/api/tasks?time=custom")[0].status, 400)
+        self.assertEqual(self.request("GET", "/api/tasks?since=1&q=x")[0].status, 400)
+
+
+class BatchTests(ServerTestMixin, unittest.TestCase):
+    def test_batch_commits_once_with_per_op_results(self):
+        rev = model.current_rev()
+        _, tasks = self.request("GET", "/api/tasks")
+        stale = tasks["tasks"][1]["etag"]
+        self.request("PATCH", "/api/tasks/2", {"notes": "moved on"})
+        r, data = self.request("POST", "/api/batch", {"ops": [
+            {"op": "done", "id": 1},
+            {"op": "patch", "id": 1, "fields": {"priority": "H", "group": "Bundle"}},
+            {"op": "add", "fields": {"title": "c", "group": "Bundle"}},
+            {"op": "delete", "id": 2, "if_match": stale},
+            {"op": "toggle", "id": 99},
+            {"op": "fly", "id": 1},
+            {"op": "add", "fields": {}},
+        ]})
+        self.assertEqual(r.status, 200)
+        self.assertEqual([x["status"] for x in data["results"]], [200, 200, 201, 412, 404, 400, 400])
+        self.assertEqual((data["applied"], data["failed"]), (3, 4))
+        self.assertEqual(data["results"][3]["task"]["notes"], "moved on")
+        self.assertEqual(data["rev"], rev + 2)  # the PATCH, then the whole batch
+        db = model.load_db()
+        self.assertEqual([(t["id"], t.get("group"), t.get("priority")) for t in db["tasks"]],
+                         [(1, "Bundle", "H"), (2, None, None), (3, "Bundle", "M")])
+        self.assertTrue(db["tasks"][0]["completed_at"])
+        self.assertFalse(db["tasks"][1].get("is_deleted"))
+
+    def test_atomic_batch_writes_nothing_on_failure(self):
+        rev = model.current_rev()
+        r, data = self.request("POST", "/api/batch", {"atomic": True, "ops": [
+            {"op": "harddelete", "id": 1}, {"op": "restore", "id": 42}]})
+        self.assertEqual((r.status, data["applied"]), (409, 0))
+        self.assertEqual((model.current_rev(), len(model.load_db()["tasks"])), (rev, 2))
+        self.assertEqual(len(self.request("GET", "/api/tasks")[1]["tasks"]), 2)  # cache dropped too
+        r, data = self.request("POST", "/api/batch", {"atomic": True, "ops": [
+            {"op": "harddelete", "id": 1}, {"op": "toggle", "id": 1}]})
+        self.assertEqual([x["status"] for x in data["results"]], [200, 404])  # gone for later ops
+        self.assertEqual(self.request("POST", "/api/batch", {"ops": []})[0].status, 400)
+
+    def test_batch_undo_restores_the_copy(self):
+        db = model.load_db()
+        before = json.dumps(db, sort_keys=True)
+        ops = [{"op": "done", "id": 1}, {"op": "harddelete", "id": 2}, {"op": "add", "fields": {"title": "c"}}]
+        undo = ws.batch_undo(db, ops)
+        ws.apply_batch(db, ops)
+        undo()
+        self.assertEqual(json.dumps(db, sort_keys=True), before)
+
+    def test_malformed_ops_get_400_results(self):
+        r, data = self.request("POST", "/api/batch", {"ops": [
+            {"op": "patch", "id": 1, "fields": ["title", "x"]},
+            {"op": "add", "fields": "title"},
+            {"op": "toggle", "id": True},
+            {"op": "toggle", "id": "1"},
+        ]})
+        self.assertEqual(r.status, 200)
+        self.assertEqual([x["status"] for x in data["results"]], [400, 400, 400, 400])
+        self.assertEqual(data["applied"], 0)
+        self.assertFalse(model.load_db()["tasks"][0].get("done"))
+
+
+class WriteFailureTests(ServerTestMixin, unittest.TestCase):
+    def test_stalled_writer_answers_503_and_drops_the_queued_write(self):
+        started, release = threading.Event(), threading.Event()
+        ws._WRITER.submit(lambda db: (started.set(), release.wait(5), (False, None))[2])
+        self.addCleanup(release.set)
+        started.wait(5)
+        with mock.patch.object(ws, "WRITE_TIMEOUT_SECONDS", 0.05):
+            r, data = self.request("PATCH", "/api/tasks/1", {"title": "late"})
+        self.assertEqual(r.status, 503)
+        self.assertIn("nothing was written", data["error"])
+        release.set()
+        self.assertEqual(self.request("GET", "/api/tasks/1")[1]["title"], "a")
+
+    def test_failing_job_answers_500(self):
+        with mock.patch.object(ws, "op_toggle", side_effect=RuntimeError("bug")), \
+                self.assertLogs(ws.logger, "ERROR"):
+            r, data = self.request("POST", "/api/tasks/1/toggle")
+        self.assertEqual((r.status, data), (500, {"error": "write failed"}))
+        self.assertEqual(self.request("GET", "/api/tasks/1")[0].status, 200)
+
+class CompressionTests(ServerTestMixin, unittest.TestCase):
+    def raw(self, path, **headers):
+        conn = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=5)
+        self.addCleanup(conn.close)
+        conn.request("GET", path, headers=headers)
+        r = conn.getresponse()
+        return r, r.read()
+
+    def test_negotiation(self):
+        self.assertEqual(ws.negotiate_encoding("gzip, deflate, br"), "gzip")
+        self.assertEqual(ws.negotiate_encoding("deflate, gzip;q=0.5"), "deflate")
+        self.assertEqual(ws.negotiate_encoding("gzip;q=0, *"), "deflate")
+        self.assertIsNone(ws.negotiate_encoding("identity"))
+        self.assertIsNone(ws.negotiate_encoding(None))
+        self.assertIsNone(ws.negotiate_encoding("*;q=0"))
+
+    def test_large_json_is_compressed_and_revalidates(self):
+        model.save_db({"version": 1, "next_id": 201,
+                       "tasks": [{"id": i, "title": f"task {i}", "notes": "x" * 40} for i in range(1, 201)]})
+        r, plain = self.raw("/api/tasks")
+        self.assertIsNone(r.getheader("Content-Encoding"))
+        etag = r.getheader("ETag")
+        r, body = self.raw("/api/tasks", **{"Accept-Encoding": "gzip"})
+        self.assertEqual((r.getheader("Content-Encoding"), r.getheader("Vary")), ("gzip", "Accept-Encoding"))
+        self.assertEqual(gzip.decompress(body), plain)
+        self.assertLess(len(body), len(plain) / 4)
+        self.assertIn("ratio=", r.getheader("Server-Timing"))
+        gz_etag = r.getheader("ETag")
+        self.assertEqual(gz_etag, ws.encoded_etag(etag, "gzip"))
+        r, _ = self.raw("/api/tasks", **{"Accept-Encoding": "gzip", "If-None-Match": gz_etag})
+        self.assertEqual((r.status, r.getheader("ETag")), (304, gz_etag))
+        r, body = self.raw("/api/tasks", **{"Accept-Encoding": "deflate"})
+        self.assertEqual(zlib.decompress(body), plain)
+        # tiny bodies stay as they are
+        self.assertIsNone(self.raw("/api/stats", **{"Accept-Encoding": "gzip"})[0].getheader("Content-Encoding"))
+
+    def test_static_assets_are_served_from_memory(self):
+        with tempfile.TemporaryDirectory() as d:
+            root = Path(d)
+            (root / "app.js").write_text("console.log('hi');\n" * 200)
+            (root / "logo.png").write_bytes(b"\x89PNG" + b"\0" * 2000)
+            assets = ws.StaticAssets(root)
+            with mock.patch.object(ws, "WEB_DIR", root), mock.patch.object(ws, "_ASSETS", assets):
+                self.assertEqual(assets.preload(), 2)
+                r, body = self.raw("/app.js", **{"Accept-Encoding": "gzip"})
+                self.assertEqual(r.getheader("Content-Encoding"), "gzip")
+                self.assertEqual(gzip.decompress(body), (root / "app.js").read_bytes())
+                r, body = self.raw("/logo.png", **{"Accept-Encoding": "gzip"})
+                self.assertIsNone(r.getheader("Content-Encoding"))  # not a compressible type
+                self.assertEqual(assets.stats["loads"], 2)
+                (root / "app.js").write_text("changed")
+                self.assertEqual(self.raw("/app.js", **{"Accept-Encoding": "gzip"})[1], b"changed")
+                self.assertEqual(self.raw("/../secret", **{"Accept-Encoding": "gzip"})[0].status, 404)
+
+    def test_static_validators_and_fingerprinted_urls(self):
+        with tempfile.TemporaryDirectory() as d:
+            root = Path(d)
+            (root / "index.html").write_text('<link href="s.css"><script src="app.js"></script>'
+                                             '<a href="https://x.org/a.js">x</a><a href="#top">t</a>')
+            (root / "s.css").write_text("body{}")
+            (root / "app.js").write_text("let a = 1;")
+            with mock.patch.object(ws, "WEB_DIR", root), \
+                    mock.patch.object(ws, "_ASSETS", ws.StaticAssets(root)):
+                r, page = self.raw("/")
+                refs = dict(re.findall(r'(?:src|href)="([^"?]+)\?v=(\w+)"', page.decode()))
+                self.assertEqual(set(refs), {"s.css", "app.js"})  # external / fragment links untouched
+                self.assertEqual(r.getheader("Cache-Control"), "no-cache")
+                r, _ = self.raw(f"/app.js?v={refs['app.js']}")
+                self.assertIn("immutable", r.getheader("Cache-Control"))
+                r, _ = self.raw("/app.js", **{"If-None-Match": r.getheader("ETag")})
+                self.assertEqual((r.status, r.getheader("Cache-Control")), (304, "no-cache"))
+                last_modified = self.raw("/app.js")[0].getheader("Last-Modified")
+                self.assertEqual(self.raw("/app.js", **{"If-Modified-Since": last_modified})[0].status, 304)
+                # editing a referenced asset re-renders the page with its new fingerprint
+                (root / "app.js").write_text("let a = 22;")
+                page = self.raw("/", **{"If-None-Match": '"stale"'})[1].decode()
+                self.assertNotIn(refs["app.js"], page)
+                self.assertIn(refs["s.css"], page)
+
+
 if __name__ == "__main__":
     unittest.main()
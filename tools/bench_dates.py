@@ -0,0 +1,45 @@
+"""Throughput benchmark for the due-date parser.
+
+Run:  python tools/bench_dates.py [rounds]
+Parses a corpus covering every documented due format (see docs/IMPORTING.md)
+with `parse_due_entry` (pinned `now`, as imports do) and prints strings/second.
+"""
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tasklistprogram.core.dates import parse_due_entry  # noqa: E402
+
+CORPUS = [
+    "2026-10-13", "2026-10-13 14:00", "2026-10-13 1400", "2026-10-13 midnight",
+    "10/13", "10/13 14:00", "10/13 1400", "10/13 14", "10/13 midnight",
+    "14:30", "0830", "930",
+    "today", "tonight", "tomorrow", "tmrw", "yesterday", "tomorrow 9:15", "today evening",
+    "mon", "friday", "thurs 0900", "sun morning",
+    "Sept 29", "September 29 2026", "sep 29 14:00", "dec. 1 midnight",
+    "morning", "noon", "afternoon", "evening", "midnight",
+    "+2d", "+5h", "-3h", "+1w", "+2d +3h", "+1d midnight", "+0m",
+    "not a date", "13/45",
+]
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    strings = CORPUS * rounds
+    now = datetime.now()
+
+    t0 = time.perf_counter()
+    for s in strings:
+        parse_due_entry(s, now=now)
+    single = time.perf_counter() - t0
+
+    n = len(strings)
+    print(f"{n} strings ({len(CORPUS)} distinct formats)")
+    print(f"  parse_due_entry : {n / single:>12,.0f} /s")
+
+
+if __name__ == "__main__":
+    main()
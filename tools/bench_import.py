@@ -0,0 +1,52 @@
+"""Scaling benchmark for parallel import parsing.
+
+Run:  python tools/bench_import.py [lines]
+Parses a synthetic pipe-format file (mixed due formats, priorities, repeats and
+some invalid lines) with `_parse_lines` at 1/2/4/8 workers into an in-memory
+db, checks every run produced the same tasks and errors as the serial one, and
+prints lines/second and speed-up.
+"""
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tasklistprogram.core.io_import import _parse_lines  # noqa: E402
+
+DUES = ["2026-10-13 14:00", "10/13", "tomorrow 9:15", "fri", "+2d +3h", "Sept 29", "0830", "notadate"]
+PRIOS = ["H", "M", "L", "D", "Misc"]
+REPEATS = ["none", "weekly", "custom:6", "monthly", "fortnightly"]
+
+
+def corpus(n):
+    for i in range(n):
+        yield (f"Task {i} | due: {DUES[i % len(DUES)]} | prio: {PRIOS[i % len(PRIOS)]}"
+               f" | repeat: {REPEATS[i % len(REPEATS)]} | group: G{i % 13} | notes: line {i}")
+
+
+def run(lines, workers, now):
+    db = {"version": 1, "tasks": [], "next_id": 1}
+    t0 = time.perf_counter()
+    added, failed, details = _parse_lines(lines, db, return_details=True, workers=workers, now=now)
+    elapsed = time.perf_counter() - t0
+    return elapsed, (added, failed, details, db)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    lines = list(corpus(n))
+    now = datetime.now()  # pinned so relative dues agree across runs
+    print(f"{n} lines, {os.cpu_count()} CPUs")
+    base_time, base = run(lines, 1, now)
+    print(f"  workers=1 : {n / base_time:>10,.0f} lines/s  (1.00x)")
+    for workers in (2, 4, 8):
+        elapsed, result = run(lines, workers, now)
+        same = "ok" if result == base else "MISMATCH"
+        print(f"  workers={workers} : {n / elapsed:>10,.0f} lines/s  ({base_time / elapsed:.2f}x)  {same}")
+
+
+if __name__ == "__main__":
+    main()
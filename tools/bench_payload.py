@@ -0,0 +1,63 @@
+"""Payload size and encode time of the web task list shapes.
+
+Run:  python tools/bench_payload.py [tasks]
+Builds a synthetic store (default 10,000 tasks, a third of them recurring with a
+year of completions) and, for each shape `GET /api/tasks` can send — full
+objects, the list-view projection, a 91-day history window, and the columnar
+format — prints the JSON size, the gzipped size, and the time to build and
+encode it.
+"""
+import gzip
+import json
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tasklistprogram import webserver as ws  # noqa: E402
+
+LIST_FIELDS = ("id", "title", "due", "priority", "group", "done", "etag")
+
+
+def make_tasks(n, seed=7):
+    rnd = random.Random(seed)
+    today = date.today()
+    groups = ["", "Work", "Home", "Errands", "Health", "Study"]
+    tasks = []
+    for i in range(1, n + 1):
+        recurring = i % 3 == 0
+        history = ([(today - timedelta(days=d)).isoformat() + "T08:00:00"
+                    for d in range(365) if rnd.random() < 0.6] if recurring else [])
+        tasks.append({"id": i, "title": f"Task {i} " + rnd.choice(["review", "call", "buy", "write"]),
+                      "due": (today + timedelta(days=rnd.randint(-5, 30))).isoformat(),
+                      "priority": rnd.choice("HMLD"), "repeat": "daily" if recurring else "none",
+                      "group": rnd.choice(groups), "notes": "some notes " * rnd.randint(0, 4),
+                      "history": history, "times_completed": len(history),
+                      "is_deleted": rnd.random() < 0.05})
+    return tasks
+
+
+def measure(label, build):
+    t0 = time.perf_counter()
+    body = json.dumps(build()).encode("utf-8")
+    encode = time.perf_counter() - t0
+    packed = gzip.compress(body, compresslevel=ws.COMPRESS_LEVEL)
+    print(f"  {label:<28} {len(body) / 1024:>9,.0f} KB {len(packed) / 1024:>8,.0f} KB gz {encode * 1000:>8.1f} ms")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    rows = ws.client_tasks({"tasks": make_tasks(n)})
+    print(f"{n} tasks: JSON size, gzipped size, build+encode time")
+    measure("objects (all fields)", lambda: {"tasks": rows})
+    measure("?fields= list view", lambda: {"tasks": ws.project(rows, LIST_FIELDS)})
+    measure("?history=91", lambda: {"tasks": ws.project(rows, history=91)})
+    measure("?format=columns", lambda: ws.columnar(rows, history=91))
+    measure("columns + list fields", lambda: ws.columnar(rows, LIST_FIELDS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Concurrent write load test for the web server (group commit).
+
+Run:  python tools/load_test.py [tasks] [seconds]
+Starts the server in-process on a throwaway store (your data is not touched)
+with `tasks` tasks (default 2,000). For 1, 8 and 64 concurrent clients it then
+sends PATCH requests over keep-alive connections for `seconds` (default 3) and
+prints writes/second, commits, writes per commit and latency. Each level also
+runs once with group commit disabled (`max_group = 1`: one commit per write, as
+before) for comparison.
+"""
+import http.client
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tasklistprogram import webserver as ws  # noqa: E402
+from tasklistprogram.core import model  # noqa: E402
+
+LEVELS = (1, 8, 64)
+
+
+def use_temp_store(n):
+    tmp = Path(tempfile.mkdtemp(prefix="tasklist-load-"))
+    model.DATA_DIR = tmp
+    model.DB_FILE = tmp / "tasks.db"
+    model.DATA_FILE = tmp / "tasks_gui.json"
+    model.BACKUP_FILE = tmp / "tasks_gui.json.bak"
+    model.BACKUP_DIR = tmp / "backups"
+    model.LEGACY_DATA_FILE = tmp / "none.json"
+    model.LEGACY_BACKUP_FILE = tmp / "none.bak"
+    model.save_db({"version": 1, "next_id": n + 1,
+                   "tasks": [{"id": i, "title": f"Task {i}", "priority": "M"} for i in range(1, n + 1)]})
+
+
+def client(port, n, stop, latencies, errors, seed):
+    rnd = random.Random(seed)
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    while not stop.is_set():
+        body = json.dumps({"priority": rnd.choice("HML"), "notes": f"edit {rnd.random()}"})
+        t0 = time.perf_counter()
+        try:
+            conn.request("PATCH", f"/api/tasks/{rnd.randint(1, n)}", body=body)
+            r = conn.getresponse()
+            r.read()
+        except OSError:
+            errors.append(1)
+            conn.close()
+            continue
+        if r.status == 200:
+            latencies.append(time.perf_counter() - t0)
+        else:
+            errors.append(r.status)
+    conn.close()
+
+
+def run_level(port, n, clients, seconds):
+    stop = threading.Event()
+    lat = [[] for _ in range(clients)]
+    errors = []
+    before = dict(ws._WRITER.stats)
+    threads = [threading.Thread(target=client, args=(port, n, stop, lat[i], errors, i)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    done = sorted(x for per in lat for x in per)
+    commits = ws._WRITER.stats["commits"] - before["commits"]
+    pct = lambda p: done[min(len(done) - 1, int(p * len(done)))] * 1000 if done else 0.0
+    return len(done) / seconds, commits, len(done) / max(commits, 1), pct(0.5), pct(0.95), len(errors)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    use_temp_store(n)
+    server = ws.WebServer(("127.0.0.1", 0), ws.Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    print(f"{n} tasks, {seconds:g} s per run")
+    print(f"  {'clients':>7} {'mode':<14} {'writes/s':>9} {'commits':>8} {'per commit':>10} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'errors':>6}")
+    for clients in LEVELS:
+        for label, group in (("one per write", 1), ("group commit", ws.GROUP_COMMIT_MAX)):
+            ws._WRITER.max_group = group
+            wps, commits, per, p50, p95, errors = run_level(port, n, clients, seconds)
+            print(f"  {clients:>7} {label:<14} {wps:>9.1f} {commits:>8} {per:>10.1f} "
+                  f"{p50:>8.1f} {p95:>8.1f} {errors:>6}")
+    server.shutdown()
+    ws._WRITER.stop()
+
+
+if __name__ == "__main__":
+    main()
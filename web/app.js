@@ -1,6 +1,7 @@
 /* Tiny Tasklist — web app logic (vanilla JS, no dependencies).
-   Mirrors the desktop's filtering model: Category × Time × Min-priority × Search,
-   plus a collapsible Group view. */
+   The desktop's filtering model: Category × Time × Min-priority × Search, plus a
+   collapsible Group view. Live, the server runs it (GET /api/tasks query mode) and
+   sends one page at a time; sample mode filters the sample data here. */
 
 const MS_DAY = 86400000;
 const PRIO = {
@@ -27,6 +28,14 @@ let LIVE = false;
 let editingId = null;
 let _menu = null;
 let _toastTimer = null;
+let _fts = { timer: null, seq: 0, query: "", hits: [] };
+let _searchTimer = null;
+const PAGE_SIZE = 200;   // rows per /api/tasks page (the server allows up to 1000)
+let pageLimit = PAGE_SIZE;  // rows a refresh re-fetches: grows with "Show more"
+// Live mode: what the last query returned besides its rows, and the Today cards.
+let page = { total: 0, next: null, counts: {}, groups: {}, fuzzy: false };
+let dash = null;
+let _shown = {};
 let state = loadState();
 
 function loadState() {
@@ -52,16 +61,151 @@ function saveState() {
 }
 
 /* ---------- API ---------- */
-async function api(method, url, body) {
-  const opts = { method, headers: { "Content-Type": "application/json" } };
+// GET validators: url -> { etag, data }. A repeat GET sends If-None-Match and a
+// 304 reuses the data, so an idle refresh is a header exchange.
+const _validated = new Map();
+async function api(method, url, body, ifMatch) {
+  const opts = { method, cache: "no-store", headers: { "Content-Type": "application/json" } };
   if (body) opts.body = JSON.stringify(body);
+  const seen = method === "GET" ? _validated.get(url) : null;
+  if (seen) opts.headers["If-None-Match"] = seen.etag;
+  if (ifMatch) opts.headers["If-Match"] = ifMatch;  // refuse to overwrite someone else's change
   const r = await fetch(url, opts);
-  if (!r.ok) throw new Error("api " + r.status);
-  return r.json();
-}
+  if (r.status === 304 && seen) return seen.data;
+  if (!r.ok) {
+    const err = new Error("api " + r.status);
+    err.status = r.status;
+    try { err.body = await r.json(); } catch (e) {}
+    throw err;
+  }
+  const data = await r.json();
+  const etag = r.headers.get("ETag");
+  if (method === "GET" && etag) _validated.set(url, { etag, data });
+  return data;
+}
+let _retryTimer = null;
+let storeRev = null;  // server rev of what we show (events for other revs trigger a reload)
+function queryParams(cursor, limit) {
+  // The current view as a server query; the server filters and orders with core.filters.
+  const p = new URLSearchParams({ format: "columns", history: HISTORY_DAYS, category: state.category,
+    time: state.time, min_prio: state.minPrio, limit: limit || pageLimit });
+  if (state.group != null) p.set("group", state.group === "Ungrouped" ? "" : state.group);
+  if (state.search.trim()) p.set("q", state.search.trim());
+  if (cursor) p.set("cursor", cursor);
+  return p;
+}
+function showsToday() { return state.category === "active" && state.time === "today" && !state.group; }
 async function loadData() {
-  try { tasks = (await api("GET", "/api/tasks")).tasks; LIVE = true; }
-  catch (e) { tasks = SAMPLE_TASKS.slice(); LIVE = false; }
+  // Returns whether what we show changed. Unchanged views come back as 304s,
+  // which api() answers with the very same objects.
+  const before = tasks;
+  try {
+    // Columnar page with a year of history; the heatmap and streaks need no more.
+    const today = showsToday();
+    const [res, stats, week] = await Promise.all([
+      api("GET", "/api/tasks?" + queryParams()),
+      today ? api("GET", "/api/stats") : null,
+      today ? api("GET", "/api/tasks?category=active&time=week&limit=0") : null,
+    ]);
+    LIVE = true;
+    storeRev = res.rev;
+    if (res === _shown.res && stats === _shown.stats && week === _shown.week) return false;
+    _shown = { res, stats, week };
+    tasks = fromColumns(res);
+    page = { total: res.total, next: res.next_cursor, counts: res.counts, groups: res.groups, fuzzy: res.fuzzy };
+    dash = stats && { open: res.counts.active, doneToday: stats.done_today, week: week.total,
+                      streak: stats.top_streaks.length ? stats.top_streaks[0][1] : 0 };
+  }
+  catch (e) {
+    // Only a first load that fails means "no server": show the sample data. Once
+    // live, a failed refresh keeps what we have and retries in the background.
+    if (!LIVE) { tasks = SAMPLE_TASKS.slice(); storeRev = null; return tasks !== before; }
+    if (!_retryTimer) {
+      showToast("Can't reach the server — retrying");
+      _retryTimer = setTimeout(() => { _retryTimer = null; syncNow(); }, 5000);
+    }
+    return false;
+  }
+  return true;
+}
+async function loadMore() {
+  // Append the next page; later refreshes re-fetch this many rows (up to the server's cap).
+  if (!page.next) return;
+  try {
+    const res = await api("GET", "/api/tasks?" + queryParams(page.next, PAGE_SIZE));
+    tasks = tasks.concat(fromColumns(res));
+    page.next = res.next_cursor;
+    pageLimit = Math.min(tasks.length, 1000);
+  } catch (e) { showToast("Couldn't load more tasks"); }
+  render();
+}
+function viewChanged() {
+  // Live: fetch the new view's first page (rendered when it arrives); sample mode filters here.
+  saveState();
+  if (!LIVE) { render(); return; }
+  pageLimit = PAGE_SIZE;
+  syncNow();
+}
+let _syncing = null;
+function syncNow() {
+  // One delta load at a time; events arriving meanwhile fold into the next one.
+  if (_syncing) { _syncing.again = true; return; }
+  _syncing = { again: false };
+  (async () => {
+    do { _syncing.again = false; if (await loadData()) render(); } while (_syncing.again);
+    _syncing = null;
+  })();
+}
+function subscribeEvents() {
+  // Live updates (GET /api/events, Server-Sent Events). EventSource reconnects by
+  // itself and sends Last-Event-ID, so missed events are replayed or we resync.
+  if (!LIVE || !window.EventSource) return;
+  const es = new EventSource("/api/events");
+  es.addEventListener("tasks", (e) => { if (JSON.parse(e.data).rev !== storeRev) syncNow(); });
+  es.addEventListener("rollover", syncNow);
+  es.addEventListener("resync", syncNow);
+  es.addEventListener("reminder", (e) => {
+    const ev = JSON.parse(e.data);
+    showToast(`⏰ ${ev.title || "Reminder"}${ev.due ? " · due " + ev.due : ""}`);
+  });
+}
+const HISTORY_DAYS = 371;
+function fromColumns(res) {
+  // Rebuild task objects from GET /api/tasks?format=columns: dictionary-coded
+  // group/priority/repeat, 0/1 booleans, history as a day bitmap (bit i = done i days ago).
+  const { columns, dicts, fields } = res;
+  const anchor = res.history_anchor ? new Date(res.history_anchor + "T00:00:00") : null;
+  const BOOLS = new Set(["done", "suspended", "is_deleted", "possible_duplicate"]);
+  const out = [];
+  for (let r = 0; r < res.count; r++) {
+    const t = {};
+    for (const f of fields) {
+      const v = columns[f][r];
+      if (dicts[f]) t[f] = dicts[f][v];
+      else if (f === "history") t[f] = historyFromBitmap(v, anchor);
+      else t[f] = BOOLS.has(f) ? !!v : v;
+    }
+    out.push(t);
+  }
+  return out;
+}
+function historyFromBitmap(b64, anchor) {
+  const days = [];
+  if (!b64) return days;
+  const bytes = atob(b64);
+  for (let i = bytes.length * 8 - 1; i >= 0; i--) {
+    if (bytes.charCodeAt(i >> 3) & (1 << (i & 7))) days.push(isoDate(addDays(anchor, -i)));
+  }
+  return days;  // oldest first, like the stored history
+}
+function onConflict(e) {
+  // 412 from If-Match: the task changed elsewhere; show its current state.
+  if (!e || e.status !== 412 || !e.body || !e.body.task) return false;
+  const i = tasks.findIndex((x) => x.id === e.body.task.id);
+  if (i >= 0) tasks[i] = e.body.task;
+  render();
+  showToast("This task was changed elsewhere — showing the latest version");
+  return true;
 }
 
 /* ---------- date helpers ---------- */
@@ -80,7 +224,7 @@ function dueChip(due) {
   return { text: due.toLocaleDateString(undefined, { month: "short", day: "numeric" }) };
 }
 
-/* ---------- filtering (mirrors core/filters.py) ---------- */
+/* ---------- filtering (sample mode; live, the server runs core/filters.py) ---------- */
 function categoryPass(t, cat) {
   const done = !!t.done, deleted = !!t.is_deleted, suspended = !!t.suspended;
   const repeating = t.repeat && t.repeat !== "none";
@@ -126,7 +270,7 @@ function sortTasks(list) {
 }
 
 /* ---------- sidebar ---------- */
-function categoryCount(id) { return tasks.filter((t) => categoryPass(t, id)).length; }
+function categoryCount(id) { return LIVE ? (page.counts[id] || 0) : tasks.filter((t) => categoryPass(t, id)).length; }
 
 function renderSidebar() {
   const v = document.getElementById("views");
@@ -135,19 +279,20 @@ function renderSidebar() {
     const el = document.createElement("div");
     el.className = "nav-item" + (state.category === c.id && !state.group ? " active" : "");
     el.innerHTML = `<span class="ico">${c.icon}</span><span class="label">${c.label}</span><span class="count">${categoryCount(c.id)}</span>`;
-    el.onclick = () => { state.category = c.id; state.group = null; saveState(); render(); closeSidebar(); };
+    el.onclick = () => { state.category = c.id; state.group = null; viewChanged(); closeSidebar(); };
     v.appendChild(el);
   });
 
   const groups = {};
-  tasks.filter((t) => categoryPass(t, "active")).forEach((t) => { const g = t.group || "Ungrouped"; groups[g] = (groups[g] || 0) + 1; });
+  if (LIVE) Object.entries(page.groups).forEach(([name, n]) => { groups[name || "Ungrouped"] = n; });
+  else tasks.filter((t) => categoryPass(t, "active")).forEach((t) => { const g = t.group || "Ungrouped"; groups[g] = (groups[g] || 0) + 1; });
   const g = document.getElementById("groups");
   g.innerHTML = "";
   Object.keys(groups).sort().forEach((name) => {
     const el = document.createElement("div");
     el.className = "nav-item" + (state.group === name ? " active" : "");
     el.innerHTML = `<span class="ico">#</span><span class="label">${escapeHtml(name)}</span><span class="count">${groups[name]}</span>`;
-    el.onclick = () => { state.group = state.group === name ? null : name; saveState(); render(); closeSidebar(); };
+    el.onclick = () => { state.group = state.group === name ? null : name; viewChanged(); closeSidebar(); };
     g.appendChild(el);
   });
 }
@@ -167,6 +312,7 @@ function taskRow(t) {
   if (chip) meta.push(`<span class="chip due${chip.overdue ? " overdue" : ""}">${chip.overdue ? "⚠ " : ""}${chip.text}</span>`);
   if (t.repeat && t.repeat !== "none") meta.push(`<span class="chip repeat">🔁 ${escapeHtml(t.repeat)}</span>`);
   if (t.times) meta.push(`<span class="chip">✓ ${t.times}×</span>`);
+  if (t.possible_duplicate) meta.push(`<span class="chip" title="Imported while a matching task existed; edit to clear">⧉ duplicate?</span>`);
 
   el.innerHTML = `
     <div class="check" title="Toggle done">${t.done ? "✓" : ""}</div>
@@ -226,32 +372,75 @@ function closeMenu() { if (_menu) { _menu.remove(); _menu = null; } }
 /* ---------- mutations ---------- */
 async function toggleDone(t) {
   const snap = { ...t };
-  if (LIVE) { try { Object.assign(t, await api("POST", `/api/tasks/${t.id}/toggle`)); } catch (e) { t.done = !t.done; } }
+  if (LIVE) {
+    try {
+      const res = await api("POST", `/api/tasks/${t.id}/toggle`);
+      // Our copy of history is a recent window; Undo must restore the full list.
+      // Marking done appends exactly one entry, un-marking leaves it alone.
+      snap.history = snap.done ? res.history : res.history.slice(0, -1);
+      Object.assign(t, res);
+    } catch (e) { t.done = !t.done; }
+  }
   else { t.done = !t.done; }
   render();
   showToast(snap.done ? "Marked not done" : "Marked done", "Undo", () => undoToggle(snap));
 }
+function undoFields(snap) {
+  return { due: snap.due, completed_at: snap.completed_at || "", times: snap.times,
+           history: snap.history || [], is_suspended: !!snap.suspended };
+}
 async function undoToggle(snap) {
   if (LIVE) {
     try {
-      await api("PATCH", `/api/tasks/${snap.id}`, {
-        due: snap.due, completed_at: snap.completed_at || "", times: snap.times,
-        history: snap.history || [], is_suspended: !!snap.suspended,
-      });
+      await api("PATCH", `/api/tasks/${snap.id}`, undoFields(snap));
       await loadData();
     } catch (e) {}
   } else { const t = tasks.find((x) => x.id === snap.id); if (t) Object.assign(t, snap); }
   render();
 }
+async function markAllDone(list) {
+  // One POST /api/batch (one write on the server) for a whole group, with Undo.
+  const open = list.filter((t) => !t.done && !t.is_deleted);
+  if (!open.length) return;
+  let snaps = open.map((t) => ({ ...t }));
+  if (LIVE) {
+    let res;
+    try { res = await api("POST", "/api/batch", { ops: open.map((t) => ({ op: "done", id: t.id, if_match: t.etag })) }); }
+    catch (e) { return; }
+    res.results.forEach((r, i) => {
+      if (r.ok) { snaps[i].history = r.task.history.slice(0, -1); Object.assign(open[i], r.task); }
+      else snaps[i] = null;  // changed elsewhere (412) or gone: left alone
+    });
+    snaps = snaps.filter(Boolean);
+    if (res.failed) await loadData();
+  } else { open.forEach((t) => { t.done = true; }); }
+  render();
+  showToast(`Marked ${snaps.length} done`, "Undo", () => undoBatch(snaps));
+}
+async function undoBatch(snaps) {
+  if (LIVE) {
+    try {
+      await api("POST", "/api/batch", { ops: snaps.map((s) => ({ op: "patch", id: s.id, fields: undoFields(s) })) });
+      await loadData();
+    } catch (e) {}
+  } else { snaps.forEach((s) => { const t = tasks.find((x) => x.id === s.id); if (t) Object.assign(t, s); }); }
+  render();
+}
 async function setSuspended(t, val) {
-  if (LIVE) { try { Object.assign(t, await api("PATCH", `/api/tasks/${t.id}`, { is_suspended: val })); } catch (e) {} }
+  if (LIVE) {
+    try { Object.assign(t, await api("PATCH", `/api/tasks/${t.id}`, { is_suspended: val }, t.etag)); }
+    catch (e) { if (onConflict(e)) return; }
+  }
   else { t.suspended = val; }
   render();
   showToast(val ? "Suspended" : "Unsuspended", "Undo", () => setSuspended(t, !val));
 }
 async function deleteTask(t) {
   const snap = { ...t };
-  if (LIVE) { try { await api("DELETE", `/api/tasks/${t.id}`); t.is_deleted = true; } catch (e) {} }
+  if (LIVE) {
+    try { await api("DELETE", `/api/tasks/${t.id}`, null, t.etag); t.is_deleted = true; }
+    catch (e) { if (onConflict(e)) return; }
+  }
   else { t.is_deleted = true; }
   render();
   showToast("Deleted", "Undo", () => restoreTask(snap));
@@ -325,14 +514,18 @@ function isDoneToday(t) {
   return !!t.done;
 }
 function renderStats(content) {
-  const open = tasks.filter((t) => categoryPass(t, "active")).length;
-  const doneToday = tasks.filter((t) => !t.is_deleted && isDoneToday(t)).length;
-  const week = tasks.filter((t) => categoryPass(t, "active") && timePassRaw(t, "week")).length;
+  // Live, the page holds only part of the list: the numbers come from the server.
+  const d = (LIVE && dash) || {
+    open: tasks.filter((t) => categoryPass(t, "active")).length,
+    doneToday: tasks.filter((t) => !t.is_deleted && isDoneToday(t)).length,
+    week: tasks.filter((t) => categoryPass(t, "active") && timePassRaw(t, "week")).length,
+    streak: bestStreak(),
+  };
   const cards = [
-    { label: "Open", value: open },
-    { label: "Done today", value: doneToday },
-    { label: "Due this week", value: week },
-    { label: "Best streak", value: `${bestStreak()} <small>days</small>` },
+    { label: "Open", value: d.open },
+    { label: "Done today", value: d.doneToday },
+    { label: "Due this week", value: d.week },
+    { label: "Best streak", value: `${d.streak} <small>days</small>` },
   ];
   const wrap = document.createElement("div");
   wrap.className = "stats";
@@ -347,7 +540,7 @@ function render() {
   syncFilterBar();
   const catLabel = (CATEGORIES.find((c) => c.id === state.category) || {}).label || "Tasks";
   document.getElementById("viewTitle").textContent = state.group || catLabel;
-  const showToday = state.category === "active" && state.time === "today" && !state.group;
+  const showToday = showsToday();
   document.getElementById("viewSub").textContent = showToday ? new Date().toLocaleDateString(undefined, { weekday: "long", month: "long", day: "numeric" }) : "";
 
   const content = document.getElementById("content");
@@ -362,17 +555,66 @@ function render() {
   }
   if (state.category === "repeating" && !state.group) renderHeatmap(content);
 
-  let list = filtered();
-  list = (state.category === "done")
-    ? list.sort((a, b) => String(b.completed_at || "").localeCompare(String(a.completed_at || "")))
-    : sortTasks(list);
+  let list = tasks;  // live: already the server's page, filtered and ordered
+  if (!LIVE) {
+    list = filtered();
+    list = (state.category === "done")
+      ? list.sort((a, b) => String(b.completed_at || "").localeCompare(String(a.completed_at || "")))
+      : sortTasks(list);
+  }
+  if (LIVE && page.fuzzy) content.insertAdjacentHTML("beforeend", `<div class="muted">No exact matches — showing close ones.</div>`);
 
   if (!list.length) {
     content.insertAdjacentHTML("beforeend", `<div class="empty"><div class="big">🎉</div><div>Nothing here.</div></div>`);
-    return;
-  }
-  if (state.grouped) renderGrouped(content, list);
+  } else if (state.grouped) renderGrouped(content, list);
   else list.forEach((t) => content.appendChild(taskRow(t)));
+  if (LIVE && page.next) {
+    const more = document.createElement("button");
+    more.className = "btn";
+    more.textContent = `Show more (${list.length} of ${page.total})`;
+    more.onclick = loadMore;
+    content.appendChild(more);
+  }
+  if (_fts.query && _fts.query === state.search.trim()) renderDocHits(content, _fts.hits);
+}
+
+/* ---------- full-text search of task documents & journals (server-side index) ---------- */
+function scheduleFullTextSearch() {
+  clearTimeout(_fts.timer);
+  const q = state.search.trim();
+  if (!LIVE || q.length < 2) { _fts.query = ""; _fts.hits = []; return; }
+  _fts.timer = setTimeout(async () => {
+    const seq = ++_fts.seq;
+    let res;
+    try { res = await api("GET", `/api/search?kind=doc,journal&limit=20&q=${encodeURIComponent(q)}`); }
+    catch (e) { return; }
+    if (seq !== _fts.seq || state.search.trim() !== q) return;  // a newer query is on its way
+    _fts.query = q;
+    _fts.hits = res.results || [];
+    render();
+  }, 200);
+}
+function renderDocHits(content, hits) {
+  if (!hits.length) return;
+  const hdr = document.createElement("div");
+  hdr.className = "group-head";
+  hdr.innerHTML = `<span class="gname">In notes &amp; journals</span><span class="gcount">${hits.length}</span>`;
+  content.appendChild(hdr);
+  hits.forEach((h) => {
+    const row = document.createElement("div");
+    row.className = "fts-hit";
+    const label = h.kind === "journal" ? `📓 ${escapeHtml(h.ref)}` : `📄 ${escapeHtml(h.title)}`;
+    row.innerHTML = `<div class="fts-title">${label}</div><div class="fts-snippet">${h.snippet}</div>`;
+    if (h.kind === "doc") {
+      // The task may be on a page not loaded yet: fetch its full record then.
+      row.classList.add("clickable");
+      row.onclick = async () => {
+        const t = tasks.find((x) => x.id === h.ref) || await api("GET", `/api/tasks/${h.ref}`).catch(() => null);
+        if (t) openModal(t);
+      };
+    }
+    content.appendChild(row);
+  });
 }
 
 function renderGrouped(content, list) {
@@ -386,6 +628,7 @@ function renderGrouped(content, list) {
     hdr.className = "group-head";
     hdr.innerHTML = `<span class="caret">${collapsed ? "▶" : "▼"}</span><span class="gname">${escapeHtml(name)}</span><span class="gcount">${groups[name].length}</span>`;
     hdr.onclick = () => { if (collapsed) state.collapsed.delete(name); else state.collapsed.add(name); saveState(); render(); };
+    hdr.oncontextmenu = (e) => { e.preventDefault(); popupMenu(e.clientX, e.clientY, [{ label: "✓  Mark all done", fn: () => markAllDone(groups[name]) }]); };
     content.appendChild(hdr);
     if (!collapsed) groups[name].forEach((t) => content.appendChild(taskRow(t)));
   });
@@ -485,10 +728,15 @@ async function doImport() {
   if (!text.trim()) { closeImport(); return; }
   if (LIVE) {
     try {
-      const r = await api("POST", "/api/import", { text });
+      // Plain-text body: the server streams it line by line into the store.
+      const mode = document.getElementById("imp_dups").value;
+      const resp = await fetch(`/api/import?duplicates=${encodeURIComponent(mode)}`, { method: "POST", headers: { "Content-Type": "text/plain; charset=utf-8" }, body: text });
+      if (!resp.ok) throw new Error("api " + resp.status);
+      const r = await resp.json();
       await loadData();
       closeImport(); render();
-      showToast(`Imported ${r.added}` + (r.failed ? ` · ${r.failed} skipped` : ""));
+      const dupVerb = { skip: "skipped", merge: "merged", flag: "flagged", allow: "imported" }[r.duplicate_mode] || "found";
+      showToast(`Imported ${r.added}` + (r.failed ? ` · ${r.failed} invalid` : "") + (r.duplicates ? ` · ${r.duplicates} duplicate(s) ${dupVerb}` : ""));
     } catch (e) { showToast("Import failed"); }
   } else {
     // sample mode: accept title-only lines so the demo still does something.
@@ -499,12 +747,21 @@ async function doImport() {
     closeImport(); render(); showToast("Imported (sample mode)");
   }
 }
+function exportTasks() {
+  // Streamed by the server in the re-importable pipe format.
+  if (!LIVE) { showToast("Export needs the local server"); return; }
+  window.location.href = "/api/export?format=pipe";
+}
 async function saveModal() {
   const title = val("m_title").trim();
   if (!title) return;
   const payload = { title, due: val("m_due").trim(), priority: val("m_prio"), repeat: val("m_repeat"), group: val("m_group").trim(), notes: val("m_notes") };
   if (editingId != null) {
-    if (LIVE) { try { const u = await api("PATCH", `/api/tasks/${editingId}`, payload); const i = tasks.findIndex((t) => t.id === editingId); if (i >= 0) tasks[i] = u; } catch (e) {} }
+    if (LIVE) {
+      const i = tasks.findIndex((t) => t.id === editingId);
+      try { const u = await api("PATCH", `/api/tasks/${editingId}`, payload, i >= 0 ? tasks[i].etag : null); if (i >= 0) tasks[i] = u; }
+      catch (e) { if (onConflict(e)) return; }  // keep the dialog open to redo the edit
+    }
     else { const t = tasks.find((x) => x.id === editingId); if (t) { t.title = title; t.due = parseQuickDue(payload.due); t.priority = payload.priority; t.repeat = payload.repeat; t.group = payload.group; t.notes = payload.notes; } }
   } else {
     if (LIVE) { try { tasks.push(await api("POST", "/api/tasks", payload)); } catch (e) {} }
@@ -539,15 +796,20 @@ async function init() {
   document.getElementById("themeBtn").onclick = () => setTheme(currentTheme() === "dark" ? "light" : "dark", true);
   document.getElementById("gearBtn").onclick = (e) => { e.stopPropagation(); const r = e.target.getBoundingClientRect(); popupMenu(r.right - 190, r.bottom + 4, [
     { label: "⬆  Import tasks…", fn: openImport },
+    { label: "⬇  Export tasks", fn: exportTasks },
     { label: "↺  Reset hazard escalation", fn: resetHazard },
   ]); };
-  document.getElementById("search").oninput = (e) => { state.search = e.target.value; render(); };
+  document.getElementById("search").oninput = (e) => {
+    state.search = e.target.value;
+    if (LIVE) { clearTimeout(_searchTimer); _searchTimer = setTimeout(viewChanged, 200); } else render();
+    scheduleFullTextSearch();
+  };
   document.getElementById("menuBtn").onclick = () => document.getElementById("sidebar").classList.toggle("open");
   document.getElementById("addBtn").onclick = () => openModal(null);
   document.getElementById("m_cancel").onclick = closeModal;
   document.getElementById("m_save").onclick = saveModal;
-  document.getElementById("f_time").onchange = (e) => { state.time = e.target.value; saveState(); render(); };
-  document.getElementById("f_minprio").onchange = (e) => { state.minPrio = e.target.value; saveState(); render(); };
+  document.getElementById("f_time").onchange = (e) => { state.time = e.target.value; viewChanged(); };
+  document.getElementById("f_minprio").onchange = (e) => { state.minPrio = e.target.value; viewChanged(); };
   document.getElementById("f_group").onclick = () => { state.grouped = !state.grouped; saveState(); render(); };
   document.getElementById("f_collapse").onclick = () => {
     const names = new Set([...document.querySelectorAll(".group-head .gname")].map((e) => e.textContent));
@@ -564,7 +826,11 @@ async function init() {
   document.getElementById("imp_prompt").onclick = copyAiPrompt;
   document.addEventListener("click", closeMenu);
   document.addEventListener("keydown", (e) => { if (e.key === "Escape") { closeMenu(); closeModal(); closeImport(); } });
+  // Pick up changes made elsewhere (desktop app, another tab) when we come back;
+  // unchanged data costs a 304.
+  window.addEventListener("focus", () => { if (LIVE) syncNow(); });
   await loadData();
   render();
+  subscribeEvents();
 }
 document.addEventListener("DOMContentLoaded", init);